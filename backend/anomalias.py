@@ -0,0 +1,135 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from backend.vecinos import DIMENSIONES_KDTREE, muestra_referencia
+
+
+# Detección de filas anómalas por la combinación de sus valores, no columna a columna
+METODOS_ANOMALIAS = ('isolation_forest', 'mahalanobis', 'lof')
+MUESTRA_ANOMALIAS = 10_000 # Filas completas con las que se ajusta el modelo (None = todas)
+CONTAMINACION = 0.01 # Fracción de filas de la muestra que se consideran anómalas
+LOTE_ANOMALIAS = 10_000 # Filas que puntúa cada hilo de una vez
+VECINOS_LOF = 20
+
+
+# Ajusta el detector sobre una muestra de las filas completas, ya escaladas, y fija el umbral de la
+# puntuación (mayor = más anómala): el indicado o el que deja fuera la fracción de contaminación de la muestra.
+# El paso guarda el estado ajustado del modelo en arrays ('parametros'), de modo que al aplicarlo, también
+# desde un artefacto, no se vuelve a ajustar nada
+def ajustar_anomalias(bloques, columnas, desplazamiento, escala, metodo, muestra=MUESTRA_ANOMALIAS,
+                      contaminacion=CONTAMINACION, umbral=None, n_jobs=None, lote=LOTE_ANOMALIAS):
+    if metodo not in METODOS_ANOMALIAS:
+        raise ValueError(f"Método de detección de anomalías desconocido: {metodo}")
+    referencia = muestra_referencia(bloques, columnas, np.asarray(desplazamiento, dtype='float64'),
+                                    np.asarray(escala, dtype='float64'), muestra)
+    if len(referencia) <= len(columnas):
+        raise ValueError("No hay suficientes filas sin valores faltantes para ajustar el detector")
+
+    modelo, parametros = _ajustar_modelo(referencia, metodo, n_jobs)
+    paso = {'tipo': 'eliminar_anomalas', 'metodo': metodo, 'columnas': list(columnas), 'desplazamiento': list(desplazamiento),
+            'escala': list(escala), 'parametros': parametros, 'umbral': umbral, 'n_jobs': n_jobs, 'lote': lote}
+    if metodo == 'lof': # LOF busca los vecinos de cada fila nueva entre las filas de ajuste
+        paso['referencia'] = referencia
+    if umbral is None:
+        # En LOF las puntuaciones de ajuste no cuentan cada fila como su propio vecino
+        puntuaciones = -modelo.negative_outlier_factor_ if metodo == 'lof' else _puntuar_lote(paso, referencia)
+        paso['umbral'] = float(np.quantile(puntuaciones, 1 - contaminacion))
+    return paso
+
+
+# Longitud media del camino de una búsqueda fallida en un árbol binario de n elementos, con la que
+# Isolation Forest completa el camino de las hojas con varias filas y normaliza la puntuación
+def _longitud_media(n):
+    n = np.asarray(n, dtype='float64')
+    longitud = np.zeros_like(n)
+    longitud[n == 2] = 1.0
+    mayores = n > 2
+    longitud[mayores] = 2.0 * (np.log(n[mayores] - 1.0) + np.euler_gamma) - 2.0 * (n[mayores] - 1.0) / n[mayores]
+    return longitud
+
+
+# Ajusta el modelo de sklearn sobre el conjunto de referencia (con semilla fija) y extrae lo necesario
+# para puntuar filas nuevas: los árboles de Isolation Forest (hijos, variable y corte de cada nodo y la
+# longitud del camino hasta cada hoja), la media y la precisión robustas de MinCovDet o, en LOF, la
+# distancia al k-ésimo vecino y la densidad local de cada fila de referencia
+def _ajustar_modelo(referencia, metodo, n_jobs):
+    if metodo == 'isolation_forest':
+        from sklearn.ensemble import IsolationForest
+        modelo = IsolationForest(random_state=0, n_jobs=n_jobs).fit(referencia)
+        arboles = [estimador.tree_ for estimador in modelo.estimators_]
+        return modelo, {'izquierda': [arbol.children_left.copy() for arbol in arboles],
+                        'derecha': [arbol.children_right.copy() for arbol in arboles],
+                        'variable': [arbol.feature.copy() for arbol in arboles],
+                        'corte': [arbol.threshold.copy() for arbol in arboles],
+                        'longitud': [arbol.compute_node_depths() - 1.0 + _longitud_media(arbol.n_node_samples) for arbol in arboles],
+                        'normalizacion': float(len(arboles) * _longitud_media([modelo.max_samples_])[0])}
+    if metodo == 'mahalanobis':
+        from sklearn.covariance import MinCovDet
+        modelo = MinCovDet(random_state=0).fit(referencia)
+        return modelo, {'centro': modelo.location_, 'precision': modelo.precision_}
+    from sklearn.neighbors import LocalOutlierFactor
+    modelo = LocalOutlierFactor(n_neighbors=min(VECINOS_LOF, len(referencia) - 1), novelty=True, n_jobs=n_jobs).fit(referencia)
+    distancias, vecinos = modelo.kneighbors() # Vecinos de cada fila de referencia sin contarse a sí misma
+    distancia_k = distancias[:, -1]
+    densidad = 1.0 / (np.maximum(distancias, distancia_k[vecinos]).mean(axis=1) + 1e-10)
+    return modelo, {'vecinos': int(modelo.n_neighbors_), 'distancia_k': distancia_k, 'densidad': densidad}
+
+
+# Árbol de búsqueda de vecinos de LOF sobre las filas de referencia; se construye la primera vez que se
+# puntúa y no se guarda en los artefactos
+def _arbol(paso):
+    if paso.get('arbol') is None:
+        from sklearn.neighbors import BallTree, KDTree
+        referencia = paso['referencia']
+        paso['arbol'] = KDTree(referencia) if referencia.shape[1] <= DIMENSIONES_KDTREE else BallTree(referencia)
+    return paso['arbol']
+
+
+# Puntuación de un lote de filas escaladas y completas con los parámetros ajustados (mayor = más anómala)
+def _puntuar_lote(paso, valores):
+    parametros = paso['parametros']
+    if paso['metodo'] == 'mahalanobis': # Distancia de Mahalanobis al cuadrado con la media y la precisión robustas
+        diferencia = valores - parametros['centro']
+        return ((diferencia @ parametros['precision']) * diferencia).sum(axis=1)
+
+    if paso['metodo'] == 'lof': # Densidad media de los vecinos respecto a la densidad local de cada fila
+        distancias, vecinos = _arbol(paso).query(valores, k=parametros['vecinos'])
+        alcance = np.maximum(distancias, parametros['distancia_k'][vecinos])
+        densidad = 1.0 / (alcance.mean(axis=1) + 1e-10)
+        return (parametros['densidad'][vecinos] / densidad[:, np.newaxis]).mean(axis=1)
+
+    # Isolation Forest: 2^(-camino medio / normalización), recorriendo cada árbol con todas las filas a la vez.
+    # Los árboles de sklearn comparan los valores en float32
+    valores = valores.astype('float32')
+    caminos = np.zeros(len(valores))
+    filas = np.arange(len(valores))
+    for izquierda, derecha, variable, corte, longitud in zip(parametros['izquierda'], parametros['derecha'], parametros['variable'],
+                                                             parametros['corte'], parametros['longitud']):
+        nodos = np.zeros(len(valores), dtype='int64')
+        internos = filas
+        while len(internos := internos[izquierda[nodos[internos]] != -1]):
+            actuales = nodos[internos]
+            nodos[internos] = np.where(valores[internos, variable[actuales]] <= corte[actuales], izquierda[actuales], derecha[actuales])
+        caminos += longitud[nodos]
+    return 2.0 ** (-caminos / parametros['normalizacion'])
+
+
+# Puntuación de anomalía de cada fila, por lotes repartidos entre hilos; NaN en las filas con nulos
+def puntuar_anomalias(datos, paso):
+    valores = (datos[paso['columnas']].to_numpy(dtype='float64', na_value=np.nan) - np.asarray(paso['desplazamiento'])) / np.asarray(paso['escala'])
+    completas = np.flatnonzero(~np.isnan(valores).any(axis=1))
+    puntuaciones = np.full(len(datos), np.nan)
+    if len(completas):
+        if paso['metodo'] == 'lof': # El árbol se construye antes de repartir los lotes entre hilos
+            _arbol(paso)
+        consulta = valores[completas]
+        lotes = [consulta[inicio:inicio + paso['lote']] for inicio in range(0, len(consulta), paso['lote'])]
+        with ThreadPoolExecutor(max_workers=paso['n_jobs'] if paso['n_jobs'] and paso['n_jobs'] > 0 else os.cpu_count()) as pool:
+            puntuaciones[completas] = np.concatenate(list(pool.map(lambda lote: _puntuar_lote(paso, lote), lotes)))
+    return puntuaciones
+
+
+# Filas por encima del umbral; las filas con nulos no se puntúan y no se consideran anómalas
+def mascara_anomalias(datos, paso):
+    puntuaciones = puntuar_anomalias(datos, paso)
+    return ~np.isnan(puntuaciones) & (puntuaciones > paso['umbral'])
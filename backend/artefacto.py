@@ -0,0 +1,87 @@
+import json
+import numpy as np
+from backend.transformaciones import aplicar_pasos
+
+
+# Versión del formato de los artefactos; uno de una versión posterior no se puede leer
+VERSION_ARTEFACTO = 1
+
+# Claves de los pasos con objetos que se construyen al aplicarlos (árboles de búsqueda del KNN y de LOF)
+CLAVES_TEMPORALES = ('arboles', 'arbol')
+
+
+# Convierte un paso a tipos de JSON: arrays y escalares de NumPy a listas y números, y las tuplas a listas.
+# Los diccionarios con claves que no son texto (categorías numéricas, grupos) se guardan como pares
+# para que las claves conserven su tipo al leerlos
+def _a_json(valor):
+    if isinstance(valor, dict):
+        if all(isinstance(clave, str) for clave in valor):
+            return {clave: _a_json(v) for clave, v in valor.items()}
+        return {'__pares__': [[_a_json(clave), _a_json(v)] for clave, v in valor.items()]}
+    if isinstance(valor, (list, tuple)):
+        return [_a_json(v) for v in valor]
+    if isinstance(valor, np.ndarray):
+        return {'__array__': valor.tolist(), 'dtype': str(valor.dtype)}
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return valor
+
+
+# Inversa de _a_json
+def _de_json(valor):
+    if isinstance(valor, dict):
+        if '__pares__' in valor:
+            return {_de_json(clave): _de_json(v) for clave, v in valor['__pares__']}
+        if '__array__' in valor:
+            return np.asarray(valor['__array__'], dtype=valor['dtype'])
+        return {clave: _de_json(v) for clave, v in valor.items()}
+    if isinstance(valor, list):
+        return [_de_json(v) for v in valor]
+    return valor
+
+
+# Artefacto con todo lo ajustado en el preprocesado: columnas seleccionadas y pasos en orden.
+# Los detectores de anomalías se guardan ya ajustados; los árboles de búsqueda de vecinos no se guardan y
+# se vuelven a construir la primera vez que se usan
+def crear_artefacto(features, target, pasos):
+    return {'version': VERSION_ARTEFACTO, 'features': list(features), 'target': target,
+            'pasos': [{clave: valor for clave, valor in paso.items() if clave not in CLAVES_TEMPORALES} for paso in pasos]}
+
+
+# Guarda el artefacto en JSON (sin las claves internas que empiezan por "_")
+def guardar_artefacto(artefacto, ruta):
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(_a_json({clave: valor for clave, valor in artefacto.items() if not clave.startswith('_')}), archivo, ensure_ascii=False)
+
+
+def cargar_artefacto(ruta):
+    with open(ruta, encoding='utf-8') as archivo:
+        artefacto = _de_json(json.load(archivo))
+    if artefacto.get('version', 0) > VERSION_ARTEFACTO:
+        raise ValueError(f"El artefacto {ruta} tiene la versión {artefacto['version']} y solo se admite hasta la {VERSION_ARTEFACTO}")
+    return artefacto
+
+
+# Pasos de un artefacto listos para aplicar a datos nuevos: el target encoding usa todas las filas
+# de ajuste (fuera de pliegue solo tiene sentido con los datos con los que se ajustó)
+def pasos_transformacion(artefacto):
+    pasos = []
+    for paso in artefacto['pasos']:
+        paso = dict(paso)
+        if paso['tipo'] == 'target':
+            paso['fuera_de_pliegue'] = False
+        if paso['tipo'] == 'knn':
+            paso.setdefault('arboles', {})
+        pasos.append(paso)
+    artefacto['_pasos_transformacion'] = pasos # Se reutilizan, con sus árboles ya construidos, en cada llamada
+    return pasos
+
+
+# Modo solo transformación para lotes en memoria: aplica los pasos del artefacto sin reajustar nada.
+# Con copiar=False se pueden modificar los datos recibidos, lo que evita una copia en cada llamada
+def transformar(datos, artefacto, copiar=True):
+    faltan = [columna for columna in artefacto['features'] if columna not in datos.columns]
+    if faltan:
+        raise ValueError(f"Faltan columnas del artefacto en los datos: {', '.join(map(str, faltan))}")
+    pasos = artefacto.get('_pasos_transformacion') or pasos_transformacion(artefacto)
+    return aplicar_pasos(datos.copy() if copiar else datos, pasos)
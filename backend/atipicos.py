@@ -0,0 +1,50 @@
+import numpy as np
+
+
+# Límites del rango intercuartílico: (Q1 - 1.5·IQR, Q3 + 1.5·IQR)
+FACTOR_IQR = 1.5
+
+
+# Límites de cada columna a partir de sus cuartiles
+def limites_iqr(estadisticas, columnas):
+    limites = {}
+    for columna in columnas:
+        Q1 = estadisticas.cuantil(columna, 0.25)
+        Q3 = estadisticas.cuantil(columna, 0.75)
+        IQR = Q3 - Q1
+        limites[columna] = (Q1 - FACTOR_IQR * IQR, Q3 + FACTOR_IQR * IQR)
+    return limites
+
+
+# Convierte todas las columnas con límites en una sola matriz y las compara a la vez con sus límites.
+# Devuelve la matriz y qué valores están dentro (los nulos no lo están)
+def _dentro(datos, limites):
+    valores = datos[list(limites)].to_numpy(dtype='float64', na_value=np.nan)
+    inferior, superior = np.asarray(list(limites.values()), dtype='float64').reshape(-1, 2).T
+    return valores, (valores >= inferior) & (valores <= superior)
+
+
+# Matriz booleana filas × columnas con los valores atípicos (fuera de los límites y no nulos)
+def mascara_atipicos(datos, limites):
+    valores, dentro = _dentro(datos, limites)
+    return ~dentro & ~np.isnan(valores)
+
+
+# Conserva las filas dentro de los límites de todas las columnas con una única máscara (las filas
+# con nulos en esas columnas también se descartan) y sin copias intermedias por columna
+def eliminar_atipicos(datos, limites):
+    _, dentro = _dentro(datos, limites)
+    return datos.take(np.flatnonzero(dentro.all(axis=1))) # take no marca el resultado como copia de una vista
+
+
+# Sustituye los valores atípicos por la mediana de su columna; solo se reescriben las columnas con alguno
+def reemplazar_atipicos(datos, limites, medianas):
+    fuera = mascara_atipicos(datos, limites)
+    columnas = list(limites)
+    for j in np.flatnonzero(fuera.any(axis=0)):
+        columna = columnas[j]
+        tipo = datos[columna].dtype if isinstance(datos[columna].dtype, np.dtype) and datos[columna].dtype.kind == 'f' else 'float64'
+        valores = datos[columna].to_numpy(dtype=tipo, na_value=np.nan, copy=True)
+        valores[fuera[:, j]] = medianas[columna]
+        datos[columna] = valores
+    return datos
@@ -0,0 +1,67 @@
+import pandas as pd
+from backend.disperso import EXTENSIONES_DISPERSAS, densificar, guardar_npz, matriz_dispersa
+from backend.fuentes import EXTENSIONES_FEATHER, EXTENSIONES_PARQUET, leer_fuente_bloques
+from backend.salida_csv import EXTENSIONES_CSV, escribir_csv
+from backend.transformaciones import aplicar_pasos
+
+
+# Lee un CSV o una tabla SQLite por bloques de tamaño fijo y aplica a cada bloque los pasos
+# ya ajustados, de forma que la memoria depende del tamaño del bloque y no del archivo.
+# El índice de cada bloque es la posición de sus filas en la fuente, como al cargarla entera
+def leer_bloques(ruta, tamano_bloque, pasos=(), columnas=None, tabla=None, filtro=None):
+    inicio = 0
+    for bloque in leer_fuente_bloques(ruta, tamano_bloque, tabla, columnas, filtro):
+        bloque.index = pd.RangeIndex(inicio, inicio + len(bloque))
+        inicio += len(bloque)
+        yield aplicar_pasos(bloque, pasos)
+
+
+# Escribe los bloques uno detrás de otro en un CSV (comprimido o no), un Excel, un Parquet, un Feather (.feather o .arrow) o una matriz dispersa .npz
+# Devuelve el número de filas escritas
+def exportar_bloques(bloques, archivo, compresion=None, filas_grupo=None):
+    filas = 0
+    if archivo.endswith(EXTENSIONES_CSV): # Por trozos, comprimido según la extensión y con la escritura en otro hilo
+        filas = escribir_csv(bloques, archivo)['filas']
+
+    elif archivo.endswith('.xlsx'): # Excel no admite añadir, así que se escribe a partir de la última fila
+        with pd.ExcelWriter(archivo) as escritor:
+            for i, bloque in enumerate(bloques):
+                bloque.to_excel(escritor, index=False, header=i == 0, startrow=0 if i == 0 else filas + 1)
+                filas += len(bloque)
+
+    elif archivo.endswith(EXTENSIONES_PARQUET + EXTENSIONES_FEATHER): # Cada bloque se añade con el esquema del primero
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        escritor = None
+        try:
+            for bloque in bloques:
+                bloque = densificar(bloque)
+                if escritor is None:
+                    tabla = pa.Table.from_pandas(bloque, preserve_index=False)
+                    if archivo.endswith(EXTENSIONES_PARQUET):
+                        escritor = pq.ParquetWriter(archivo, tabla.schema, compression=compresion or 'snappy')
+                    else:
+                        opciones = pa.ipc.IpcWriteOptions(compression=compresion or 'lz4')
+                        escritor = pa.ipc.new_file(archivo, tabla.schema, options=opciones)
+                    esquema = tabla.schema
+                else:
+                    tabla = pa.Table.from_pandas(bloque, schema=esquema, preserve_index=False)
+                if archivo.endswith(EXTENSIONES_PARQUET):
+                    escritor.write_table(tabla, row_group_size=filas_grupo)
+                else:
+                    escritor.write_table(tabla)
+                filas += len(bloque)
+        finally:
+            if escritor is not None:
+                escritor.close()
+    elif archivo.endswith(EXTENSIONES_DISPERSAS): # Cada bloque se convierte en CSR y se apilan al final
+        matrices = []
+        columnas = None
+        for bloque in bloques:
+            matriz, columnas = matriz_dispersa(bloque)
+            matrices.append(matriz)
+        filas = guardar_npz(matrices, columnas, archivo)
+    else:
+        raise ValueError(f"Formato de exportación no soportado: {archivo}")
+    return filas
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+
+
+# Caché en disco de las fuentes ya leídas. Cada entrada se identifica por la ruta, el tamaño,
+# la fecha de modificación (o un hash del contenido) y las opciones de lectura, y guarda el
+# DataFrame en un archivo Arrow (IPC comprimido con lz4), que se carga mucho más rápido que volver
+# a analizar un Excel o un CSV y, a diferencia de pickle, no ejecuta código al leerlo.
+# Cuando el total supera el máximo se eliminan las entradas usadas hace más tiempo (LRU); una
+# entrada que por sí sola supera el máximo no se guarda.
+class CacheCargas:
+    EXTENSION = '.arrow'
+
+    def __init__(self, directorio, max_bytes=1024**3, hash_contenido=False):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self.hash_contenido = hash_contenido
+        self.aciertos = 0
+        self.fallos = 0
+        self.ultimo_acierto = None # Si la última lectura se sirvió desde la caché
+        os.makedirs(directorio, exist_ok=True)
+
+    # Calcula la clave de una lectura a partir del archivo y de las opciones del lector
+    def clave(self, ruta, **opciones):
+        info = os.stat(ruta)
+        identidad = {'ruta': os.path.abspath(ruta), 'tamano': info.st_size, 'opciones': opciones}
+        if self.hash_contenido:
+            identidad['contenido'] = hash_archivo(ruta)
+        else:
+            identidad['modificado'] = info.st_mtime_ns
+        texto = json.dumps(identidad, sort_keys=True, default=str)
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+    def _ruta_entrada(self, clave):
+        return os.path.join(self.directorio, clave + self.EXTENSION)
+
+    # Devuelve los datos guardados o None si no están; al usarlos se marca la entrada como reciente
+    def obtener(self, clave):
+        import pyarrow as pa
+
+        entrada = self._ruta_entrada(clave)
+        if not os.path.exists(entrada):
+            return None
+        try:
+            with pa.memory_map(entrada) as archivo:
+                datos = pa.ipc.open_file(archivo).read_all().to_pandas()
+        except (OSError, pa.ArrowException): # Entrada dañada o de otra versión: se descarta
+            os.remove(entrada)
+            return None
+        os.utime(entrada)
+        return datos
+
+    # Guarda los datos y libera espacio si se supera el tamaño máximo. No se guardan los datos que Arrow
+    # no puede representar tal cual (columnas con tipos mezclados o nombres que no son texto) ni los que
+    # no caben en la caché, que además se quedaría vacía al liberar espacio para ellos.
+    # Devuelve si se han guardado
+    def guardar(self, clave, datos):
+        import pyarrow as pa
+
+        if not all(isinstance(columna, str) for columna in datos.columns):
+            return False
+        try:
+            tabla = pa.Table.from_pandas(datos)
+        except pa.ArrowException:
+            return False
+        if tabla.nbytes > self.max_bytes: # Sin comprimir: si ni así cabe, no se llega a escribir
+            return False
+
+        entrada = self._ruta_entrada(clave)
+        temporal = entrada + '.tmp'
+        with pa.OSFile(temporal, 'wb') as archivo, \
+             pa.ipc.new_file(archivo, tabla.schema, options=pa.ipc.IpcWriteOptions(compression='lz4')) as escritor:
+            escritor.write_table(tabla)
+        if os.path.getsize(temporal) > self.max_bytes:
+            os.remove(temporal)
+            return False
+        os.replace(temporal, entrada)
+        self._liberar(entrada)
+        return True
+
+    # Lee desde la caché o, si no está, con el lector indicado y guarda el resultado
+    def cargar(self, ruta, lector, **opciones):
+        clave = self.clave(ruta, **opciones)
+        datos = self.obtener(clave)
+        self.ultimo_acierto = datos is not None
+        if datos is not None:
+            self.aciertos += 1
+            return datos
+        self.fallos += 1
+        datos = lector(ruta, **opciones)
+        self.guardar(clave, datos)
+        return datos
+
+    # Entradas guardadas como (ruta, tamaño, último uso), de la más antigua a la más reciente
+    def entradas(self):
+        entradas = []
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith(self.EXTENSION):
+                ruta = os.path.join(self.directorio, nombre)
+                info = os.stat(ruta)
+                entradas.append((ruta, info.st_size, info.st_mtime))
+        return sorted(entradas, key=lambda entrada: entrada[2])
+
+    def tamano(self):
+        return sum(entrada[1] for entrada in self.entradas())
+
+    # Elimina las entradas usadas hace más tiempo hasta quedar por debajo del máximo, sin tocar
+    # la que se acaba de guardar
+    def _liberar(self, conservar):
+        entradas = self.entradas()
+        total = sum(entrada[1] for entrada in entradas)
+        for ruta, tamano, _ in entradas:
+            if total <= self.max_bytes:
+                break
+            if ruta == conservar:
+                continue
+            os.remove(ruta)
+            total -= tamano
+
+    # Borra todas las entradas de la caché
+    def limpiar(self):
+        for ruta, _, _ in self.entradas():
+            os.remove(ruta)
+
+
+# Hash del contenido de un archivo leído por partes para no cargarlo entero en memoria
+def hash_archivo(ruta, tamano_parte=1024**2):
+    resumen = hashlib.blake2b(digest_size=20)
+    with open(ruta, 'rb') as archivo:
+        for parte in iter(lambda: archivo.read(tamano_parte), b''):
+            resumen.update(parte)
+    return resumen.hexdigest()
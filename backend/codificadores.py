@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+
+# Opciones por defecto de los codificadores para columnas con muchas categorías
+COLUMNAS_HASH = 32 # Ancho fijo de la salida del hashing
+PLIEGUES_TARGET = 5 # Particiones del target encoding fuera de pliegue
+SUAVIZADO_TARGET = 10 # Peso de la media global frente a la de cada categoría
+
+
+# Cubeta de cada valor según su hash (estable entre procesos y sesiones); -1 para los nulos.
+# En las columnas category se calculan solo los hashes de las categorías, con el mismo resultado
+def cubetas_hash(serie, ancho):
+    cubetas = (pd.util.hash_pandas_object(serie, index=False).to_numpy() % np.uint64(ancho)).astype('int64')
+    cubetas[serie.isnull().to_numpy()] = -1
+    return cubetas
+
+
+# Feature hashing: cada columna se sustituye por "ancho" columnas uint8 con un 1 en la cubeta de su valor,
+# así que el número de columnas no depende de las categorías y no hay nada que ajustar
+def codificar_hash(datos, paso):
+    ancho = paso['ancho']
+    partes = [datos.drop(columns=paso['columnas'])]
+    for columna in paso['columnas']:
+        cubetas = cubetas_hash(datos[columna], ancho)
+        matriz = np.zeros((len(datos), ancho), dtype='uint8')
+        filas = np.flatnonzero(cubetas >= 0)
+        matriz[filas, cubetas[filas]] = 1
+        partes.append(pd.DataFrame(matriz, index=datos.index, columns=[f"{columna}_hash_{i}" for i in range(ancho)]))
+    return pd.concat(partes, axis=1)
+
+
+# Sustituye cada categoría por el número de filas (o la fracción) en que aparece; 0 si no se vio al ajustar
+def codificar_frecuencia(datos, paso):
+    for columna, conteos in paso['conteos'].items():
+        datos[columna] = datos[columna].map(conteos).astype('float64').fillna(0.0)
+    return datos
+
+
+# Pliegue de cada fila a partir del hash de su posición en la fuente (el índice, que en la lectura por
+# bloques continúa de un bloque al siguiente): no depende del tamaño de los bloques ni de los valores de las
+# demás columnas, que pueden diferir en los últimos decimales entre la ejecución en memoria y por bloques
+def pliegues_filas(datos, pliegues):
+    return (pd.util.hash_array(datos.index.to_numpy(dtype='int64')) % np.uint64(pliegues)).astype('int64')
+
+
+# Ajusta el target encoding en una sola pasada por los bloques: suma y número de filas del target
+# por categoría y pliegue, y la media global del target
+def ajustar_target(bloques, columnas, target, pliegues=PLIEGUES_TARGET, suavizado=SUAVIZADO_TARGET):
+    acumulados = {columna: None for columna in columnas}
+    suma_total, filas_total = 0.0, 0
+    for bloque in bloques:
+        pliegue = pliegues_filas(bloque, pliegues)
+        suma_total += float(bloque[target].sum())
+        filas_total += int(bloque[target].count())
+        for columna in columnas:
+            agregado = pd.DataFrame({'valor': bloque[columna].to_numpy(), 'pliegue': pliegue, 'y': bloque[target].to_numpy()}) \
+                .dropna(subset=['valor', 'y']).groupby(['valor', 'pliegue'], observed=True)['y'].agg(['sum', 'count'])
+            acumulados[columna] = agregado if acumulados[columna] is None else acumulados[columna].add(agregado, fill_value=0)
+
+    ajustados = {}
+    for columna, agregado in acumulados.items():
+        sumas = agregado['sum'].unstack(fill_value=0).reindex(columns=range(pliegues), fill_value=0) if agregado is not None else pd.DataFrame()
+        conteos = agregado['count'].unstack(fill_value=0).reindex(columns=range(pliegues), fill_value=0) if agregado is not None else pd.DataFrame()
+        ajustados[columna] = {'categorias': [valor.item() if hasattr(valor, 'item') else valor for valor in sumas.index],
+                              'sumas': sumas.to_numpy(dtype='float64').tolist(), 'conteos': conteos.to_numpy(dtype='float64').tolist()}
+    return {'tipo': 'target', 'columnas': ajustados, 'target': target, 'media': suma_total / filas_total if filas_total else 0.0,
+            'pliegues': pliegues, 'suavizado': suavizado, 'fuera_de_pliegue': True}
+
+
+# Media suavizada del target de cada categoría: (suma + m·media) / (filas + m). Fuera de pliegue cada fila
+# usa solo las filas de los demás pliegues, para no filtrar su propio target; las categorías nuevas y los
+# nulos reciben la media global
+def codificar_target(datos, paso):
+    fuera_de_pliegue = paso['fuera_de_pliegue'] and paso['target'] in datos.columns
+    pliegue = pliegues_filas(datos, paso['pliegues']) if fuera_de_pliegue else None
+    for columna, ajuste in paso['columnas'].items():
+        codigos = pd.Categorical(datos[columna], categories=ajuste['categorias']).codes.astype('int64')
+        sumas = np.asarray(ajuste['sumas'], dtype='float64').reshape(-1, paso['pliegues'])
+        conteos = np.asarray(ajuste['conteos'], dtype='float64').reshape(-1, paso['pliegues'])
+        conocidas = codigos >= 0
+        suma = np.zeros(len(datos))
+        conteo = np.zeros(len(datos))
+        suma[conocidas] = sumas[codigos[conocidas]].sum(axis=1)
+        conteo[conocidas] = conteos[codigos[conocidas]].sum(axis=1)
+        if fuera_de_pliegue:
+            suma[conocidas] -= sumas[codigos[conocidas], pliegue[conocidas]]
+            conteo[conocidas] -= conteos[codigos[conocidas], pliegue[conocidas]]
+        datos[columna] = (suma + paso['suavizado'] * paso['media']) / (conteo + paso['suavizado'])
+    return datos
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+
+# Métodos de correlación y límites a partir de los que una matriz se considera ancha
+METODOS_CORRELACION = ('pearson', 'spearman')
+COLUMNAS_ANOTADAS = 20 # Columnas hasta las que el heatmap muestra el valor de cada celda
+PARES_FUERTES = 10 # Pares de columnas del informe de correlaciones más fuertes
+
+
+# Acumula por bloques (o por particiones que después se unen) las sumas y productos cruzados de las
+# columnas numéricas, sin guardar las filas. Para cada par se usan solo las filas en las que ambas
+# columnas tienen valor, como DataFrame.corr(). Los valores se desplazan (normalmente por la media ya
+# conocida de cada columna) para que las sumas no pierdan precisión con magnitudes grandes.
+class AcumuladorCorrelacion:
+    def __init__(self, columnas, desplazamiento=None):
+        self.columnas = list(columnas)
+        p = len(self.columnas)
+        self.desplazamiento = None if desplazamiento is None else np.asarray(desplazamiento, dtype='float64')
+        self.n = np.zeros((p, p)) # Filas con valor en las dos columnas de cada par
+        self.suma = np.zeros((p, p)) # suma[i, j]: suma de la columna i en las filas en las que también hay j
+        self.suma_cuadrados = np.zeros((p, p))
+        self.productos = np.zeros((p, p))
+
+    # Incorpora un bloque (DataFrame con las columnas del acumulador o matriz de valores en ese orden)
+    def actualizar(self, bloque):
+        valores = bloque[self.columnas].to_numpy(dtype='float64', na_value=np.nan) if isinstance(bloque, pd.DataFrame) \
+            else np.asarray(bloque, dtype='float64')
+        if self.desplazamiento is None: # Sin desplazamiento conocido se toma la media del primer bloque
+            with np.errstate(invalid='ignore'):
+                medias = np.nanmean(valores, axis=0) if len(valores) else np.zeros(len(self.columnas))
+            self.desplazamiento = np.nan_to_num(medias)
+        presentes = ~np.isnan(valores)
+        valores = np.where(presentes, valores - self.desplazamiento, 0.0)
+        mascara = presentes.astype('float64')
+        self.n += mascara.T @ mascara
+        self.suma += valores.T @ mascara
+        self.suma_cuadrados += (valores ** 2).T @ mascara
+        self.productos += valores.T @ valores
+
+    # Une las sumas de otra partición acumulada con las mismas columnas y el mismo desplazamiento
+    def unir(self, otro):
+        if otro.columnas != self.columnas:
+            raise ValueError("Solo se pueden unir acumuladores de las mismas columnas")
+        if self.desplazamiento is None:
+            self.desplazamiento = otro.desplazamiento
+        elif otro.desplazamiento is not None and not np.array_equal(otro.desplazamiento, self.desplazamiento):
+            raise ValueError("Solo se pueden unir acumuladores con el mismo desplazamiento")
+        self.n += otro.n
+        self.suma += otro.suma
+        self.suma_cuadrados += otro.suma_cuadrados
+        self.productos += otro.productos
+        return self
+
+    # Matriz de correlación de Pearson; NaN en los pares con menos de dos filas o sin variación
+    def matriz(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            n = np.where(self.n > 1, self.n, np.nan)
+            covarianza = self.productos - self.suma * self.suma.T / n
+            varianza_x = self.suma_cuadrados - self.suma ** 2 / n
+            correlacion = np.where((varianza_x > 0) & (varianza_x.T > 0), covarianza / np.sqrt(varianza_x * varianza_x.T), np.nan)
+        correlacion = np.clip(correlacion, -1.0, 1.0)
+        diagonal = np.diag(self.n) > 1
+        correlacion[np.diag_indices_from(correlacion)] = np.where(diagonal & (np.diag(varianza_x) > 0), 1.0, np.nan)
+        return pd.DataFrame(correlacion, index=self.columnas, columns=self.columnas)
+
+
+# Rango medio de cada valor distinto a partir de su frecuencia (los empates reciben la media de sus
+# posiciones, como rank()): devuelve los valores ordenados y su rango
+def rangos_frecuencias(frecuencias):
+    frecuencias = frecuencias.sort_index()
+    conteos = frecuencias.to_numpy(dtype='float64')
+    return frecuencias.index.to_numpy(dtype='float64'), np.cumsum(conteos) - (conteos - 1) / 2
+
+
+# Sustituye los valores de un bloque por su rango global (NaN en los nulos)
+def a_rangos(bloque, columnas, rangos):
+    resultado = np.full((len(bloque), len(columnas)), np.nan)
+    for i, columna in enumerate(columnas):
+        valores = bloque[columna].to_numpy(dtype='float64', na_value=np.nan)
+        presentes = ~np.isnan(valores)
+        ordenados, rango = rangos[columna]
+        resultado[presentes, i] = rango[np.searchsorted(ordenados, valores[presentes])]
+    return resultado
+
+
+# Correlación de las columnas recorriendo los bloques una vez. Pearson usa las medias como desplazamiento;
+# Spearman es Pearson sobre los rangos, que salen de la frecuencia exacta de cada valor en todas las
+# filas ({columna: frecuencias}), así que tampoco se guardan las filas. Si hay nulos, el rango de
+# cada columna se calcula sobre todos sus valores y no solo sobre las filas completas de cada par
+def correlacion_bloques(bloques, columnas, metodo='pearson', medias=None, frecuencias=None):
+    if metodo not in METODOS_CORRELACION:
+        raise ValueError(f"Método de correlación desconocido: {metodo}")
+    if metodo == 'spearman':
+        rangos = {columna: rangos_frecuencias(frecuencias[columna]) for columna in columnas}
+        acumulador = AcumuladorCorrelacion(columnas, [(frecuencias[columna].sum() + 1) / 2 for columna in columnas])
+        for bloque in bloques:
+            acumulador.actualizar(a_rangos(bloque, columnas, rangos))
+    else:
+        acumulador = AcumuladorCorrelacion(columnas, None if medias is None else np.nan_to_num(np.asarray(medias, dtype='float64')))
+        for bloque in bloques:
+            acumulador.actualizar(bloque)
+    return acumulador.matriz()
+
+
+# Los k pares de columnas distintas con mayor correlación en valor absoluto
+def pares_fuertes(correlacion, k=PARES_FUERTES):
+    valores = correlacion.to_numpy()
+    filas, columnas = np.triu_indices(len(valores), 1)
+    pares = pd.DataFrame({'columna_a': correlacion.index[filas], 'columna_b': correlacion.columns[columnas],
+                          'correlacion': valores[filas, columnas]}).dropna()
+    orden = pares['correlacion'].abs().sort_values(ascending=False, kind='stable').index
+    return pares.loc[orden[:k]].reset_index(drop=True)
+
+
+# Orden de las columnas por agrupamiento jerárquico (distancia 1 - |r|), que deja juntas las
+# columnas correlacionadas para que la estructura se vea en un heatmap ancho sin anotar
+def orden_jerarquico(correlacion):
+    if len(correlacion) < 3:
+        return list(correlacion.columns)
+    from scipy.cluster.hierarchy import leaves_list, linkage
+    from scipy.spatial.distance import squareform
+    distancia = 1 - np.abs(np.nan_to_num(correlacion.to_numpy()))
+    np.fill_diagonal(distancia, 0.0)
+    distancia = (distancia + distancia.T) / 2
+    orden = leaves_list(linkage(squareform(distancia, checks=False), method='average'))
+    return list(correlacion.columns[orden])
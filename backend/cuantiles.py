@@ -0,0 +1,73 @@
+import math
+import numpy as np
+
+
+# Error de rango por defecto de los cuantiles aproximados (0.001 = 0,1 % de las filas)
+ERROR_CUANTILES = 0.001
+
+
+# Resumen aproximado de una columna numérica para calcular cuantiles en una sola pasada (tipo KLL).
+# Los valores se guardan en niveles: cuando un nivel se llena se ordena y se sube al siguiente uno
+# de cada dos valores (empezando al azar en el primero o el segundo), que pasa a valer el doble.
+# La memoria crece con el logaritmo de las filas y dos resúmenes se combinan uniendo sus niveles,
+# así que se puede calcular por bloques o por particiones en paralelo y juntar al final.
+class SketchCuantiles:
+    def __init__(self, error=ERROR_CUANTILES, semilla=0):
+        self.error = error
+        self.k = max(8, math.ceil(1 / error)) # Valores que caben en cada nivel antes de compactarlo
+        self.n = 0
+        self.niveles = [np.empty(0)]
+        self._generador = np.random.default_rng(semilla)
+
+    # Añade los valores de un bloque (los nulos se ignoran)
+    def actualizar(self, valores):
+        valores = np.asarray(valores, dtype='float64')
+        valores = valores[~np.isnan(valores)]
+        self.n += len(valores)
+        self.niveles[0] = np.concatenate([self.niveles[0], valores])
+        self._compactar()
+        return self
+
+    # Incorpora otro resumen, por ejemplo el de otra partición
+    def combinar(self, otro):
+        self.n += otro.n
+        for nivel, valores in enumerate(otro.niveles):
+            if nivel == len(self.niveles):
+                self.niveles.append(np.empty(0))
+            self.niveles[nivel] = np.concatenate([self.niveles[nivel], valores])
+        self._compactar()
+        return self
+
+    # Sube al nivel siguiente la mitad de los valores de cada nivel lleno; el peso total no cambia
+    def _compactar(self):
+        nivel = 0
+        while nivel < len(self.niveles):
+            valores = self.niveles[nivel]
+            if len(valores) >= 2 * self.k:
+                valores = np.sort(valores)
+                sobrante = valores[len(valores) - len(valores) % 2:] # Con un número impar, el último se queda
+                pares = valores[:len(valores) - len(valores) % 2]
+                self.niveles[nivel] = sobrante
+                if nivel + 1 == len(self.niveles):
+                    self.niveles.append(np.empty(0))
+                self.niveles[nivel + 1] = np.concatenate([self.niveles[nivel + 1], pares[self._generador.integers(2)::2]])
+            nivel += 1
+
+    # Valores guardados ordenados con su peso (cuántas filas representa cada uno)
+    def _ponderados(self):
+        valores = np.concatenate(self.niveles)
+        pesos = np.concatenate([np.full(len(nivel), 2.0 ** i) for i, nivel in enumerate(self.niveles)])
+        orden = np.argsort(valores, kind='stable')
+        return valores[orden], pesos[orden]
+
+    # Cuantil con interpolación lineal entre valores, como pandas; es exacto mientras no se ha compactado
+    def cuantil(self, q):
+        if self.n == 0:
+            return np.nan
+        valores, pesos = self._ponderados()
+        centros = np.cumsum(pesos) - pesos / 2 # Posición (rango) que representa cada valor
+        return float(np.interp(q * (self.n - 1) + 0.5, centros, valores))
+
+    # Número de valores guardados (la memoria usada)
+    def tamano(self):
+        return sum(len(nivel) for nivel in self.niveles)
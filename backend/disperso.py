@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+
+# Categoría en la que se agrupan los valores poco frecuentes al limitar el One-Hot
+OTROS = 'otros'
+
+# Extensión de las matrices dispersas exportadas (formato de scipy.sparse.save_npz)
+EXTENSIONES_DISPERSAS = ('.npz',)
+
+
+# One-Hot con columnas dispersas de pandas (uint8 con relleno 0): solo se guardan las posiciones con un 1.
+# codigos tiene, para cada columna, la posición de la categoría de cada fila (-1 si no tiene ninguna)
+def one_hot_disperso(datos, codigos, categorias):
+    from scipy import sparse
+
+    partes = [datos.drop(columns=list(codigos))]
+    for columna, codigos_columna in codigos.items():
+        filas = np.flatnonzero(codigos_columna >= 0)
+        matriz = sparse.csr_matrix((np.ones(len(filas), dtype='uint8'), (filas, codigos_columna[filas])),
+                                   shape=(len(datos), len(categorias[columna])))
+        nombres = [f"{columna}_{categoria}" for categoria in categorias[columna]]
+        partes.append(pd.DataFrame.sparse.from_spmatrix(matriz, index=datos.index, columns=nombres))
+    return pd.concat(partes, axis=1)
+
+
+# Convierte las columnas dispersas en columnas normales de su mismo tipo (para Parquet y Feather,
+# que no admiten columnas dispersas de pandas y comprimen bien las columnas con muchos ceros)
+def densificar(datos):
+    dispersas = [columna for columna in datos.columns if isinstance(datos[columna].dtype, pd.SparseDtype)]
+    if not dispersas:
+        return datos
+    datos = datos.copy(deep=False)
+    for columna in dispersas:
+        datos[columna] = datos[columna].sparse.to_dense()
+    return datos
+
+
+# Columnas que no caben en una matriz dispersa (texto, fechas...): las que no son numéricas ni dispersas
+def columnas_no_numericas(datos):
+    return [columna for columna in datos.columns
+            if not isinstance(datos[columna].dtype, pd.SparseDtype) and not pd.api.types.is_numeric_dtype(datos[columna])]
+
+
+# Matriz CSR con todas las columnas numéricas: las dispersas sin pasar por su forma densa.
+# Devuelve la matriz y el nombre de sus columnas (primero las normales y después las dispersas)
+def matriz_dispersa(datos):
+    from scipy import sparse
+
+    dispersas = [columna for columna in datos.columns if isinstance(datos[columna].dtype, pd.SparseDtype)]
+    normales = [columna for columna in datos.columns if columna not in dispersas]
+    no_numericas = columnas_no_numericas(datos)
+    if no_numericas:
+        raise ValueError(f"La exportación dispersa solo admite columnas numéricas: {', '.join(map(str, no_numericas))}")
+
+    partes = []
+    if normales:
+        partes.append(sparse.csr_matrix(datos[normales].to_numpy(dtype='float64', na_value=np.nan)))
+    if dispersas:
+        partes.append(datos[dispersas].sparse.to_coo().tocsr())
+    return sparse.hstack(partes, format='csr'), normales + dispersas
+
+
+# Guarda una o varias matrices CSR (una por bloque, con las mismas columnas) en un .npz comprimido
+# que se puede leer con scipy.sparse.load_npz; los nombres de las columnas van en el array "columnas"
+# Devuelve el número de filas escritas
+def guardar_npz(matrices, columnas, archivo):
+    from scipy import sparse
+
+    matriz = sparse.vstack(matrices, format='csr') if len(matrices) != 1 else matrices[0]
+    np.savez_compressed(archivo, format=np.array('csr'), shape=np.array(matriz.shape), data=matriz.data,
+                        indices=matriz.indices, indptr=matriz.indptr, columnas=np.array([str(columna) for columna in columnas]))
+    return matriz.shape[0]
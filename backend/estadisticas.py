@@ -0,0 +1,298 @@
+import math
+import numpy as np
+import pandas as pd
+from backend.correlacion import correlacion_bloques
+from backend.cuantiles import SketchCuantiles
+from backend.tipos import es_numerica
+
+
+# Añade nuevas columnas a una serie de estadísticas acumuladas
+def _anadir(serie, nuevos):
+    return nuevos.copy() if serie.empty else pd.concat([serie, nuevos])
+
+
+# Cuantil exacto con interpolación lineal (igual que pandas) a partir de la frecuencia de cada valor.
+# Los valores numéricos se interpolan en float64: con los enteros pequeños del modo compacto (int8...)
+# la diferencia entre dos valores desbordaría
+def cuantil_frecuencias(frecuencias, q):
+    frecuencias = frecuencias.sort_index()
+    if frecuencias.empty:
+        return np.nan
+    valores = frecuencias.index.to_numpy(dtype='float64') if pd.api.types.is_numeric_dtype(frecuencias.index) else frecuencias.index.to_numpy()
+    acumulado = frecuencias.to_numpy().cumsum()
+    posicion = (acumulado[-1] - 1) * q
+    inferior = math.floor(posicion)
+    valor_inferior = valores[np.searchsorted(acumulado, inferior, side='right')]
+    if posicion == inferior:
+        return valor_inferior
+    valor_superior = valores[np.searchsorted(acumulado, inferior + 1, side='right')]
+    return valor_inferior + (posicion - inferior) * (valor_superior - valor_inferior)
+
+
+# Mediana exacta de cada columna dentro de cada grupo de la columna "por", combinando bloques.
+# En cada bloque se cuentan los pares (grupo, valor) con un único groupby, así que la memoria
+# depende del número de valores distintos y no de las filas. Devuelve {columna: {grupo: mediana}}
+def medianas_por_grupo(bloques, columnas, por):
+    frecuencias = {columna: pd.Series(dtype='int64') for columna in columnas}
+    for bloque in bloques:
+        for columna in columnas:
+            conteo = bloque.groupby([por, columna], observed=True).size()
+            frecuencias[columna] = conteo if frecuencias[columna].empty else frecuencias[columna].add(conteo, fill_value=0)
+    return {columna: {grupo: cuantil_frecuencias(serie.droplevel(0), 0.5) for grupo, serie in conteo.groupby(level=0)}
+            for columna, conteo in frecuencias.items()}
+
+
+# Acumula estadísticas por columna recorriendo los datos bloque a bloque.
+# Se pueden combinar bloques de cualquier tamaño, por lo que sirve tanto para un
+# DataFrame completo (un único bloque) como para un CSV leído por partes.
+# Solo las columnas en frecuencias guardan la frecuencia de cada valor (una entrada por valor distinto,
+# así que en una columna continua ocupa tanto como la propia columna); el resto solo acumula nulos y momentos.
+# Con un error, todas las columnas numéricas salvo las indicadas en exactas (que necesitan la moda) usan
+# en su lugar un resumen aproximado (SketchCuantiles) de memoria acotada, que se calcula siempre para
+# no tener que volver a recorrer los datos cuando un paso pide cuantiles. Un error 0 o None es exacto.
+class Estadisticas:
+    def __init__(self, columnas, frecuencias=(), error=None, exactas=()):
+        self.columnas = list(columnas)
+        self.columnas_frecuencias = list(frecuencias)
+        self.error = error
+        self.exactas = set(exactas)
+        self.sketches = {} # Resumen de cuantiles de cada columna numérica en modo aproximado
+        self.filas = 0
+        self.nulos = pd.Series(0, index=self.columnas, dtype='int64')
+
+        # Momentos de las columnas numéricas: conteo, media y suma de cuadrados de las desviaciones
+        self.conteo = pd.Series(dtype='int64')
+        self.media_ = pd.Series(dtype='float64')
+        self.m2 = pd.Series(dtype='float64')
+        self.minimo = pd.Series(dtype='float64')
+        self.maximo = pd.Series(dtype='float64')
+
+        # Frecuencia de cada valor (sirve para cuantiles exactos, moda y conjunto de categorías)
+        self.frecuencias = {columna: pd.Series(dtype='int64') for columna in self.columnas_frecuencias}
+
+    # Recorre todos los bloques y devuelve las estadísticas combinadas
+    @classmethod
+    def calcular(cls, bloques, columnas, frecuencias=(), error=None, exactas=()):
+        estadisticas = cls(columnas, frecuencias, error, exactas)
+        for bloque in bloques:
+            estadisticas.actualizar(bloque)
+        return estadisticas
+
+    # Estadísticas de un subconjunto de columnas, sin volver a recorrer los datos
+    def extraer(self, columnas):
+        columnas = list(columnas)
+        parcial = Estadisticas(columnas, [columna for columna in columnas if columna in self.frecuencias], self.error)
+        parcial.sketches = {columna: self.sketches[columna] for columna in columnas if columna in self.sketches}
+        parcial.filas = self.filas
+        parcial.nulos = self.nulos[columnas].copy()
+        numericas = [columna for columna in columnas if columna in self.conteo.index]
+        parcial.conteo = self.conteo[numericas].copy()
+        parcial.media_ = self.media_[numericas].copy()
+        parcial.m2 = self.m2[numericas].copy()
+        parcial.minimo = self.minimo[numericas].copy()
+        parcial.maximo = self.maximo[numericas].copy()
+        parcial.frecuencias = {columna: self.frecuencias[columna] for columna in parcial.columnas_frecuencias}
+        return parcial
+
+    # Junta estadísticas de columnas distintas calculadas sobre las mismas filas
+    @classmethod
+    def unir(cls, partes):
+        unidas = cls([columna for parte in partes for columna in parte.columnas],
+                     [columna for parte in partes for columna in parte.columnas_frecuencias],
+                     next((parte.error for parte in partes if parte.error is not None), None))
+        unidas.filas = max((parte.filas for parte in partes), default=0)
+        for parte in partes:
+            unidas.nulos[parte.columnas] = parte.nulos[parte.columnas]
+            if not parte.conteo.empty:
+                unidas.conteo = _anadir(unidas.conteo, parte.conteo)
+                unidas.media_ = _anadir(unidas.media_, parte.media_)
+                unidas.m2 = _anadir(unidas.m2, parte.m2)
+                unidas.minimo = _anadir(unidas.minimo, parte.minimo)
+                unidas.maximo = _anadir(unidas.maximo, parte.maximo)
+            unidas.frecuencias.update(parte.frecuencias)
+            unidas.sketches.update(parte.sketches)
+        return unidas
+
+    # Incorpora un bloque a las estadísticas acumuladas
+    def actualizar(self, bloque):
+        if self.error and self.filas == 0: # Con el primer bloque se decide qué columnas se resumen
+            for columna in self.columnas:
+                if columna not in self.exactas and es_numerica(bloque[columna]):
+                    if columna in self.frecuencias:
+                        self.columnas_frecuencias.remove(columna)
+                        del self.frecuencias[columna]
+                    self.sketches[columna] = SketchCuantiles(self.error)
+        self.filas += len(bloque)
+        self.nulos = self.nulos.add(bloque[self.columnas].isnull().sum(), fill_value=0).astype('int64')
+
+        numericas = [columna for columna in self.columnas if pd.api.types.is_numeric_dtype(bloque[columna])]
+        if numericas:
+            self._combinar_momentos(bloque[numericas])
+
+        for columna in self.columnas_frecuencias:
+            conteo = bloque[columna].value_counts()
+            conteo = conteo[conteo > 0] # Las columnas category cuentan también las categorías sin filas
+            self.frecuencias[columna] = self.frecuencias[columna].add(conteo, fill_value=0).astype('int64')
+        for columna, sketch in self.sketches.items():
+            sketch.actualizar(bloque[columna].to_numpy(dtype='float64', na_value=np.nan))
+
+    # Combina media y varianza con la fórmula paralela de Chan para no guardar las filas
+    def _combinar_momentos(self, numericos):
+        conteo_b = numericos.count()
+        media_b = numericos.mean()
+        m2_b = numericos.var(ddof=0) * conteo_b
+        minimo_b = numericos.min()
+        maximo_b = numericos.max()
+
+        nuevas = conteo_b.index.difference(self.conteo.index)
+        if len(nuevas): # Primera vez que se ve la columna: se toman los valores del bloque tal cual
+            self.conteo = _anadir(self.conteo, conteo_b[nuevas])
+            self.media_ = _anadir(self.media_, media_b[nuevas])
+            self.m2 = _anadir(self.m2, m2_b[nuevas].fillna(0.0))
+            self.minimo = _anadir(self.minimo, minimo_b[nuevas])
+            self.maximo = _anadir(self.maximo, maximo_b[nuevas])
+
+        existentes = conteo_b.index.difference(nuevas)
+        if len(existentes):
+            n_a = self.conteo[existentes].astype('float64')
+            n_b = conteo_b[existentes].astype('float64')
+            n = n_a + n_b
+            delta = (media_b[existentes] - self.media_[existentes]).fillna(0.0)
+            # Si uno de los dos lados está vacío se conserva el otro sin operar
+            media = np.where(n_a == 0, media_b[existentes], np.where(n_b == 0, self.media_[existentes], self.media_[existentes] + delta * n_b / n.where(n > 0, 1)))
+            m2 = self.m2[existentes] + m2_b[existentes].fillna(0.0) + delta ** 2 * n_a * n_b / n.where(n > 0, 1)
+
+            self.conteo[existentes] = n.astype('int64')
+            self.media_[existentes] = media
+            self.m2[existentes] = m2
+            self.minimo[existentes] = pd.concat([self.minimo[existentes], minimo_b[existentes]], axis=1).min(axis=1)
+            self.maximo[existentes] = pd.concat([self.maximo[existentes], maximo_b[existentes]], axis=1).max(axis=1)
+
+    # Columnas para las que se han acumulado momentos (las numéricas)
+    def numericas(self):
+        return list(self.conteo.index)
+
+    def media(self, columnas=None):
+        return self.media_[columnas if columnas is not None else self.numericas()]
+
+    # Desviación estándar; por defecto la poblacional (ddof=0), como la de StandardScaler
+    def desviacion(self, columnas=None, ddof=0):
+        columnas = columnas if columnas is not None else self.numericas()
+        divisor = self.conteo[columnas] - ddof
+        return np.sqrt(self.m2[columnas] / divisor.where(divisor > 0))
+
+    # Cuantil exacto con interpolación lineal (igual que pandas) a partir de las frecuencias
+    def cuantil(self, columna, q):
+        if columna in self.sketches:
+            return self.sketches[columna].cuantil(q)
+        if columna not in self.frecuencias:
+            raise ValueError(f"Los cuantiles de '{columna}' necesitan sus frecuencias o un resumen de cuantiles")
+        return cuantil_frecuencias(self.frecuencias[columna], q)
+
+    def mediana(self, columna):
+        return self.cuantil(columna, 0.5)
+
+    # Valor más frecuente; en caso de empate el menor, como DataFrame.mode().iloc[0]
+    def moda(self, columna):
+        if columna not in self.frecuencias:
+            raise ValueError(f"La moda de '{columna}' necesita las frecuencias exactas de sus valores")
+        frecuencias = self.frecuencias[columna].sort_index()
+        if frecuencias.empty:
+            return np.nan
+        return frecuencias.idxmax()
+
+    # Conjunto ordenado de valores distintos de la columna
+    def categorias(self, columna):
+        return sorted(self.frecuencias[columna].index)
+
+
+# Estadísticas por columna calculadas una vez y compartidas por todos los pasos.
+# Las columnas que faltan se calculan juntas en una sola pasada (nulos, momentos y, solo para las que
+# piden cuantiles, moda o categorías, frecuencias o resumen de cuantiles) y al aplicar un paso solo se
+# descartan las columnas que ese paso modifica.
+class CacheEstadisticas:
+    def __init__(self, bloques, error=None):
+        self.bloques = bloques # Función que devuelve los datos a recorrer (en memoria o por bloques)
+        self.error = error # Error de los cuantiles aproximados (None = exactos)
+        self.pasadas = 0 # Número de recorridos completos de los datos
+        self.invalidar()
+
+    # Descarta las estadísticas de las columnas indicadas, o de todas con None
+    # (también los histogramas y la matriz de correlación que dependen de ellas)
+    def invalidar(self, columnas=None):
+        if columnas is None:
+            self.estadisticas = Estadisticas([], error=self.error)
+            self.conteos_histograma = {} # {(columna, intervalos): (conteos, bordes)}
+            self.correlaciones = {} # Matriz de correlación ya calculada de cada método (DataFrame)
+        else:
+            descartadas = set(columnas)
+            self.estadisticas = self.estadisticas.extraer([columna for columna in self.estadisticas.columnas if columna not in descartadas])
+            self.conteos_histograma = {clave: valor for clave, valor in self.conteos_histograma.items() if clave[0] not in descartadas}
+            self.correlaciones = {metodo: matriz for metodo, matriz in self.correlaciones.items() if not descartadas & set(matriz.columns)}
+
+    # Incorpora las estadísticas e histogramas que otra caché ha calculado sobre los mismos datos
+    # (p. ej. el perfil en segundo plano), sin volver a recorrerlos
+    def incorporar(self, otra):
+        self.invalidar(otra.columnas())
+        self.estadisticas = Estadisticas.unir([self.estadisticas, otra.estadisticas])
+        self.conteos_histograma.update(otra.conteos_histograma)
+
+    # Columnas cuyas estadísticas están calculadas y siguen siendo válidas
+    def columnas(self):
+        return list(self.estadisticas.columnas)
+
+    # Devuelve las estadísticas de las columnas pedidas, recorriendo los datos solo si falta alguna.
+    # Las columnas en exactas tienen siempre la frecuencia de cada valor (moda y categorías) y las de
+    # cuantiles, sus frecuencias o, con un error, su resumen aproximado; el resto solo nulos y momentos
+    def obtener(self, columnas, exactas=(), cuantiles=()):
+        columnas = list(dict.fromkeys(columnas))
+        exactas, cuantiles = set(exactas), set(cuantiles)
+        calculadas = self.estadisticas
+        faltan = [columna for columna in columnas if columna not in calculadas.nulos.index
+                  or (columna in exactas and columna not in calculadas.frecuencias)
+                  or (columna in cuantiles and columna not in calculadas.frecuencias and columna not in calculadas.sketches)]
+        if faltan:
+            nuevas = Estadisticas.calcular(self.bloques(), faltan, [columna for columna in faltan if columna in exactas | cuantiles],
+                                           self.error, [columna for columna in faltan if columna in exactas])
+            self.pasadas += 1
+            self.invalidar(faltan)
+            self.estadisticas = Estadisticas.unir([self.estadisticas, nuevas])
+        return self.estadisticas.extraer(columnas)
+
+    # Conteos del histograma de cada columna numérica con numpy.histogram: los bordes salen del mínimo y el
+    # máximo ya calculados y los conteos de cada bloque se suman, así que todas las columnas que faltan se
+    # cuentan en una sola pasada y después se reutilizan hasta que un paso modifique la columna
+    def histogramas(self, columnas, intervalos):
+        faltan = [columna for columna in dict.fromkeys(columnas) if (columna, intervalos) not in self.conteos_histograma]
+        if faltan:
+            estadisticas = self.obtener(faltan)
+            rangos = {}
+            for columna in faltan:
+                minimo, maximo = estadisticas.minimo.get(columna, np.nan), estadisticas.maximo.get(columna, np.nan)
+                rangos[columna] = (0.0, 1.0) if np.isnan(minimo) else (float(minimo), float(maximo))
+            conteos = {columna: np.zeros(intervalos, dtype='int64') for columna in faltan}
+            for bloque in self.bloques():
+                for columna in faltan:
+                    valores = bloque[columna].to_numpy(dtype='float64', na_value=np.nan)
+                    conteos[columna] += np.histogram(valores[~np.isnan(valores)], intervalos, rangos[columna])[0]
+            self.pasadas += 1
+            for columna in faltan:
+                self.conteos_histograma[(columna, intervalos)] = (conteos[columna], np.histogram_bin_edges([], intervalos, rangos[columna]))
+        return {columna: self.conteos_histograma[(columna, intervalos)] for columna in columnas}
+
+    # Matriz de correlación de las columnas numéricas acumulada bloque a bloque (una pasada, sin guardar
+    # las filas); se reutiliza mientras ningún paso modifique sus columnas. Pearson toma como
+    # desplazamiento las medias ya calculadas y Spearman los rangos de la frecuencia exacta de cada valor
+    def correlacion(self, columnas, metodo='pearson'):
+        columnas = list(dict.fromkeys(columnas))
+        guardada = self.correlaciones.get(metodo)
+        if guardada is None or not set(columnas) <= set(guardada.columns):
+            if metodo == 'spearman':
+                estadisticas = self.obtener(columnas, exactas=columnas)
+                guardada = correlacion_bloques(self.bloques(), columnas, metodo, frecuencias=estadisticas.frecuencias)
+            else:
+                estadisticas = self.obtener(columnas)
+                guardada = correlacion_bloques(self.bloques(), columnas, metodo, medias=estadisticas.media_.reindex(columnas))
+            self.pasadas += 1
+            self.correlaciones[metodo] = guardada
+        return guardada.loc[columnas, columnas]
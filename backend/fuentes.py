@@ -0,0 +1,211 @@
+import atexit
+import operator
+import os
+import re
+import sqlite3
+from urllib.request import pathname2url
+import pandas as pd
+
+
+# Número de filas que se leen para mostrar una fuente antes de elegir columnas
+FILAS_VISTA_PREVIA = 5
+
+# Ajustes de lectura de SQLite: hasta 256 MB mapeados en memoria y 64 MB de caché de páginas
+MMAP_SQLITE = 256 * 1024**2
+CACHE_SQLITE_KB = 64 * 1024
+
+# Conexiones abiertas por ruta absoluta; se reutilizan durante toda la sesión
+_conexiones = {}
+
+# Filas de CSV que se leen de una vez cuando hay que filtrarlas después de leerlas
+FILAS_FILTRO_CSV = 100_000
+
+# Extensiones de los formatos columnares de Arrow
+EXTENSIONES_PARQUET = ('.parquet',)
+EXTENSIONES_FEATHER = ('.feather', '.arrow')
+
+# Condición simple de un filtro para Parquet, Feather, CSV y Excel: columna operador valor
+_CONDICION = re.compile(r'^\s*("[^"]+"|[\w.]+)\s*(==|=|!=|<=|>=|<|>)\s*(.+?)\s*$')
+_OPERADORES = {'=': operator.eq, '==': operator.eq, '!=': operator.ne,
+               '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+
+
+# Pone entre comillas dobles un nombre de tabla o columna de SQLite
+def citar(nombre):
+    return '"' + str(nombre).replace('"', '""') + '"'
+
+
+# Devuelve la conexión de solo lectura a una base SQLite, abriéndola la primera vez
+def conectar(ruta):
+    ruta = os.path.abspath(ruta)
+    if ruta not in _conexiones:
+        conexion = sqlite3.connect(f"file:{pathname2url(ruta)}?mode=ro", uri=True, check_same_thread=False)
+        conexion.execute(f"PRAGMA mmap_size = {MMAP_SQLITE}")
+        conexion.execute(f"PRAGMA cache_size = -{CACHE_SQLITE_KB}")
+        conexion.execute("PRAGMA query_only = ON")
+        _conexiones[ruta] = conexion
+    return _conexiones[ruta]
+
+
+# Cierra las conexiones abiertas (también al terminar el programa)
+@atexit.register
+def cerrar_conexiones():
+    for conexion in _conexiones.values():
+        conexion.close()
+    _conexiones.clear()
+
+
+# Devuelve los nombres de las tablas de una base de datos SQLite
+def listar_tablas(ruta):
+    tablas = pd.read_sql("SELECT name FROM sqlite_master WHERE type='table';", conectar(ruta))
+    return list(tablas['name'])
+
+
+# Construye la consulta con la proyección de columnas y el filtro resueltos en SQLite
+# El filtro es una condición SQL escrita por el usuario (lo que iría tras WHERE)
+def consulta_sqlite(tabla, columnas=None, filtro=None, filas=None):
+    seleccion = ", ".join(citar(columna) for columna in columnas) if columnas else "*"
+    consulta = f"SELECT {seleccion} FROM {citar(tabla)}"
+    if filtro:
+        consulta += f" WHERE {filtro}"
+    if filas is not None:
+        consulta += f" LIMIT {int(filas)}"
+    return consulta
+
+
+# Separa un filtro sencillo como "median_income > 3 and ocean_proximity = 'INLAND'" en sus
+# condiciones: [(columna, operador, valor)], con los valores sin comillas ya convertidos a número
+def condiciones_filtro(filtro):
+    condiciones = []
+    for condicion in re.split(r'\s+and\s+', filtro.strip(), flags=re.IGNORECASE):
+        partes = _CONDICION.match(condicion)
+        if not partes:
+            raise ValueError(f"Condición de filtro no válida: {condicion}")
+        columna, operador, valor = partes.groups()
+        columna = columna.strip('"')
+        if valor[0] in "'\"" and valor[-1] == valor[0]: # Texto entre comillas
+            valor = valor[1:-1]
+        else:
+            try:
+                valor = int(valor)
+            except ValueError:
+                valor = float(valor)
+        condiciones.append((columna, operador, valor))
+    return condiciones
+
+
+# Convierte un filtro sencillo en una expresión de pyarrow, que permite descartar grupos de filas enteros al leer
+def expresion_arrow(filtro):
+    import pyarrow.dataset as ds
+
+    expresion = None
+    for columna, operador, valor in condiciones_filtro(filtro):
+        termino = _OPERADORES[operador](ds.field(columna), valor)
+        expresion = termino if expresion is None else expresion & termino
+    return expresion
+
+
+# Columnas que hay que leer para aplicar el filtro además de las pedidas (None = todas)
+def _columnas_filtro(columnas, filtro):
+    if columnas is None:
+        return None
+    return list(columnas) + [columna for columna, _, _ in condiciones_filtro(filtro) if columna not in columnas]
+
+
+# Filas de un DataFrame ya leído que cumplen el filtro (CSV y Excel no pueden filtrar al leer). Como en
+# SQLite y Arrow, los nulos no cumplen ninguna condición. Las columnas leídas solo para filtrar se descartan
+def filtrar(datos, filtro, columnas=None):
+    mascara = pd.Series(True, index=datos.index)
+    for columna, operador, valor in condiciones_filtro(filtro):
+        mascara &= _OPERADORES[operador](datos[columna], valor) & datos[columna].notna()
+    datos = datos[mascara.to_numpy()].reset_index(drop=True)
+    if columnas is not None:
+        datos = datos.drop(columns=[columna for columna in datos.columns if columna not in columnas])
+    return datos
+
+
+# Lee un CSV por bloques aplicando el filtro a cada uno; los bloques filtrados pueden tener menos filas
+def _leer_csv_filtrado(ruta, tamano_bloque, columnas, filtro):
+    for bloque in pd.read_csv(ruta, chunksize=tamano_bloque, usecols=_columnas_filtro(columnas, filtro)):
+        bloque = filtrar(bloque, filtro, columnas)
+        if len(bloque):
+            yield bloque
+
+
+# Abre un archivo Parquet o Feather como dataset de Arrow con lectura mapeada en memoria
+def _dataset_arrow(ruta):
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+
+    formato = 'parquet' if ruta.endswith(EXTENSIONES_PARQUET) else 'feather'
+    return ds.dataset(os.path.abspath(ruta), format=formato, filesystem=fs.LocalFileSystem(use_mmap=True))
+
+
+# Lee un Parquet o Feather con proyección de columnas y filtro; en Parquet el filtro usa
+# las estadísticas de cada grupo de filas para no leer los que no pueden cumplirlo
+def leer_arrow(ruta, columnas=None, filas=None, filtro=None):
+    dataset = _dataset_arrow(ruta)
+    expresion = expresion_arrow(filtro) if filtro else None
+    if filas is not None:
+        tabla = dataset.head(filas, columns=columnas, filter=expresion)
+    else:
+        tabla = dataset.to_table(columns=columnas, filter=expresion)
+    return tabla.to_pandas()
+
+
+# Lee un Parquet o Feather por lotes de Arrow del tamaño indicado
+def leer_arrow_bloques(ruta, tamano_bloque, columnas=None, filtro=None):
+    dataset = _dataset_arrow(ruta)
+    expresion = expresion_arrow(filtro) if filtro else None
+    for lote in dataset.to_batches(columns=columnas, filter=expresion, batch_size=tamano_bloque):
+        if lote.num_rows:
+            yield lote.to_pandas()
+
+
+# Lee una fuente por bloques de tamaño fijo: CSV con chunksize de read_csv, SQLite con el de read_sql
+# y Parquet/Feather por lotes de Arrow. En CSV el filtro se aplica a cada bloque
+def leer_fuente_bloques(ruta, tamano_bloque, tabla=None, columnas=None, filtro=None):
+    if ruta.endswith('.csv'):
+        if filtro:
+            return _leer_csv_filtrado(ruta, tamano_bloque, columnas, filtro)
+        return pd.read_csv(ruta, chunksize=tamano_bloque, usecols=columnas)
+    elif ruta.endswith(('.sqlite', '.db')):
+        return pd.read_sql(consulta_sqlite(tabla, columnas, filtro), conectar(ruta), chunksize=tamano_bloque)
+    elif ruta.endswith(EXTENSIONES_PARQUET + EXTENSIONES_FEATHER):
+        return leer_arrow_bloques(ruta, tamano_bloque, columnas, filtro)
+    raise ValueError(f"La lectura por bloques no está disponible para {ruta}")
+
+
+# Lee una fuente completa o solo las columnas y el número de filas indicados
+# Con filas pequeño sirve para consultar el esquema sin cargar los datos. Las primeras filas que
+# cumplen el filtro de un CSV se buscan por bloques; un Excel se lee entero y se filtra después
+def leer_fuente(ruta, tabla=None, columnas=None, filas=None, filtro=None):
+    if ruta.endswith('.csv'):
+        if not filtro:
+            return pd.read_csv(ruta, usecols=columnas, nrows=filas)
+        partes = []
+        encontradas = 0
+        for bloque in _leer_csv_filtrado(ruta, FILAS_FILTRO_CSV, columnas, filtro):
+            partes.append(bloque)
+            encontradas += len(bloque)
+            if filas is not None and encontradas >= filas: # La vista previa para al reunir las filas pedidas
+                break
+        if partes:
+            datos = pd.concat(partes, ignore_index=True)
+        else: # Ninguna fila cumple el filtro: solo las columnas
+            datos = filtrar(pd.read_csv(ruta, usecols=_columnas_filtro(columnas, filtro), nrows=0), filtro, columnas)
+        return datos if filas is None else datos.head(filas)
+
+    elif ruta.endswith(('.xlsx', '.xls')):
+        if not filtro:
+            return pd.read_excel(ruta, usecols=columnas, nrows=filas)
+        datos = filtrar(pd.read_excel(ruta, usecols=_columnas_filtro(columnas, filtro)), filtro, columnas)
+        return datos if filas is None else datos.head(filas)
+
+    elif ruta.endswith(('.sqlite', '.db')): # La proyección y el filtro se resuelven en la propia consulta
+        return pd.read_sql(consulta_sqlite(tabla, columnas, filtro, filas), conectar(ruta))
+
+    elif ruta.endswith(EXTENSIONES_PARQUET + EXTENSIONES_FEATHER):
+        return leer_arrow(ruta, columnas, filas, filtro)
+
+    raise ValueError(f"Tipo de archivo no soportado: {ruta}")
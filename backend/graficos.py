@@ -0,0 +1,121 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from backend.correlacion import COLUMNAS_ANOTADAS, orden_jerarquico
+
+
+# Puntos que se dibujan como máximo por serie: el tiempo de dibujo no depende del número de filas
+PUNTOS_GRAFICO = 2000
+
+# Gráficos sin pantalla: se dibujan con el backend Agg de matplotlib y se guardan en un directorio de informe
+FORMATOS_GRAFICOS = ('png', 'svg')
+INTERVALOS_HISTOGRAMA = 20
+
+
+# Reducción Largest-Triangle-Three-Buckets (LTTB): divide la serie en cubos consecutivos y de cada uno
+# se queda con el punto que forma el triángulo de mayor área con el punto elegido en el cubo anterior y
+# la media del siguiente, de modo que se conservan los picos y la forma de la serie.
+# Devuelve las posiciones elegidas (todas si la serie ya tiene menos puntos)
+def lttb(x, y, puntos=PUNTOS_GRAFICO):
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    n = len(x)
+    if n <= puntos or puntos < 3:
+        return np.arange(n)
+
+    # El primer y el último punto se conservan; los demás se reparten en puntos - 2 cubos
+    limites = np.linspace(1, n - 1, puntos - 1).astype('int64')
+    suma_x = np.concatenate([[0.0], np.cumsum(x)])
+    suma_y = np.concatenate([[0.0], np.cumsum(y)])
+    elegidos = np.empty(puntos, dtype='int64')
+    elegidos[0], elegidos[-1] = 0, n - 1
+    anterior = 0
+    for i in range(puntos - 2):
+        inicio, fin = limites[i], limites[i + 1]
+        if i + 2 < len(limites): # Media del cubo siguiente
+            siguiente, final = limites[i + 1], limites[i + 2]
+            media_x = (suma_x[final] - suma_x[siguiente]) / (final - siguiente)
+            media_y = (suma_y[final] - suma_y[siguiente]) / (final - siguiente)
+        else: # El último cubo se compara con el último punto
+            media_x, media_y = x[-1], y[-1]
+        areas = np.abs((x[anterior] - media_x) * (y[inicio:fin] - y[anterior])
+                       - (x[anterior] - x[inicio:fin]) * (media_y - y[anterior]))
+        anterior = inicio + int(np.argmax(areas))
+        elegidos[i + 1] = anterior
+    return elegidos
+
+
+# Posiciones de las filas a dibujar de una columna: las que no son nulas, reducidas con LTTB
+def puntos_dispersion(valores, puntos=PUNTOS_GRAFICO):
+    valores = np.asarray(valores, dtype='float64')
+    posiciones = np.flatnonzero(~np.isnan(valores))
+    return posiciones[lttb(posiciones, valores[posiciones], puntos)]
+
+
+# Nombre de archivo válido para una columna
+def _nombre_archivo(columna):
+    return re.sub(r'[^\w.-]+', '_', str(columna)).strip('_') or 'columna'
+
+
+# Figura de matplotlib sin pyplot ni pantalla, asociada al lienzo Agg
+def _figura(**opciones):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    figura = Figure(**opciones)
+    FigureCanvasAgg(figura)
+    return figura
+
+
+# Dibuja y guarda el histograma de una columna a partir de sus conteos (se ejecuta en un proceso del pool)
+def _guardar_histograma(tarea):
+    columna, conteos, bordes, ruta = tarea
+    figura = _figura(figsize=(6, 4))
+    eje = figura.add_subplot()
+    eje.stairs(conteos, bordes, fill=True)
+    eje.set_title(f"Histograma de {columna}")
+    figura.tight_layout()
+    figura.savefig(ruta)
+    return ruta
+
+
+# Guarda un histograma por columna ({columna: (conteos, bordes)}) en el directorio, repartiendo las
+# figuras entre procesos (uno por núcleo por defecto). Devuelve las rutas en el orden de las columnas
+def guardar_histogramas(histogramas, directorio, formato='png', procesos=None):
+    if formato not in FORMATOS_GRAFICOS:
+        raise ValueError(f"Formato de gráfico desconocido: {formato}")
+    os.makedirs(directorio, exist_ok=True)
+    tareas = [(columna, conteos, bordes, os.path.join(directorio, f"histograma_{_nombre_archivo(columna)}.{formato}"))
+              for columna, (conteos, bordes) in histogramas.items()]
+    procesos = min(procesos or os.cpu_count() or 1, len(tareas))
+    if procesos <= 1:
+        return [_guardar_histograma(tarea) for tarea in tareas]
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        return list(pool.map(_guardar_histograma, tareas))
+
+
+# Dibuja el heatmap de una matriz de correlación en un eje. Hasta COLUMNAS_ANOTADAS columnas se anota cada
+# celda; con más, las columnas se ordenan por agrupamiento jerárquico y no se anotan (la cuadrícula
+# anotada crece con el cuadrado de las columnas y deja de leerse)
+def dibujar_heatmap(correlacion, eje):
+    import seaborn as sns
+    if len(correlacion) > COLUMNAS_ANOTADAS:
+        orden = orden_jerarquico(correlacion)
+        sns.heatmap(correlacion.loc[orden, orden], cmap="coolwarm", vmin=-1, vmax=1, ax=eje)
+    else:
+        sns.heatmap(correlacion, annot=True, cmap="coolwarm", fmt=".2f", ax=eje)
+
+
+# Guarda el heatmap de una matriz de correlación y devuelve su ruta
+def guardar_heatmap(correlacion, directorio, formato='png'):
+    if formato not in FORMATOS_GRAFICOS:
+        raise ValueError(f"Formato de gráfico desconocido: {formato}")
+    os.makedirs(directorio, exist_ok=True)
+    figura = _figura(figsize=(10, 6))
+    eje = figura.add_subplot()
+    dibujar_heatmap(correlacion, eje)
+    eje.set_title("Heatmap de correlación de variables numéricas")
+    figura.tight_layout()
+    ruta = os.path.join(directorio, f"correlacion.{formato}")
+    figura.savefig(ruta)
+    return ruta
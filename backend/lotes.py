@@ -0,0 +1,94 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from backend.fuentes import EXTENSIONES_FEATHER, EXTENSIONES_PARQUET
+from backend.pipeline import cargar_especificacion, ejecutar_pipeline
+from backend.salida_csv import EXTENSIONES_CSV
+
+
+# Extensiones de las fuentes que se aceptan como entrada de un lote
+EXTENSIONES_LOTE = ('.csv', '.xlsx', '.xls', '.sqlite', '.db') + EXTENSIONES_PARQUET + EXTENSIONES_FEATHER
+
+
+# Devuelve los archivos de entrada a partir de un directorio o de un patrón glob (p. ej. "datos/*.csv")
+def expandir_entradas(entradas):
+    if os.path.isdir(entradas):
+        rutas = [os.path.join(entradas, nombre) for nombre in os.listdir(entradas)]
+    else:
+        rutas = glob.glob(entradas, recursive=True)
+    return sorted(ruta for ruta in rutas if os.path.isfile(ruta) and ruta.endswith(EXTENSIONES_LOTE))
+
+
+# Ejecuta el pipeline sobre un archivo dentro de un proceso del lote; los errores se devuelven
+# en el resumen para que un archivo fallido no detenga el resto
+def _procesar(especificacion, opciones):
+    inicio = time.perf_counter()
+    try:
+        return ejecutar_pipeline(especificacion, **opciones)
+    except Exception as e:
+        return {'fuente': especificacion['fuente'], 'salida': especificacion['exportar'],
+                'filas_entrada': None, 'filas_salida': None,
+                'segundos': time.perf_counter() - inicio, 'error': f"{type(e).__name__}: {e}"}
+
+
+# Aplica la misma especificación a cada archivo de entrada con un pool de procesos (uno por núcleo
+# por defecto) y escribe una salida por entrada en el directorio indicado, con el nombre de la
+# entrada y la extensión de "exportar" de la especificación (CSV si no se indica).
+# Devuelve los resúmenes de cada archivo, en el orden de las entradas, y los totales del lote
+def ejecutar_lote(especificacion, entradas, directorio_salida, procesos=None, **opciones):
+    if isinstance(especificacion, str):
+        especificacion = cargar_especificacion(especificacion)
+    rutas = expandir_entradas(entradas) if isinstance(entradas, str) else list(entradas)
+    if not rutas:
+        raise ValueError(f"No se encontraron archivos de entrada en {entradas}")
+
+    exportar = especificacion.get('exportar') or '.csv'
+    extension = next((extension for extension in EXTENSIONES_CSV if extension != '.csv' and exportar.endswith(extension)),
+                     os.path.splitext(exportar)[1] or '.csv') # .csv.gz y similares conservan las dos extensiones
+    nombres = [os.path.splitext(os.path.basename(ruta))[0] for ruta in rutas]
+    repetidos = sorted({nombre for nombre in nombres if nombres.count(nombre) > 1})
+    if repetidos:
+        raise ValueError(f"Varias entradas escribirían la misma salida: {', '.join(repetidos)}")
+    os.makedirs(directorio_salida, exist_ok=True)
+
+    # Los núcleos se reparten entre los procesos del lote: los hilos de KNN y anomalías y los procesos de los
+    # histogramas de cada archivo usan solo su parte (uno por proceso con tantos procesos como núcleos)
+    procesos = min(procesos or os.cpu_count() or 1, len(rutas))
+    n_jobs = max(1, (os.cpu_count() or 1) // procesos)
+
+    tareas = []
+    opciones_tareas = [] # Cada entrada guarda sus gráficos y su perfil aparte
+    for ruta, nombre in zip(rutas, nombres):
+        tarea = dict(especificacion)
+        tarea['fuente'] = ruta
+        tarea['exportar'] = os.path.join(directorio_salida, nombre + extension)
+        tareas.append(tarea)
+        opciones_tarea = dict(opciones)
+        opciones_tarea.setdefault('n_jobs', n_jobs)
+        if opciones.get('informe'):
+            opciones_tarea['informe'] = os.path.join(opciones['informe'], nombre)
+        if opciones.get('perfil'): # perfil.html -> perfil_<entrada>.html
+            raiz, extension_perfil = os.path.splitext(opciones['perfil'])
+            opciones_tarea['perfil'] = f"{raiz}_{nombre}{extension_perfil}"
+        opciones_tareas.append(opciones_tarea)
+
+    inicio = time.perf_counter()
+    resultados = [None] * len(tareas)
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        # Los archivos más grandes se envían primero para que los procesos terminen a la vez
+        orden = sorted(range(len(tareas)), key=lambda i: os.path.getsize(rutas[i]), reverse=True)
+        futuros = {pool.submit(_procesar, tareas[i], opciones_tareas[i]): i for i in orden}
+        for futuro in as_completed(futuros):
+            resultados[futuros[futuro]] = futuro.result()
+
+    correctos = [resultado for resultado in resultados if 'error' not in resultado]
+    return {
+        'resultados': resultados,
+        'archivos': len(resultados),
+        'fallos': len(resultados) - len(correctos),
+        'filas_entrada': sum(resultado['filas_entrada'] or 0 for resultado in correctos),
+        'filas_salida': sum(resultado['filas_salida'] for resultado in correctos),
+        'procesos': procesos,
+        'segundos': time.perf_counter() - inicio,
+    }
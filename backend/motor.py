@@ -0,0 +1,662 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from backend.anomalias import CONTAMINACION, MUESTRA_ANOMALIAS, ajustar_anomalias, mascara_anomalias
+from backend.artefacto import cargar_artefacto, crear_artefacto, guardar_artefacto, pasos_transformacion
+from backend.atipicos import limites_iqr, mascara_atipicos
+from backend.bloques import leer_bloques, exportar_bloques
+from backend.codificadores import COLUMNAS_HASH, PLIEGUES_TARGET, SUAVIZADO_TARGET, ajustar_target
+from backend.correlacion import COLUMNAS_ANOTADAS, PARES_FUERTES, pares_fuertes
+from backend.cuantiles import ERROR_CUANTILES
+from backend.disperso import EXTENSIONES_DISPERSAS, OTROS, columnas_no_numericas, densificar, guardar_npz, matriz_dispersa
+from backend.estadisticas import CacheEstadisticas, medianas_por_grupo
+from backend.fuentes import EXTENSIONES_FEATHER, EXTENSIONES_PARQUET, FILAS_VISTA_PREVIA, leer_fuente, listar_tablas
+from backend.graficos import FORMATOS_GRAFICOS, INTERVALOS_HISTOGRAMA, guardar_heatmap, guardar_histogramas
+from backend.perfil import EXTENSIONES_PERFIL, calcular_perfil, guardar_perfil
+from backend.salida_csv import EXTENSIONES_CSV, escribir_csv
+from backend.salida_sqlite import EXTENSIONES_SQLITE, TABLA_SQLITE, escribir_sqlite
+from backend.vecinos import MUESTRA_KNN, VECINOS_KNN, ajustar_knn
+from backend.transformaciones import aplicar_paso, columnas_modificadas
+from backend.tipos import compactar, es_categorica, es_numerica, memoria
+
+
+# Estrategias disponibles en cada paso del preprocesado
+ESTRATEGIAS_NULOS = ('eliminar', 'media', 'mediana', 'moda', 'constante', 'mediana_grupo', 'knn')
+ESTRATEGIAS_COLUMNA_NUMERICA = ('media', 'mediana', 'moda', 'constante', 'mediana_grupo')
+ESTRATEGIAS_COLUMNA_CATEGORICA = ('moda', 'constante')
+ESTRATEGIAS_CATEGORICOS = ('one_hot', 'one_hot_disperso', 'label', 'hash', 'frecuencia', 'conteo', 'target')
+ESTRATEGIAS_NORMALIZACION = ('minmax', 'zscore', 'robusto')
+ESTRATEGIAS_ATIPICOS = ('eliminar', 'mediana', 'mantener')
+METODOS_ATIPICOS = ('iqr', 'isolation_forest', 'mahalanobis', 'lof')
+
+
+# Motor de preprocesado sin interacción: carga, selección de columnas, pasos 2.2 a 2.5 y exportación.
+# Cada paso recibe la estrategia como parámetro, por lo que se puede usar desde scripts o desde el
+# menú interactivo (que solo pregunta al usuario y llama a estos métodos).
+class Preprocesador:
+    def __init__(self, tamano_bloque=None, compacto=False, proyectar=False, filtro=None,
+                 compresion=None, filas_grupo=None, cache=None, error_cuantiles=None, float32=False,
+                 informe=None, formato_graficos='png', perfil=None, n_jobs=None, verboso=True):
+        self.ruta = None
+        self.datos = None
+        self.features = []
+        self.targets = None
+        self.filas_entrada = None # Filas de la fuente antes de aplicar ningún paso
+
+        # Con un tamaño de bloque los CSV y las tablas SQLite se procesan por partes: self.datos guarda solo
+        # el primer bloque como muestra y los pasos se repiten bloque a bloque al exportar
+        self.tamano_bloque = tamano_bloque
+        self.por_bloques = False
+        self.transformaciones = [] # Pasos ya ajustados, en orden de aplicación
+
+        # Con el modo compacto se reducen los tipos de las columnas al cargar para ocupar menos memoria. No se
+        # admite por bloques: cada bloque podría reducirse a tipos distintos y la memoria ya la limita el bloque
+        if compacto and tamano_bloque:
+            raise ValueError("El modo compacto no se puede combinar con la carga por bloques")
+        self.compacto = compacto
+
+        # Con la carga por columnas se lee primero el esquema y, tras la selección, solo las columnas elegidas
+        self.proyectar = proyectar
+        self.proyeccion_pendiente = False
+        self.columnas_carga = None # Columnas a leer de la fuente (None = todas)
+        self.tabla = None # Tabla elegida cuando la fuente es SQLite
+        self.filtro = filtro # Condición de filas: se resuelve en la fuente (SQLite, Parquet o Feather) o al leer (CSV y Excel)
+
+        # Opciones de exportación a Parquet y Feather (None = valores por defecto de pyarrow)
+        self.compresion = compresion
+        self.filas_grupo = filas_grupo
+
+        # Caché en disco de las fuentes ya leídas (CacheCargas o None para leer siempre del archivo)
+        self.cache = cache
+
+        self.verboso = verboso # Si se muestran los mensajes informativos
+
+        # Hilos de la imputación KNN y de la detección de anomalías y procesos de los histogramas (None = uno por
+        # núcleo). Dentro de un lote se reparten los núcleos entre los procesos para no multiplicar los hilos
+        self.n_jobs = n_jobs
+
+        # Con float32 las columnas normalizadas ocupan la mitad de memoria (suficiente para la mayoría de modelos)
+        self.float32 = float32
+
+        # Filas, bytes y segundos de la última exportación a CSV (para informar del rendimiento en MB/s)
+        self.rendimiento_exportacion = None
+
+        # Directorio de informe: con él los gráficos se guardan como archivos PNG o SVG en lugar de mostrarse
+        if formato_graficos not in FORMATOS_GRAFICOS:
+            raise ValueError(f"Formato de gráfico desconocido: {formato_graficos}")
+        self.informe = informe
+        self.formato_graficos = formato_graficos
+
+        # Ruta del perfil de los datos (.json o .html) que se genera en segundo plano al cargar (None = sin perfil).
+        # Mientras se calcula se puede seguir trabajando; el primer paso que necesita estadísticas espera a que
+        # termine y usa las suyas en lugar de volver a recorrer los datos
+        if perfil is not None and not perfil.endswith(EXTENSIONES_PERFIL):
+            raise ValueError(f"Extensión de perfil no soportada: {perfil} (use .json o .html)")
+        self.perfil = perfil
+        self.perfil_datos = None # Perfil ya calculado de los datos cargados
+        self._perfil_pendiente = None # (futuro del cálculo, datos a los que corresponde)
+
+        # Correspondencias del Label Encoding de cada columna: {columna: [categoría del código 0, del 1, ...]}
+        self.codificaciones = {}
+
+        # Resultado de la última detección de atípicos: recuento por columna y, en memoria, filas con alguno
+        self.conteo_atipicos = {}
+        self.mascara_atipicos = None
+
+        # Estadísticas por columna compartidas por todos los pasos; se recalculan solo las que un paso modifica.
+        # Con un error de cuantiles, las medianas y los límites IQR salen de resúmenes aproximados de memoria acotada.
+        # Los cuantiles exactos guardan la frecuencia de cada valor distinto (en una columna continua, tantas entradas
+        # como filas), así que por bloques se usa el resumen por defecto salvo que se pida error 0 (exactos)
+        if error_cuantiles is None and tamano_bloque:
+            error_cuantiles = ERROR_CUANTILES
+        self.error_cuantiles = error_cuantiles
+        self.estadisticas = CacheEstadisticas(self._bloques, error_cuantiles)
+        self._datos_estadisticas = None # DataFrame al que corresponden las estadísticas en memoria
+
+    def _informar(self, mensaje):
+        if self.verboso:
+            print(mensaje)
+
+    # Carga una fuente. En SQLite se indica la tabla; si se omite, la base debe tener una sola
+    def cargar(self, ruta, tabla=None):
+        self.esperar_perfil()
+        self.tabla = tabla
+        self.por_bloques = False
+        if ruta.endswith(('.sqlite', '.db')) and tabla is None:
+            tablas = listar_tablas(ruta)
+            if len(tablas) != 1:
+                raise ValueError(f"Indique la tabla a cargar de {ruta}: {', '.join(tablas) or 'no hay tablas'}")
+            self.tabla = tablas[0]
+
+        if self.cache is not None: # Queda en None si esta lectura no pasa por la caché (modo por bloques)
+            self.cache.ultimo_acierto = None
+        if not ruta.endswith(('.xlsx', '.xls')) and self.tamano_bloque: # Carga por bloques: solo se lee el primero como muestra
+            self.datos = leer_fuente(ruta, self.tabla, filas=self.tamano_bloque, filtro=self.filtro)
+            self.por_bloques = True
+            self._informar(f"Modo por bloques: se muestra el primer bloque de {self.tamano_bloque} filas")
+
+        elif self.proyectar: # Solo se lee una vista previa; el resto se carga tras elegir las columnas
+            self.datos = self._leer(ruta, tabla=self.tabla, filas=FILAS_VISTA_PREVIA, filtro=self.filtro)
+            self._informar(f"Carga por columnas: vista previa de {FILAS_VISTA_PREVIA} filas, se leerán solo las columnas seleccionadas")
+
+        else: # Carga completa de un CSV, un Excel, una tabla SQLite, un Parquet o un Feather
+            self.datos = self._leer(ruta, tabla=self.tabla, filtro=self.filtro)
+
+        self.ruta = ruta
+        self.transformaciones = []
+        self.estadisticas.invalidar()
+        self.proyeccion_pendiente = self.proyectar
+        self.columnas_carga = None
+        self.filas_entrada = None if self.por_bloques or self.proyectar else len(self.datos)
+
+        if not self.proyeccion_pendiente:
+            self._compactar()
+            self._iniciar_perfil()
+        return self.datos
+
+    # Lee la fuente pasando por la caché si está activada
+    def _leer(self, ruta, **opciones):
+        if self.cache is not None:
+            return self.cache.cargar(ruta, leer_fuente, **opciones)
+        return leer_fuente(ruta, **opciones)
+
+    # Reduce los tipos de los datos cargados e informa de la memoria ahorrada (solo en modo compacto)
+    def _compactar(self):
+        if self.compacto and not self.por_bloques:
+            antes = memoria(self.datos)
+            self.datos = compactar(self.datos)
+            despues = memoria(self.datos)
+            self._informar(f"Modo compacto: memoria {antes / 1024**2:.2f} MB -> {despues / 1024**2:.2f} MB (ahorro del {100 * (1 - despues / antes) if antes else 0:.1f}%)")
+
+    # Lee de la fuente solo las columnas seleccionadas (segunda fase de la carga por columnas)
+    def _cargar_columnas(self, columnas):
+        self.esperar_perfil()
+        self.columnas_carga = columnas
+        if self.por_bloques:
+            self.datos = leer_fuente(self.ruta, self.tabla, columnas=columnas, filas=self.tamano_bloque, filtro=self.filtro)
+        else:
+            self.datos = self._leer(self.ruta, tabla=self.tabla, columnas=columnas, filtro=self.filtro)
+            self.filas_entrada = len(self.datos)
+            self._compactar()
+        self.proyeccion_pendiente = False
+        self.estadisticas.invalidar()
+        self._informar(f"Se han cargado {len(columnas)} columnas y {len(self.datos)} filas de {self.ruta}")
+        self._iniciar_perfil()
+
+    # Devuelve los datos a recorrer: el DataFrame en memoria o los bloques de la fuente con los pasos ya aplicados
+    def _bloques(self):
+        if self.por_bloques:
+            return leer_bloques(self.ruta, self.tamano_bloque, self.transformaciones, self.columnas_carga, self.tabla, self.filtro)
+        return [self.datos]
+
+    # Empieza a calcular en un hilo el perfil de los datos recién cargados (todas las filas, sin ningún paso)
+    def _iniciar_perfil(self):
+        if self.perfil is None:
+            return
+        self.perfil_datos = None
+        datos = self.datos
+        if self.por_bloques:
+            ruta, tamano_bloque, columnas, tabla, filtro = self.ruta, self.tamano_bloque, self.columnas_carga, self.tabla, self.filtro
+            bloques = lambda: leer_bloques(ruta, tamano_bloque, [], columnas, tabla, filtro)
+        else:
+            bloques = lambda: [datos]
+        hilo = ThreadPoolExecutor(max_workers=1)
+        futuro = hilo.submit(self._calcular_perfil, bloques, list(datos.columns))
+        hilo.shutdown(wait=False)
+        self._perfil_pendiente = (futuro, datos)
+
+    def _calcular_perfil(self, bloques, columnas):
+        perfil, estadisticas = calcular_perfil(bloques, columnas, self.error_cuantiles)
+        perfil['fuente'] = self.ruta
+        guardar_perfil(perfil, self.perfil)
+        return perfil, estadisticas
+
+    # Espera a que termine el perfil en curso y, si los datos no han cambiado desde que empezó, pasa sus
+    # estadísticas e histogramas a la caché. Un error en el perfil se informa sin detener el preprocesado
+    def esperar_perfil(self):
+        if self._perfil_pendiente is None:
+            return self.perfil_datos
+        futuro, datos = self._perfil_pendiente
+        self._perfil_pendiente = None
+        try:
+            perfil, estadisticas = futuro.result()
+        except Exception as e:
+            self._informar(f"No se pudo generar el perfil de los datos: {e}")
+            return None
+        if self.datos is datos and not self.transformaciones:
+            self._sincronizar_estadisticas()
+            self.estadisticas.incorporar(estadisticas)
+            self.perfil_datos = perfil
+        return self.perfil_datos
+
+    # Descarta todas las estadísticas si los datos en memoria se han sustituido sin pasar por los pasos
+    def _sincronizar_estadisticas(self):
+        if self._perfil_pendiente is not None: # Los pasos no cambian los datos mientras el perfil los recorre
+            self.esperar_perfil()
+        if not self.por_bloques and self.datos is not self._datos_estadisticas:
+            self.estadisticas.invalidar()
+            self._datos_estadisticas = self.datos
+
+    # Devuelve las estadísticas de las columnas (en memoria o por bloques), calculando en una pasada solo las que faltan
+    def _estadisticas(self, columnas, exactas=(), cuantiles=()):
+        self._sincronizar_estadisticas()
+        estadisticas = self.estadisticas.obtener(columnas, exactas, cuantiles)
+        if not self.transformaciones: # La primera pasada sobre la fuente sin cambios sirve para contar sus filas
+            self.filas_entrada = estadisticas.filas
+        return estadisticas
+
+    # Aplica un paso ajustado a los datos cargados y lo guarda para repetirlo sobre cada bloque
+    def _aplicar(self, paso):
+        self._sincronizar_estadisticas()
+        modificadas = columnas_modificadas(paso)
+        if paso['tipo'] == 'rellenar': # Rellenar no cambia las columnas en las que ya se sabe que no hay nulos
+            nulos = self.estadisticas.estadisticas.nulos
+            modificadas = [columna for columna in (modificadas if modificadas is not None else nulos.index) if nulos.get(columna, 1) > 0]
+        self.estadisticas.invalidar(modificadas)
+
+        self.datos = aplicar_paso(self.datos, paso)
+        self._datos_estadisticas = self.datos
+        self.transformaciones.append(paso)
+
+    # Fija las columnas de entrada y salida; en la carga por columnas lee ahora solo esas
+    def seleccionar_columnas(self, features, target):
+        columnas = list(self.datos.columns)
+        faltan = [columna for columna in list(features) + [target] if columna not in columnas]
+        if faltan:
+            raise ValueError(f"Columnas no encontradas en la fuente: {', '.join(map(str, faltan))}")
+        if target in features:
+            raise ValueError(f"La columna '{target}' no puede ser a la vez feature y target")
+
+        self.features, self.targets = list(features), target
+        if self.proyeccion_pendiente:
+            self._cargar_columnas(self.features + [self.targets])
+
+    # Número de valores faltantes en las columnas seleccionadas (solo las que tienen alguno)
+    def detectar_nulos(self):
+        valores_faltantes = self._estadisticas(self.features + [self.targets]).nulos
+        return valores_faltantes[valores_faltantes > 0]
+
+    # Paso 2.2: elimina las filas con nulos o aplica la misma estrategia a las columnas seleccionadas con nulos
+    # La media, la mediana, la constante y la mediana por grupo (de la columna "por") se aplican a las
+    # numéricas; la moda también a las categóricas. KNN usa las opciones vecinos y muestra
+    def manejar_nulos(self, estrategia, valor=None, por=None, vecinos=VECINOS_KNN, muestra=MUESTRA_KNN):
+        if estrategia not in ESTRATEGIAS_NULOS:
+            raise ValueError(f"Estrategia de valores faltantes desconocida: {estrategia}")
+
+        if estrategia == 'eliminar': # Elimina las filas que contienen los valores
+            self._aplicar({'tipo': 'eliminar_nulos', 'columnas': self.features + [self.targets]})
+            return
+        if estrategia == 'knn':
+            self.imputar_knn(vecinos, muestra)
+            return
+
+        columnas = [columna for columna in self.detectar_nulos().index if columna != por]
+        if estrategia != 'moda':
+            columnas = [columna for columna in columnas if es_numerica(self.datos[columna])]
+        opciones = {'estrategia': estrategia, 'valor': valor, 'por': por}
+        self.imputar({columna: opciones for columna in columnas})
+
+    # Paso 2.2 con una estrategia por columna, solo sobre las columnas seleccionadas. Cada estrategia es un
+    # nombre o un diccionario como {'estrategia': 'constante', 'valor': 0} o {'estrategia': 'mediana_grupo', 'por': 'Pclass'}
+    def imputar(self, estrategias):
+        seleccionadas = self.features + [self.targets]
+        normalizadas = {}
+        for columna, estrategia in estrategias.items():
+            opciones = dict(estrategia) if isinstance(estrategia, dict) else {'estrategia': estrategia}
+            nombre = opciones.get('estrategia')
+            if columna not in seleccionadas:
+                raise ValueError(f"La columna '{columna}' no está entre las columnas seleccionadas")
+            validas = ESTRATEGIAS_COLUMNA_NUMERICA if es_numerica(self.datos[columna]) else ESTRATEGIAS_COLUMNA_CATEGORICA
+            if nombre not in validas:
+                raise ValueError(f"Estrategia '{nombre}' no válida para la columna '{columna}' (opciones: {', '.join(validas)})")
+            if nombre == 'constante' and opciones.get('valor') is None:
+                raise ValueError(f"La estrategia 'constante' necesita un valor (columna '{columna}')")
+            if nombre == 'mediana_grupo' and (opciones.get('por') not in self.datos.columns or opciones['por'] == columna):
+                raise ValueError(f"La estrategia 'mediana_grupo' necesita otra columna cargada en 'por' (columna '{columna}')")
+            normalizadas[columna] = opciones
+        if not normalizadas:
+            return
+
+        # Todos los valores se calculan antes de rellenar nada, sobre los datos sin cambios
+        estadisticas = self._estadisticas([columna for columna, opciones in normalizadas.items() if opciones['estrategia'] != 'constante'],
+                                          exactas=[columna for columna, opciones in normalizadas.items() if opciones['estrategia'] == 'moda'],
+                                          cuantiles=[columna for columna, opciones in normalizadas.items() if opciones['estrategia'] in ('mediana', 'mediana_grupo')])
+        valores = {}
+        grupos = {}
+        for columna, opciones in normalizadas.items():
+            if opciones['estrategia'] == 'media':
+                valores[columna] = estadisticas.media([columna])[columna]
+            elif opciones['estrategia'] == 'mediana':
+                valores[columna] = estadisticas.mediana(columna)
+            elif opciones['estrategia'] == 'moda':
+                valores[columna] = estadisticas.moda(columna)
+            elif opciones['estrategia'] == 'constante':
+                valor = opciones['valor']
+                valores[columna] = float(valor) if es_numerica(self.datos[columna]) else valor
+            else:
+                grupos.setdefault(opciones['por'], []).append(columna)
+
+        pasos = []
+        for por, columnas in grupos.items(): # Una pasada por cada columna de agrupación
+            pasos.append({'tipo': 'rellenar_grupo', 'por': por, 'medianas': medianas_por_grupo(self._bloques(), columnas, por),
+                          'defecto': {columna: estadisticas.mediana(columna) for columna in columnas}})
+        if valores:
+            self._aplicar({'tipo': 'rellenar', 'valores': valores})
+        for paso in pasos:
+            self._aplicar(paso)
+
+    # Rellena los nulos de las features numéricas con la media de sus vecinos más cercanos.
+    # La distancia se mide con las columnas escaladas (z-score) y los vecinos se buscan en una muestra
+    # de como máximo "muestra" filas completas, así que el coste no crece con el cuadrado de las filas.
+    # El target no entra en la distancia ni se imputa: los datos nuevos no lo tienen
+    def imputar_knn(self, vecinos=VECINOS_KNN, muestra=MUESTRA_KNN):
+        columnas = [columna for columna in self.features if es_numerica(self.datos[columna])]
+        if not any(columna in self.detectar_nulos().index for columna in columnas):
+            return
+        estadisticas = self._estadisticas(columnas)
+        escala = estadisticas.desviacion(columnas).replace(0, 1).fillna(1)
+        self._aplicar(ajustar_knn(self._bloques(), columnas, estadisticas.media(columnas).fillna(0), escala, vecinos, muestra,
+                                  n_jobs=self.n_jobs))
+
+    # Columnas categóricas dentro de las features seleccionadas
+    def columnas_categoricas(self):
+        return [columna for columna in self.features if columna in self.datos.columns and es_categorica(self.datos[columna])]
+
+    # Paso 2.3: codifica las columnas categóricas con One-Hot (normal o con columnas dispersas uint8) o Label Encoding.
+    # En One-Hot se pueden conservar solo las max_categorias más frecuentes y las que aparecen al menos
+    # min_frecuencia veces (o en esa fracción de las filas si es menor que 1); el resto se agrupa en "otros".
+    # Para columnas con muchísimos valores: hashing a "ancho" columnas, frecuencia o conteo de cada valor
+    # y target encoding fuera de pliegue, que no crecen con el número de categorías
+    def transformar_categoricos(self, estrategia, max_categorias=None, min_frecuencia=None,
+                                ancho=COLUMNAS_HASH, pliegues=PLIEGUES_TARGET, suavizado=SUAVIZADO_TARGET):
+        if estrategia not in ESTRATEGIAS_CATEGORICOS:
+            raise ValueError(f"Estrategia de transformación desconocida: {estrategia}")
+        categoricos = self.columnas_categoricas()
+        if not categoricos:
+            return
+
+        if estrategia == 'hash': # Ancho fijo sin ajustar nada: no hace falta recorrer los datos
+            self._aplicar({'tipo': 'hash', 'columnas': categoricos, 'ancho': ancho})
+            return
+        if estrategia == 'target':
+            self._codificar_target(categoricos, pliegues, suavizado)
+            return
+
+        # El conjunto de categorías se obtiene de todos los datos, no solo de la muestra
+        if estrategia == 'label' and all(columna in self.codificaciones for columna in categoricos):
+            estadisticas = None # Todas las columnas tienen ya su correspondencia: no hace falta recorrer los datos
+        else:
+            estadisticas = self._estadisticas(categoricos, exactas=categoricos)
+
+        if estrategia in ('one_hot', 'one_hot_disperso'): # Crea nuevas columnas binarias para cada categoría
+            categorias = {}
+            otros = []
+            for columna in categoricos:
+                frecuencias = estadisticas.frecuencias[columna]
+                if min_frecuencia is not None:
+                    minimo = min_frecuencia * estadisticas.filas if min_frecuencia < 1 else min_frecuencia
+                    frecuencias = frecuencias[frecuencias >= minimo]
+                if max_categorias is not None and len(frecuencias) > max_categorias: # Las más frecuentes; en empate, las menores
+                    frecuencias = frecuencias.sort_index(kind='stable').sort_values(ascending=False, kind='stable')[:max_categorias]
+                categorias[columna] = sorted(frecuencias.index)
+                if len(categorias[columna]) < len(estadisticas.frecuencias[columna]): # "otros" va siempre la última
+                    categorias[columna] = [categoria for categoria in categorias[columna] if categoria != OTROS] + [OTROS]
+                    otros.append(columna)
+            self._aplicar({'tipo': 'one_hot', 'categorias': categorias, 'otros': otros, 'disperso': estrategia == 'one_hot_disperso'})
+
+        elif estrategia in ('frecuencia', 'conteo'): # Una sola columna numérica con las veces (o la fracción) que aparece cada valor
+            divisor = estadisticas.filas if estrategia == 'frecuencia' else 1
+            conteos = {columna: {(valor.item() if hasattr(valor, 'item') else valor): float(veces / divisor)
+                                 for valor, veces in estadisticas.frecuencias[columna].items()} for columna in categoricos}
+            self._aplicar({'tipo': 'frecuencia', 'conteos': conteos})
+
+        else: # Asigna un número entero a cada categoría; las correspondencias ya cargadas se reutilizan sin recalcular
+            for columna in categoricos:
+                if columna not in self.codificaciones:
+                    self.codificaciones[columna] = estadisticas.categorias(columna)
+            self._aplicar({'tipo': 'label', 'categorias': {columna: self.codificaciones[columna] for columna in categoricos}})
+
+    # Target encoding fuera de pliegue: cada categoría se sustituye por la media suavizada del target
+    # (numérico, por ejemplo 0/1) calculada sin las filas de su propio pliegue
+    def _codificar_target(self, categoricos, pliegues, suavizado):
+        if self.targets is None:
+            raise ValueError("El target encoding necesita una columna target seleccionada")
+        if not es_numerica(self.datos[self.targets]):
+            raise ValueError(f"El target encoding necesita un target numérico: '{self.targets}' no lo es")
+        self._aplicar(ajustar_target(self._bloques(), categoricos, self.targets, pliegues, suavizado))
+
+    # Guarda en JSON las correspondencias del Label Encoding para codificar igual otros lotes
+    def guardar_codificaciones(self, ruta):
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump({columna: [valor.item() if hasattr(valor, 'item') else valor for valor in categorias]
+                       for columna, categorias in self.codificaciones.items()}, archivo, ensure_ascii=False, indent=2)
+
+    # Carga correspondencias guardadas; las columnas incluidas se codifican con ellas en lugar de ajustarse
+    def cargar_codificaciones(self, ruta):
+        with open(ruta, encoding='utf-8') as archivo:
+            self.codificaciones.update(json.load(archivo))
+
+    # Artefacto con las columnas seleccionadas y todos los pasos ajustados hasta ahora
+    def artefacto(self):
+        return crear_artefacto(self.features, self.targets, self.transformaciones)
+
+    # Guarda el artefacto en JSON para aplicar el mismo preprocesado a otros datos sin reajustarlo
+    def guardar_artefacto(self, ruta):
+        guardar_artefacto(self.artefacto(), ruta)
+
+    # Modo solo transformación: aplica a los datos cargados (en memoria o por bloques al exportar)
+    # los pasos de un artefacto o de la ruta de uno, sin recorrer los datos ni reajustar nada.
+    # El target es opcional: los datos nuevos no suelen tenerlo
+    def aplicar_artefacto(self, artefacto):
+        if isinstance(artefacto, str):
+            artefacto = cargar_artefacto(artefacto)
+        columnas = list(self.datos.columns)
+        faltan = [columna for columna in artefacto['features'] if columna not in columnas]
+        if faltan:
+            raise ValueError(f"Faltan columnas del artefacto en la fuente: {', '.join(map(str, faltan))}")
+
+        self.features, self.targets = list(artefacto['features']), artefacto['target']
+        if self.proyeccion_pendiente:
+            self._cargar_columnas(self.features + ([self.targets] if self.targets in columnas else []))
+        for paso in pasos_transformacion(artefacto):
+            self._aplicar(paso)
+
+    # Columnas numéricas dentro de las features seleccionadas
+    def columnas_numericas(self):
+        return [columna for columna in self.features if columna in self.datos.columns and es_numerica(self.datos[columna])]
+
+    # Paso 2.4: escala las columnas numéricas con Min-Max, Z-score o el escalado robusto (mediana y rango
+    # intercuartílico, poco sensible a los atípicos). Los parámetros salen de las estadísticas acumuladas
+    # bloque a bloque (mínimo, máximo, media y varianza combinadas y cuantiles) y el escalado se hace sobre
+    # cada columna sin copias intermedias; con float32 el resultado se guarda en ese tipo
+    def normalizar(self, estrategia, float32=None):
+        if estrategia not in ESTRATEGIAS_NORMALIZACION:
+            raise ValueError(f"Estrategia de normalización desconocida: {estrategia}")
+        numericas = self.columnas_numericas()
+        if not numericas:
+            return
+
+        estadisticas = self._estadisticas(numericas, cuantiles=numericas if estrategia == 'robusto' else ())
+
+        # Un rango o desviación nulos se sustituyen por 1, igual que en los escaladores de sklearn
+        if estrategia == 'minmax':
+            rango = (estadisticas.maximo[numericas] - estadisticas.minimo[numericas]).replace(0, 1)
+            parametros = {columna: (estadisticas.minimo[columna], rango[columna]) for columna in numericas}
+        elif estrategia == 'zscore':
+            desviacion = estadisticas.desviacion(numericas).replace(0, 1)
+            parametros = {columna: (estadisticas.media_[columna], desviacion[columna]) for columna in numericas}
+        else:
+            parametros = {}
+            for columna in numericas:
+                rango = estadisticas.cuantil(columna, 0.75) - estadisticas.cuantil(columna, 0.25)
+                parametros[columna] = (estadisticas.mediana(columna), rango if rango != 0 else 1)
+        self._aplicar({'tipo': 'escalar', 'parametros': parametros, 'float32': self.float32 if float32 is None else float32})
+
+    # Cuenta los valores atípicos de cada columna numérica según el rango intercuartílico (IQR)
+    # Devuelve solo las columnas con alguno y guarda los límites para el manejo posterior.
+    # Los cuartiles salen de una pasada por las estadísticas y los atípicos se cuentan en otra, comparando
+    # todas las columnas a la vez; los recuentos quedan en conteo_atipicos y, en memoria, la máscara de
+    # filas con algún atípico en mascara_atipicos (None por bloques)
+    def detectar_atipicos(self):
+        numericas = self.columnas_numericas()
+        valores_atipicos = {} # Almacenamos la cantidad de valores atípicos por columna
+        limites = {} # Límites del rango intercuartílico de cada columna
+        mascara = None
+
+        estadisticas = self._estadisticas(numericas, cuantiles=numericas) if numericas else None
+        if numericas:
+            limites = limites_iqr(estadisticas, numericas)
+            conteo = np.zeros(len(numericas), dtype='int64')
+            for bloque in self._bloques():
+                fuera = mascara_atipicos(bloque, limites)
+                conteo += fuera.sum(axis=0)
+                if not self.por_bloques:
+                    mascara = fuera.any(axis=1)
+            valores_atipicos = {columna: int(cantidad) for columna, cantidad in zip(numericas, conteo) if cantidad > 0}
+
+        self.conteo_atipicos = valores_atipicos
+        self.mascara_atipicos = mascara
+        self._atipicos = (valores_atipicos, limites, estadisticas)
+        return valores_atipicos
+
+    # Detección multivariante: ajusta Isolation Forest, la distancia de Mahalanobis robusta (MinCovDet) o LOF
+    # sobre una muestra de filas completas (escaladas con su media y desviación) y puntúa todas las filas por
+    # lotes en paralelo. Son anómalas las que superan el umbral indicado o el que deja fuera la fracción de
+    # contaminación de la muestra. Devuelve el número de filas anómalas; la máscara queda en mascara_atipicos
+    def detectar_anomalias(self, metodo, muestra=MUESTRA_ANOMALIAS, contaminacion=CONTAMINACION, umbral=None, n_jobs=None):
+        numericas = self.columnas_numericas()
+        if not numericas:
+            raise ValueError("La detección multivariante necesita columnas numéricas entre las features")
+        estadisticas = self._estadisticas(numericas)
+        escala = estadisticas.desviacion(numericas).replace(0, 1).fillna(1)
+        paso = ajustar_anomalias(self._bloques(), numericas, estadisticas.media(numericas).fillna(0), escala, metodo,
+                                 muestra, contaminacion, umbral, n_jobs if n_jobs is not None else self.n_jobs)
+
+        filas = 0
+        mascara = None
+        for bloque in self._bloques():
+            anomalas = mascara_anomalias(bloque, paso)
+            filas += int(anomalas.sum())
+            if not self.por_bloques:
+                mascara = anomalas
+        self.conteo_atipicos = {}
+        self.mascara_atipicos = mascara
+        self._atipicos = ('anomalias', paso)
+        return filas
+
+    # Paso 2.5: elimina las filas con atípicos, los sustituye por la mediana o los mantiene.
+    # Todas las columnas se tratan a la vez con los límites de la detección, de modo que el resultado
+    # no depende del orden de las columnas. Con un método multivariante solo se pueden eliminar o mantener
+    # las filas anómalas; las opciones son las de detectar_anomalias
+    def manejar_atipicos(self, estrategia, metodo='iqr', **opciones):
+        if estrategia not in ESTRATEGIAS_ATIPICOS:
+            raise ValueError(f"Estrategia de valores atípicos desconocida: {estrategia}")
+        if metodo not in METODOS_ATIPICOS:
+            raise ValueError(f"Método de detección de atípicos desconocido: {metodo}")
+        if estrategia == 'mantener': # No cambia los datos: no hace falta detectar ni ajustar nada
+            self._atipicos = None
+            return
+        if metodo != 'iqr':
+            if estrategia == 'mediana':
+                raise ValueError("Las filas anómalas de un método multivariante solo se pueden eliminar o mantener")
+            pendiente = getattr(self, '_atipicos', None)
+            if opciones or pendiente is None or pendiente[0] != 'anomalias' or pendiente[1]['metodo'] != metodo:
+                self.detectar_anomalias(metodo, **opciones)
+            paso = self._atipicos[1]
+            self._atipicos = None
+            if self.mascara_atipicos is None or self.mascara_atipicos.any():
+                self._aplicar(paso)
+            return
+
+        if getattr(self, '_atipicos', None) is None or self._atipicos[0] == 'anomalias':
+            self.detectar_atipicos()
+        valores_atipicos, limites, estadisticas = self._atipicos
+        self._atipicos = None
+        if not valores_atipicos:
+            return
+
+        # Se usan los límites calculados en la detección para que todos los bloques se traten igual
+        limites = {columna: limites[columna] for columna in valores_atipicos}
+        if estrategia == 'eliminar':
+            self._aplicar({'tipo': 'eliminar_atipicos', 'limites': limites})
+        elif estrategia == 'mediana':
+            medianas = {columna: estadisticas.mediana(columna) for columna in valores_atipicos}
+            self._aplicar({'tipo': 'reemplazar_atipicos', 'limites': limites, 'medianas': medianas})
+
+    # Conteos del histograma de las columnas numéricas seleccionadas: {columna: (conteos, bordes)}.
+    # Se guardan con las estadísticas y solo se recalculan las columnas que un paso haya modificado
+    def histogramas(self, columnas=None, intervalos=INTERVALOS_HISTOGRAMA):
+        self._sincronizar_estadisticas()
+        return self.estadisticas.histogramas(columnas if columnas is not None else self.columnas_numericas(), intervalos)
+
+    # Matriz de correlación (Pearson o Spearman) de las columnas numéricas seleccionadas, acumulada sobre
+    # todas las filas bloque a bloque y guardada junto a los histogramas
+    def correlacion(self, columnas=None, metodo='pearson'):
+        self._sincronizar_estadisticas()
+        return self.estadisticas.correlacion(columnas if columnas is not None else self.columnas_numericas(), metodo)
+
+    # Los k pares de columnas con la correlación más fuerte (para datos con muchas columnas)
+    def pares_correlados(self, k=PARES_FUERTES, columnas=None, metodo='pearson'):
+        return pares_fuertes(self.correlacion(columnas, metodo), k)
+
+    # Guarda los histogramas en el directorio de informe (o el indicado), dibujados en paralelo sin pantalla
+    def guardar_histogramas(self, directorio=None, formato=None, columnas=None, procesos=None):
+        return guardar_histogramas(self.histogramas(columnas), directorio or self.informe,
+                                   formato or self.formato_graficos, procesos or self.n_jobs)
+
+    # Guarda el heatmap de correlación en el directorio de informe (o el indicado); con muchas columnas
+    # se ordenan por agrupamiento jerárquico sin anotar y se guardan también los pares más correlados
+    def guardar_heatmap(self, directorio=None, formato=None, columnas=None, metodo='pearson'):
+        directorio = directorio or self.informe
+        correlacion = self.correlacion(columnas, metodo)
+        ruta = guardar_heatmap(correlacion, directorio, formato or self.formato_graficos)
+        if len(correlacion) > COLUMNAS_ANOTADAS:
+            pares_fuertes(correlacion).to_csv(os.path.join(directorio, 'pares_correlados.csv'), index=False)
+        return ruta
+
+    # Exporta los datos procesados según la extensión del archivo y devuelve las filas escritas
+    # (en SQLite, a la tabla indicada)
+    def exportar(self, archivo, tabla=TABLA_SQLITE, modo='reemplazar', indices=()):
+        # Tabla SQLite con tipos, inserciones por lotes en una transacción y diario WAL durante la carga;
+        # con modo "anadir" las filas se añaden a la tabla existente y los índices se crean al terminar
+        if archivo.endswith(EXTENSIONES_SQLITE):
+            resultado = escribir_sqlite(self._bloques(), archivo, tabla, modo, indices)
+            self._informar(f"{resultado['filas']} filas escritas en la tabla {tabla} en {resultado['segundos']:.2f} s")
+            return resultado['filas']
+
+        # CSV por trozos, comprimido según la extensión (.csv.gz, .csv.bz2, .csv.zst), con la compresión en
+        # otro hilo y renombrado al terminar; por bloques se vuelve a leer la fuente aplicando los pasos
+        if archivo.endswith(EXTENSIONES_CSV):
+            self.rendimiento_exportacion = escribir_csv(self._bloques(), archivo)
+            megas = self.rendimiento_exportacion['bytes'] / 1024**2
+            segundos = self.rendimiento_exportacion['segundos']
+            self._informar(f"CSV de {megas:.1f} MB escrito en {segundos:.2f} s ({megas / segundos if segundos else 0:.1f} MB/s), "
+                           f"{self.rendimiento_exportacion['bytes_archivo'] / 1024**2:.1f} MB en disco")
+            return self.rendimiento_exportacion['filas']
+
+        # Matriz dispersa CSR de scipy: solo admite números, así que las columnas de texto que no se han
+        # seleccionado ni codificado (nombres, identificadores...) se descartan con un aviso
+        if archivo.endswith(EXTENSIONES_DISPERSAS):
+            descartadas = columnas_no_numericas(self.datos)
+            if descartadas:
+                self._informar(f"Aviso: la matriz dispersa no incluye las columnas no numéricas: {', '.join(map(str, descartadas))}")
+            bloques = (bloque.drop(columns=descartadas) for bloque in self._bloques())
+            if self.por_bloques:
+                return exportar_bloques(bloques, archivo)
+            matriz, columnas = matriz_dispersa(next(bloques))
+            return guardar_npz([matriz], columnas, archivo)
+
+        # En modo por bloques se vuelve a leer la fuente aplicando todos los pasos bloque a bloque
+        if self.por_bloques:
+            return exportar_bloques(self._bloques(), archivo, self.compresion, self.filas_grupo)
+
+        if archivo.endswith('.xlsx'):
+            self.datos.to_excel(archivo, index=False)
+        elif archivo.endswith(EXTENSIONES_PARQUET): # Parquet con la compresión y el tamaño de grupo de filas configurados
+            densificar(self.datos).to_parquet(archivo, index=False, compression=self.compresion or 'snappy', row_group_size=self.filas_grupo)
+        elif archivo.endswith(EXTENSIONES_FEATHER): # Feather (Arrow IPC)
+            densificar(self.datos).reset_index(drop=True).to_feather(archivo, compression=self.compresion or 'lz4')
+        else:
+            raise ValueError(f"Formato de exportación no soportado: {archivo}")
+        return len(self.datos)
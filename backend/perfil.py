@@ -0,0 +1,128 @@
+import html
+import json
+import math
+import numpy as np
+import pandas as pd
+from backend.estadisticas import CacheEstadisticas
+from backend.graficos import INTERVALOS_HISTOGRAMA
+
+
+# Contenido del perfil de los datos
+CUANTILES_PERFIL = (0.05, 0.25, 0.5, 0.75, 0.95)
+VALORES_FRECUENTES = 10 # Valores más frecuentes que se guardan de cada columna
+EXTENSIONES_PERFIL = ('.json', '.html')
+
+
+# Número de JSON: los NaN (columna vacía) se guardan como null
+def _numero(valor):
+    valor = float(valor)
+    return None if math.isnan(valor) else valor
+
+
+# Perfil de todas las columnas recorriendo los bloques dos veces: la primera acumula las estadísticas
+# (nulos, momentos, frecuencias o resúmenes de cuantiles) y la memoria de cada columna, y la segunda
+# cuenta los histogramas de las numéricas. Devuelve el perfil y la caché de estadísticas con la que se
+# ha calculado, para que los pasos posteriores usen esos números en lugar de volver a recorrer los datos
+def calcular_perfil(bloques, columnas, error=None, intervalos=INTERVALOS_HISTOGRAMA, frecuentes=VALORES_FRECUENTES):
+    columnas = list(columnas)
+    memoria = pd.Series(0, index=columnas, dtype='int64')
+    midiendo = [True] # La memoria se mide solo en la primera pasada
+
+    def recorrer():
+        for bloque in bloques():
+            if midiendo[0]:
+                memoria[:] += bloque[columnas].memory_usage(deep=True, index=False).to_numpy()
+            yield bloque
+        midiendo[0] = False
+
+    cache = CacheEstadisticas(recorrer, error)
+    estadisticas = cache.obtener(columnas, cuantiles=columnas)
+    numericas = estadisticas.numericas()
+    histogramas = cache.histogramas(numericas, intervalos) if numericas else {}
+    desviaciones = estadisticas.desviacion(numericas, ddof=1)
+
+    perfil = {'filas': int(estadisticas.filas), 'memoria': int(memoria.sum()), 'columnas': {}}
+    for columna in columnas:
+        nulos = int(estadisticas.nulos[columna])
+        datos_columna = {'nulos': nulos, 'tasa_nulos': nulos / estadisticas.filas if estadisticas.filas else 0.0,
+                         'distintos': None, 'memoria': int(memoria[columna]), 'frecuentes': []}
+        if columna in estadisticas.frecuencias: # En modo aproximado las numéricas no guardan sus frecuencias
+            frecuencias = estadisticas.frecuencias[columna]
+            datos_columna['distintos'] = len(frecuencias)
+            datos_columna['frecuentes'] = [[valor.item() if isinstance(valor, np.generic) else valor, int(conteo)]
+                                           for valor, conteo in frecuencias.nlargest(frecuentes).items()]
+        if columna in numericas:
+            conteos, bordes = histogramas[columna]
+            datos_columna.update({
+                'media': _numero(estadisticas.media_[columna]),
+                'desviacion': _numero(desviaciones[columna]),
+                'minimo': _numero(estadisticas.minimo[columna]),
+                'maximo': _numero(estadisticas.maximo[columna]),
+                'cuantiles': {str(q): _numero(estadisticas.cuantil(columna, q)) if nulos < estadisticas.filas else None
+                              for q in CUANTILES_PERFIL},
+                'histograma': {'conteos': conteos.tolist(), 'bordes': bordes.tolist()},
+            })
+        perfil['columnas'][str(columna)] = datos_columna
+    return perfil, cache
+
+
+# Guarda el perfil en JSON o en una página HTML, según la extensión de la ruta
+def guardar_perfil(perfil, ruta):
+    if not ruta.endswith(EXTENSIONES_PERFIL):
+        raise ValueError(f"Extensión de perfil no soportada: {ruta} (use .json o .html)")
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        if ruta.endswith('.json'):
+            json.dump(perfil, archivo, ensure_ascii=False, indent=2, default=str)
+        else:
+            archivo.write(perfil_html(perfil))
+
+
+# Formatea un número del perfil para la página HTML
+def _texto(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, float):
+        return f"{valor:.4g}"
+    return html.escape(str(valor))
+
+
+# Página HTML autocontenida con una tabla resumen y, por columna, su histograma y sus valores más frecuentes
+def perfil_html(perfil):
+    filas = []
+    detalles = []
+    for columna, datos in perfil['columnas'].items():
+        cuantiles = datos.get('cuantiles', {})
+        filas.append("<tr>" + "".join(f"<td>{_texto(valor)}</td>" for valor in (
+            columna, datos['nulos'], f"{100 * datos['tasa_nulos']:.1f}%", datos['distintos'], datos['memoria'],
+            datos.get('media'), datos.get('desviacion'), datos.get('minimo'), cuantiles.get('0.5'), datos.get('maximo'))) + "</tr>")
+
+        partes = [f"<h2>{html.escape(columna)}</h2>"]
+        if 'histograma' in datos:
+            conteos = datos['histograma']['conteos']
+            maximo = max(conteos) or 1
+            barras = "".join(f'<div class="barra" style="height:{100 * conteo / maximo:.0f}%" title="{conteo}"></div>' for conteo in conteos)
+            partes.append(f'<div class="histograma">{barras}</div>')
+            partes.append("<p>Cuantiles: " + ", ".join(f"{float(q):.0%}: {_texto(valor)}" for q, valor in cuantiles.items()) + "</p>")
+        if datos['frecuentes']:
+            partes.append("<table><tr><th>Valor</th><th>Filas</th></tr>" + "".join(
+                f"<tr><td>{_texto(valor)}</td><td>{conteo}</td></tr>" for valor, conteo in datos['frecuentes']) + "</table>")
+        detalles.append("<section>" + "".join(partes) + "</section>")
+
+    return f"""<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>Perfil de los datos</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; margin-bottom: 1em; }}
+td, th {{ border: 1px solid #ccc; padding: 2px 8px; text-align: right; }}
+.histograma {{ display: flex; align-items: flex-end; height: 80px; width: 400px; gap: 1px; }}
+.barra {{ flex: 1; background: #4c72b0; }}
+</style></head><body>
+<h1>Perfil de los datos</h1>
+<p>{html.escape(str(perfil.get('fuente', '')))} &mdash; {perfil['filas']} filas, {len(perfil['columnas'])} columnas, {perfil['memoria'] / 1024**2:.2f} MB</p>
+<table><tr><th>Columna</th><th>Nulos</th><th>% nulos</th><th>Distintos</th><th>Memoria (bytes)</th>
+<th>Media</th><th>Desviación</th><th>Mínimo</th><th>Mediana</th><th>Máximo</th></tr>
+{''.join(filas)}
+</table>
+{''.join(detalles)}
+</body></html>
+"""
@@ -0,0 +1,121 @@
+import json
+import os
+import time
+from backend.motor import Preprocesador
+
+
+# Opciones del motor que se pueden fijar en la sección "opciones" de la especificación
+OPCIONES_MOTOR = ('tamano_bloque', 'compacto', 'proyectar', 'filtro', 'compresion', 'filas_grupo', 'error_cuantiles', 'float32',
+                  'informe', 'formato_graficos', 'perfil', 'n_jobs')
+
+
+# Lee una especificación de pipeline en JSON o, si la extensión es .yaml/.yml, en YAML
+# Tiene la misma forma que datos.json ("columnas", "features", "target") más las claves:
+#   fuente, tabla, filtro, nulos, categoricos, codificaciones, normalizacion, atipicos, exportar y opciones
+# Con "guardar_artefacto" se guardan los pasos ajustados; con "artefacto" no se ajusta nada y solo se
+# aplican los pasos de ese artefacto (modo solo transformación, sin features, target ni estrategias).
+# Con la opción "informe" se guardan además los histogramas y el heatmap de correlación de los datos procesados
+# y con "perfil" el perfil de los datos leídos (.json o .html). Si "exportar" es una base SQLite, la clave
+# "sqlite" indica la tabla, el modo (reemplazar o anadir) y las columnas con índice: {"tabla": ..., "modo": ..., "indices": [...]}
+def cargar_especificacion(ruta):
+    with open(ruta, encoding='utf-8') as archivo:
+        if ruta.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Para leer especificaciones YAML es necesario instalar PyYAML (pip install pyyaml)")
+            return yaml.safe_load(archivo)
+        return json.load(archivo)
+
+
+# Ejecuta de principio a fin, sin preguntar nada, el preprocesado descrito en la especificación
+# (un diccionario o la ruta de un archivo). Las opciones indicadas aquí tienen prioridad sobre las
+# de la especificación. Devuelve un resumen con las filas leídas y escritas y el tiempo empleado
+def ejecutar_pipeline(especificacion, **opciones):
+    if isinstance(especificacion, str):
+        especificacion = cargar_especificacion(especificacion)
+    obligatorias = ('fuente', 'exportar') if especificacion.get('artefacto') else ('fuente', 'features', 'target', 'exportar')
+    for clave in obligatorias:
+        if not especificacion.get(clave):
+            raise ValueError(f"Falta la clave '{clave}' en la especificación del pipeline")
+
+    configuracion = dict(especificacion.get('opciones', {}))
+    if 'bloque' in configuracion: # Mismo nombre que el argumento --bloque de main.py
+        configuracion['tamano_bloque'] = configuracion.pop('bloque')
+    if especificacion.get('filtro'):
+        configuracion['filtro'] = especificacion['filtro']
+    desconocidas = set(configuracion) - set(OPCIONES_MOTOR)
+    if desconocidas:
+        raise ValueError(f"Opciones desconocidas en la especificación: {', '.join(sorted(desconocidas))}")
+    configuracion.update(opciones)
+    configuracion.setdefault('verboso', False)
+
+    inicio = time.perf_counter()
+    motor = Preprocesador(**configuracion)
+    motor.cargar(especificacion['fuente'], especificacion.get('tabla'))
+    if especificacion.get('artefacto'):
+        motor.aplicar_artefacto(especificacion['artefacto'])
+        return _exportar(motor, especificacion, inicio)
+    motor.seleccionar_columnas(especificacion['features'], especificacion['target'])
+
+    # La detección de nulos recorre la fuente sin cambios, con lo que también cuenta sus filas
+    faltantes = motor.detectar_nulos()
+
+    # Paso 2.2: la estrategia puede ser un nombre, {"estrategia": ..., "valor": ..., "por": ...}
+    # o {"columnas": {columna: estrategia}} con una estrategia para cada columna
+    nulos = especificacion.get('nulos')
+    if isinstance(nulos, dict) and 'columnas' in nulos:
+        motor.imputar(nulos['columnas'])
+    else:
+        if isinstance(nulos, dict):
+            nulos = dict(nulos)
+            estrategia = nulos.pop('estrategia')
+        else:
+            estrategia = nulos
+            nulos = {}
+        if estrategia and not faltantes.empty:
+            motor.manejar_nulos(estrategia, **nulos)
+
+    # Pasos 2.3 a 2.5: si una estrategia no se indica, el paso se omite
+    # Las correspondencias del Label Encoding se reutilizan si el archivo existe y se guardan al terminar
+    if especificacion.get('codificaciones') and os.path.exists(especificacion['codificaciones']):
+        motor.cargar_codificaciones(especificacion['codificaciones'])
+    categoricos = especificacion.get('categoricos')
+    if isinstance(categoricos, dict): # {"estrategia": ..., "max_categorias": ..., "ancho": ..., "pliegues": ...}
+        categoricos = dict(categoricos)
+        motor.transformar_categoricos(categoricos.pop('estrategia'), **categoricos)
+    elif categoricos:
+        motor.transformar_categoricos(categoricos)
+    if especificacion.get('codificaciones') and motor.codificaciones:
+        motor.guardar_codificaciones(especificacion['codificaciones'])
+    normalizacion = especificacion.get('normalizacion')
+    if isinstance(normalizacion, dict): # {"estrategia": ..., "float32": true}
+        normalizacion = dict(normalizacion)
+        motor.normalizar(normalizacion.pop('estrategia'), **normalizacion)
+    elif normalizacion:
+        motor.normalizar(normalizacion)
+    atipicos = especificacion.get('atipicos')
+    if isinstance(atipicos, dict): # {"estrategia": "eliminar", "metodo": "isolation_forest", "muestra": ..., "contaminacion": ...}
+        atipicos = dict(atipicos)
+        motor.manejar_atipicos(atipicos.pop('estrategia'), **atipicos)
+    elif atipicos:
+        motor.manejar_atipicos(atipicos)
+    if especificacion.get('guardar_artefacto'):
+        motor.guardar_artefacto(especificacion['guardar_artefacto'])
+    if motor.informe:
+        motor.guardar_histogramas()
+        motor.guardar_heatmap()
+    return _exportar(motor, especificacion, inicio)
+
+
+# Exporta el resultado y devuelve el resumen de la ejecución
+def _exportar(motor, especificacion, inicio):
+    motor.esperar_perfil()
+    filas_salida = motor.exportar(especificacion['exportar'], **especificacion.get('sqlite', {}))
+    return {
+        'fuente': especificacion['fuente'],
+        'salida': especificacion['exportar'],
+        'filas_entrada': motor.filas_entrada,
+        'filas_salida': filas_salida,
+        'segundos': time.perf_counter() - inicio,
+    }
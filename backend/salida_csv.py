@@ -0,0 +1,96 @@
+import bz2
+import gzip
+import os
+import queue
+import threading
+import time
+
+
+# Compresión de cada extensión de CSV que se puede exportar
+COMPRESIONES_CSV = {'.csv': None, '.csv.gz': 'gzip', '.csv.bz2': 'bz2', '.csv.zst': 'zstd'}
+EXTENSIONES_CSV = tuple(COMPRESIONES_CSV)
+FILAS_CSV = 100_000 # Filas que se formatean de una vez
+TROZOS_EN_COLA = 4 # Trozos ya formateados que pueden esperar a ser comprimidos y escritos
+
+
+# Compresión que corresponde a la extensión del archivo
+def compresion_csv(archivo):
+    for extension in sorted(EXTENSIONES_CSV, key=len, reverse=True):
+        if archivo.endswith(extension):
+            return COMPRESIONES_CSV[extension]
+    raise ValueError(f"Extensión de CSV no soportada: {archivo}")
+
+
+# Abre el archivo de salida con la compresión indicada; zstd usa el flujo comprimido de pyarrow
+def _abrir(ruta, compresion):
+    if compresion == 'zstd':
+        import pyarrow as pa
+        return pa.output_stream(ruta, compression='zstd')
+    if compresion == 'gzip': # Sin nombre ni fecha en la cabecera: el mismo contenido da el mismo archivo
+        return gzip.GzipFile(filename='', mode='wb', fileobj=open(ruta, 'wb'), mtime=0)
+    if compresion == 'bz2':
+        return bz2.BZ2File(ruta, 'wb')
+    return open(ruta, 'wb')
+
+
+def _cerrar(escritor):
+    crudo = getattr(escritor, 'fileobj', None) # GzipFile no cierra el archivo que recibe
+    escritor.close()
+    if crudo is not None:
+        crudo.close()
+
+
+# Escribe los bloques en un CSV, opcionalmente comprimido (gzip, bz2 o zstd según la extensión).
+# Cada bloque se formatea por trozos de filas en este hilo mientras otro comprime y escribe los trozos
+# anteriores (la compresión libera el GIL), así que las dos etapas se solapan. Se escribe en un archivo
+# temporal que se renombra al terminar, de modo que nunca queda un CSV a medias con el nombre final.
+# Devuelve las filas escritas, los bytes del CSV sin comprimir y en disco y los segundos empleados
+def escribir_csv(bloques, archivo, filas=FILAS_CSV):
+    compresion = compresion_csv(archivo)
+    temporal = f"{archivo}.tmp"
+    cola = queue.Queue(maxsize=TROZOS_EN_COLA)
+    errores = []
+
+    def escribir():
+        try:
+            escritor = _abrir(temporal, compresion)
+            try:
+                while (trozo := cola.get()) is not None:
+                    escritor.write(trozo)
+            finally:
+                _cerrar(escritor)
+        except Exception as e:
+            errores.append(e)
+            while cola.get() is not None: # Se vacía la cola para que el formateo no se quede esperando
+                pass
+
+    inicio = time.perf_counter()
+    hilo = threading.Thread(target=escribir, daemon=True)
+    hilo.start()
+    escritas = 0
+    bytes_csv = 0
+    cabecera = True
+    try:
+        try:
+            for bloque in bloques:
+                # Sin filas solo se escribe la cabecera, si aún no se ha escrito
+                for desde in range(0, len(bloque), filas) if len(bloque) else ([0] if cabecera else []):
+                    trozo = bloque.iloc[desde:desde + filas].to_csv(index=False, header=cabecera).encode('utf-8')
+                    cabecera = False
+                    bytes_csv += len(trozo)
+                    cola.put(trozo)
+                escritas += len(bloque)
+                if errores:
+                    break
+        finally:
+            cola.put(None)
+            hilo.join()
+        if errores:
+            raise errores[0]
+        os.replace(temporal, archivo)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    return {'filas': escritas, 'bytes': bytes_csv, 'bytes_archivo': os.path.getsize(archivo),
+            'segundos': time.perf_counter() - inicio}
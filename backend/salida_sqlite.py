@@ -0,0 +1,96 @@
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+from backend.disperso import densificar
+from backend.fuentes import citar
+
+
+# Exportación a una tabla SQLite
+EXTENSIONES_SQLITE = ('.sqlite', '.db')
+MODOS_SQLITE = ('reemplazar', 'anadir')
+TABLA_SQLITE = 'datos' # Nombre de la tabla si no se indica otro
+FILAS_LOTE_SQLITE = 50_000 # Filas de cada executemany
+
+
+# Tipo de SQLite de una columna según su dtype
+def tipo_sqlite(serie):
+    dtype = serie.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        dtype = dtype.categories.dtype
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+    return 'TEXT' # Textos, fechas (en formato ISO) y cualquier otro tipo
+
+
+# Valores de una columna como lista de objetos de Python que sqlite3 sabe guardar (None en los nulos).
+# Los enteros y decimales de NumPy se convierten de una vez con tolist(); los NaN de los decimales se
+# guardan como NULL
+def _valores(serie):
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        serie = serie.dt.strftime('%Y-%m-%d %H:%M:%S')
+    elif pd.api.types.is_bool_dtype(serie) and serie.dtype == bool:
+        return serie.to_numpy(dtype='int8').tolist()
+    if isinstance(serie.dtype, np.dtype) and serie.dtype.kind in 'iuf':
+        return serie.to_numpy().tolist()
+    valores = serie.to_numpy(dtype=object, na_value=None).tolist()
+    if any(isinstance(valor, np.generic) for valor in valores):
+        valores = [valor.item() if isinstance(valor, np.generic) else valor for valor in valores]
+    return valores
+
+
+# Escribe los bloques en una tabla de una base SQLite. La tabla se crea con los tipos del primer bloque
+# (reemplazando la que hubiera o añadiendo filas a la existente) y las filas se insertan por lotes con
+# executemany dentro de una única transacción explícita: si algo falla no queda nada a medias. Durante la
+# carga se usa el diario WAL con synchronous=NORMAL y al terminar se vuelve al modo anterior; los índices
+# se crean después de insertar las filas, que es más rápido que mantenerlos durante la carga.
+# Devuelve las filas escritas y los segundos empleados
+def escribir_sqlite(bloques, archivo, tabla=TABLA_SQLITE, modo='reemplazar', indices=(), filas=FILAS_LOTE_SQLITE):
+    if modo not in MODOS_SQLITE:
+        raise ValueError(f"Modo de exportación a SQLite desconocido: {modo}")
+    inicio = time.perf_counter()
+    conexion = sqlite3.connect(archivo, isolation_level=None) # Las transacciones se abren y cierran a mano
+    try:
+        diario = conexion.execute("PRAGMA journal_mode").fetchone()[0]
+        conexion.execute("PRAGMA journal_mode = WAL")
+        conexion.execute("PRAGMA synchronous = NORMAL")
+        escritas = 0
+        insercion = None
+        conexion.execute("BEGIN")
+        try:
+            for bloque in bloques:
+                bloque = densificar(bloque)
+                if insercion is None: # Con el primer bloque se crea la tabla
+                    columnas = list(bloque.columns)
+                    existentes = [fila[1] for fila in conexion.execute(f"PRAGMA table_info({citar(tabla)})")]
+                    if modo == 'reemplazar' or not existentes:
+                        conexion.execute(f"DROP TABLE IF EXISTS {citar(tabla)}")
+                        definicion = ", ".join(f"{citar(columna)} {tipo_sqlite(bloque[columna])}" for columna in columnas)
+                        conexion.execute(f"CREATE TABLE {citar(tabla)} ({definicion})")
+                    else:
+                        faltan = [str(columna) for columna in columnas if str(columna) not in existentes]
+                        if faltan:
+                            raise ValueError(f"La tabla {tabla} no tiene las columnas: {', '.join(faltan)}")
+                    insercion = (f"INSERT INTO {citar(tabla)} ({', '.join(citar(columna) for columna in columnas)}) "
+                                 f"VALUES ({', '.join('?' * len(columnas))})")
+                for desde in range(0, len(bloque), filas):
+                    trozo = bloque.iloc[desde:desde + filas]
+                    conexion.executemany(insercion, zip(*(_valores(trozo[columna]) for columna in columnas)))
+                escritas += len(bloque)
+            for columna in indices:
+                conexion.execute(f"CREATE INDEX IF NOT EXISTS {citar(f'idx_{tabla}_{columna}')} ON {citar(tabla)} ({citar(columna)})")
+            conexion.execute("COMMIT")
+        except BaseException:
+            conexion.execute("ROLLBACK")
+            raise
+        finally:
+            conexion.execute("PRAGMA synchronous = FULL")
+            try: # Volver al diario anterior necesita que no haya otras conexiones abiertas a la base
+                conexion.execute(f"PRAGMA journal_mode = {diario}")
+            except sqlite3.OperationalError:
+                pass
+    finally:
+        conexion.close()
+    return {'filas': escritas, 'segundos': time.perf_counter() - inicio}
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+
+# Indica si una columna es numérica (enteros y decimales de cualquier ancho, también los nullables)
+# Los booleanos no se consideran numéricos para normalizar ni para buscar atípicos
+def es_numerica(serie):
+    return pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie)
+
+
+# Indica si una columna es categórica: texto (object o string) o de tipo category
+def es_categorica(serie):
+    return (pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie)
+            or isinstance(serie.dtype, pd.CategoricalDtype))
+
+
+# Memoria ocupada por el DataFrame en bytes, contando el contenido real de los textos
+def memoria(datos):
+    return int(datos.memory_usage(deep=True).sum())
+
+
+# Reduce cada columna al tipo más pequeño que conserva sus valores:
+#  - enteros al menor ancho (con o sin signo) que admite su rango
+#  - decimales a float32 solo si todos los valores se representan exactamente
+#  - textos con pocas categorías distintas (proporción menor que umbral_categorias) a category
+def compactar(datos, umbral_categorias=0.5):
+    for columna in datos.columns:
+        serie = datos[columna]
+        if pd.api.types.is_bool_dtype(serie):
+            continue
+
+        if pd.api.types.is_integer_dtype(serie):
+            if serie.notna().all() and len(serie) and serie.min() >= 0:
+                datos[columna] = pd.to_numeric(serie, downcast='unsigned')
+            else:
+                datos[columna] = pd.to_numeric(serie, downcast='integer')
+
+        elif pd.api.types.is_float_dtype(serie) and serie.dtype != np.float32:
+            reducida = serie.astype(np.float32)
+            if np.array_equal(reducida.to_numpy(dtype=np.float64), serie.to_numpy(dtype=np.float64), equal_nan=True):
+                datos[columna] = reducida
+
+        elif pd.api.types.is_object_dtype(serie) and len(serie):
+            if serie.nunique(dropna=True) / len(serie) < umbral_categorias:
+                datos[columna] = serie.astype('category')
+    return datos
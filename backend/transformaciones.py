@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+from backend.anomalias import mascara_anomalias
+from backend.atipicos import eliminar_atipicos, reemplazar_atipicos
+from backend.codificadores import codificar_frecuencia, codificar_hash, codificar_target
+from backend.disperso import one_hot_disperso
+from backend.vecinos import imputar_knn
+
+
+# Aplica un paso de preprocesado ya ajustado sobre un DataFrame (completo o un bloque)
+# Los pasos son diccionarios con un 'tipo' y los parámetros calculados previamente,
+# de modo que se pueden repetir sobre cada bloque sin volver a calcular nada
+def aplicar_paso(datos, paso):
+    tipo = paso['tipo']
+
+    if tipo == 'eliminar_nulos': # Elimina las filas con nulos en las columnas indicadas (el target puede no estar)
+        datos.dropna(subset=[columna for columna in paso['columnas'] if columna in datos.columns], inplace=True)
+
+    elif tipo == 'rellenar': # Rellena con un valor por columna o con una constante
+        valores = paso['valores']
+        if not isinstance(valores, dict):
+            valores = {columna: valores for columna in datos.columns}
+        # Se reemplaza solo cada columna indicada, sin copiar el resto de la tabla
+        for columna, valor in valores.items():
+            if columna not in datos.columns or not datos[columna].hasnans:
+                continue
+            # Las columnas category solo admiten valores que estén entre sus categorías
+            if isinstance(datos[columna].dtype, pd.CategoricalDtype) and pd.notna(valor) and valor not in datos[columna].cat.categories:
+                datos[columna] = datos[columna].cat.add_categories([valor])
+            datos[columna] = datos[columna].fillna(valor)
+
+    elif tipo == 'rellenar_grupo': # Rellena con la mediana del grupo de cada fila (o la de la columna si el grupo no tiene)
+        grupos = datos[paso['por']]
+        for columna, medianas in paso['medianas'].items():
+            if columna in datos.columns and datos[columna].hasnans:
+                relleno = grupos.map(medianas).astype('float64')
+                datos[columna] = datos[columna].fillna(relleno).fillna(paso['defecto'][columna])
+
+    elif tipo == 'knn': # Media de los vecinos más cercanos del conjunto de referencia
+        datos = imputar_knn(datos, paso)
+
+    elif tipo == 'one_hot': # Las categorías fijas garantizan las mismas columnas en todos los bloques
+        codigos = {}
+        for columna, categorias in paso['categorias'].items():
+            codigos[columna] = pd.Categorical(datos[columna], categories=categorias).codes
+            if columna in paso.get('otros', ()): # Los valores no conservados van a la última categoría ("otros")
+                codigos[columna] = np.where((codigos[columna] == -1) & datos[columna].notna().to_numpy(), len(categorias) - 1, codigos[columna])
+        if paso.get('disperso'):
+            datos = one_hot_disperso(datos, codigos, paso['categorias'])
+        else:
+            for columna, categorias in paso['categorias'].items():
+                datos[columna] = pd.Categorical.from_codes(codigos[columna], categories=categorias)
+            datos = pd.get_dummies(datos, columns=list(paso['categorias']), dtype=int)
+
+    elif tipo == 'label': # Posición en la lista de categorías con una sola pasada de hash; -1 para nulos y valores nuevos
+        for columna, categorias in paso['categorias'].items():
+            # Los códigos usan el entero más pequeño que admite el número de categorías (int8, int16...)
+            datos[columna] = pd.Categorical(datos[columna], categories=categorias).codes
+
+    elif tipo == 'hash': # Feature hashing a un número fijo de columnas
+        datos = codificar_hash(datos, paso)
+
+    elif tipo == 'frecuencia': # Veces (o fracción de filas) que aparece cada valor
+        datos = codificar_frecuencia(datos, paso)
+
+    elif tipo == 'target': # Media suavizada del target por categoría, fuera de pliegue si está el target
+        datos = codificar_target(datos, paso)
+
+    elif tipo == 'escalar': # (x - desplazamiento) / escala para Min-Max, Z-score y el escalado robusto
+        datos = escalar(datos, paso)
+
+    elif tipo == 'eliminar_atipicos': # Conserva solo las filas dentro de los límites de todas las columnas
+        datos = eliminar_atipicos(datos, paso['limites'])
+
+    elif tipo == 'eliminar_anomalas': # Descarta las filas que el detector multivariante puntúa por encima del umbral
+        datos = datos.take(np.flatnonzero(~mascara_anomalias(datos, paso)))
+
+    elif tipo == 'reemplazar_atipicos': # Sustituye los valores fuera de los límites por la mediana
+        datos = reemplazar_atipicos(datos, paso['limites'], paso['medianas'])
+
+    else:
+        raise ValueError(f"Tipo de paso desconocido: {tipo}")
+
+    return datos
+
+
+# Escala cada columna con operaciones de NumPy sobre su propio array, sin crear intermedios: las columnas float
+# del tipo de destino se modifican en su sitio y el resto se convierte una sola vez (a float32 si el paso lo pide)
+def escalar(datos, paso):
+    for columna, (desplazamiento, escala) in paso['parametros'].items():
+        serie = datos[columna]
+        destino = np.dtype('float32') if paso.get('float32') else \
+            serie.dtype if isinstance(serie.dtype, np.dtype) and serie.dtype.kind == 'f' else np.dtype('float64')
+        valores = serie.to_numpy() if serie.dtype == destino else None
+        en_su_sitio = valores is not None and valores.flags.writeable
+        if not en_su_sitio:
+            valores = serie.to_numpy(dtype=destino, na_value=np.nan, copy=True)
+        np.subtract(valores, destino.type(desplazamiento), out=valores)
+        np.divide(valores, destino.type(escala), out=valores)
+        if not en_su_sitio:
+            datos[columna] = valores
+    return datos
+
+
+# Columnas cuyos valores cambia un paso; None si el paso elimina filas o puede afectar a cualquier columna
+def columnas_modificadas(paso):
+    tipo = paso['tipo']
+    if tipo in ('eliminar_nulos', 'eliminar_atipicos', 'eliminar_anomalas'):
+        return None
+    elif tipo == 'rellenar':
+        return list(paso['valores']) if isinstance(paso['valores'], dict) else None
+    elif tipo == 'rellenar_grupo':
+        return list(paso['medianas'])
+    elif tipo == 'knn':
+        return list(paso['columnas'])
+    elif tipo in ('one_hot', 'label'):
+        return list(paso['categorias'])
+    elif tipo == 'hash':
+        return list(paso['columnas'])
+    elif tipo == 'frecuencia':
+        return list(paso['conteos'])
+    elif tipo == 'target':
+        return list(paso['columnas'])
+    elif tipo == 'escalar':
+        return list(paso['parametros'])
+    elif tipo == 'reemplazar_atipicos':
+        return list(paso['limites'])
+    raise ValueError(f"Tipo de paso desconocido: {tipo}")
+
+
+# Aplica en orden una lista de pasos
+def aplicar_pasos(datos, pasos):
+    for paso in pasos:
+        datos = aplicar_paso(datos, paso)
+    return datos
@@ -0,0 +1,96 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+
+# Opciones por defecto de la imputación por vecinos más cercanos (KNN)
+VECINOS_KNN = 5
+MUESTRA_KNN = 50_000 # Filas completas como máximo en el conjunto de referencia (None = todas)
+LOTE_KNN = 10_000 # Filas que busca cada hilo de una vez
+DIMENSIONES_KDTREE = 15 # A partir de aquí se usa un BallTree, que se degrada menos con muchas dimensiones
+
+
+# Reúne una muestra aleatoria uniforme de las filas completas, ya escaladas, recorriendo los bloques.
+# A cada fila se le asigna una clave aleatoria y se conservan las de menor clave, de forma que
+# la memoria nunca supera la muestra más un bloque
+def muestra_referencia(bloques, columnas, desplazamiento, escala, muestra=MUESTRA_KNN, semilla=0):
+    generador = np.random.default_rng(semilla)
+    referencia = np.empty((0, len(columnas)))
+    claves = np.empty(0)
+    for bloque in bloques:
+        valores = (bloque[columnas].to_numpy(dtype='float64', na_value=np.nan) - desplazamiento) / escala
+        valores = valores[~np.isnan(valores).any(axis=1)]
+        referencia = np.vstack([referencia, valores])
+        claves = np.concatenate([claves, generador.random(len(valores))])
+        if muestra is not None and len(referencia) > muestra:
+            elegidas = np.argpartition(claves, muestra)[:muestra]
+            referencia, claves = referencia[elegidas], claves[elegidas]
+    return referencia
+
+
+# Ajusta el paso de imputación KNN: las columnas se escalan con su media y desviación para que
+# todas pesen lo mismo en la distancia y se guarda el conjunto de referencia. n_jobs son los hilos
+# de la búsqueda de vecinos (None = uno por núcleo)
+def ajustar_knn(bloques, columnas, desplazamiento, escala, vecinos=VECINOS_KNN, muestra=MUESTRA_KNN, lote=LOTE_KNN, n_jobs=None):
+    referencia = muestra_referencia(bloques, columnas, np.asarray(desplazamiento, dtype='float64'),
+                                    np.asarray(escala, dtype='float64'), muestra)
+    if not len(referencia):
+        raise ValueError("No hay filas sin valores faltantes para usar como vecinos")
+    return {'tipo': 'knn', 'columnas': list(columnas), 'desplazamiento': list(desplazamiento), 'escala': list(escala),
+            'referencia': referencia, 'vecinos': min(vecinos, len(referencia)), 'lote': lote, 'n_jobs': n_jobs, 'arboles': {}}
+
+
+# Árbol de búsqueda sobre las columnas observadas; se construye una vez por patrón de nulos
+def _arbol(paso, observadas):
+    clave = tuple(observadas)
+    if clave not in paso['arboles']:
+        from sklearn.neighbors import BallTree, KDTree
+        puntos = paso['referencia'][:, observadas]
+        paso['arboles'][clave] = KDTree(puntos) if puntos.shape[1] <= DIMENSIONES_KDTREE else BallTree(puntos)
+    return paso['arboles'][clave]
+
+
+# Rellena cada nulo con la media de los vecinos más cercanos según las columnas que sí tiene la fila.
+# Solo se convierten a NumPy las filas con algún nulo y las búsquedas se reparten por lotes entre hilos.
+# Las columnas del paso que no están en los datos (el target en un artefacto antiguo) se tratan como no
+# observadas para la distancia y no se añaden
+def imputar_knn(datos, paso):
+    columnas = paso['columnas']
+    presentes = np.array([columna in datos.columns for columna in columnas])
+    cargadas = [columna for columna in columnas if columna in datos.columns]
+    faltan = np.ones((len(datos), len(columnas)), dtype=bool)
+    faltan[:, presentes] = datos[cargadas].isnull().to_numpy()
+    filas = np.flatnonzero(faltan[:, presentes].any(axis=1))
+    if not len(filas):
+        return datos
+    faltan = faltan[filas]
+    desplazamiento = np.asarray(paso['desplazamiento'])
+    escala = np.asarray(paso['escala'])
+    valores = np.full((len(filas), len(columnas)), np.nan)
+    valores[:, presentes] = datos[cargadas].iloc[filas].to_numpy(dtype='float64', na_value=np.nan)
+    valores = (valores - desplazamiento) / escala
+
+    patrones, inversa = np.unique(faltan, axis=0, return_inverse=True)
+    inversa = inversa.ravel()
+    with ThreadPoolExecutor(max_workers=paso.get('n_jobs') or os.cpu_count()) as pool:
+        for i, patron in enumerate(patrones):
+            seleccion = np.flatnonzero(inversa == i)
+            observadas = ~patron
+            if not observadas.any(): # Sin ninguna columna observada se usa la media (0 una vez escalada)
+                valores[np.ix_(seleccion, patron)] = 0.0
+                continue
+            arbol = _arbol(paso, observadas)
+            consulta = valores[seleccion][:, observadas]
+            lotes = [consulta[inicio:inicio + paso['lote']] for inicio in range(0, len(consulta), paso['lote'])]
+            indices = np.vstack(list(pool.map(lambda lote: arbol.query(lote, k=paso['vecinos'], return_distance=False), lotes)))
+            valores[np.ix_(seleccion, patron)] = paso['referencia'][:, patron][indices].mean(axis=1)
+
+    valores = valores * escala + desplazamiento
+    for j, columna in enumerate(columnas):
+        if presentes[j] and faltan[:, j].any():
+            serie = datos[columna].to_numpy(dtype='float64', na_value=np.nan, copy=True)
+            serie[filas[faltan[:, j]]] = valores[faltan[:, j], j]
+            tipo = datos[columna].dtype if pd.api.types.is_float_dtype(datos[columna].dtype) else 'float64'
+            datos[columna] = pd.Series(serie, index=datos.index).astype(tipo)
+    return datos
@@ -1,9 +1,106 @@
+import argparse
+from backend.cache import CacheCargas
+from backend.lotes import ejecutar_lote
+from backend.pipeline import ejecutar_pipeline
 from manejodatos import Datos
 
+# Línea de resumen de un archivo procesado; en el modo solo transformación por bloques no se cuentan las filas leídas
+def _resumen(resumen):
+    leidas = f"{resumen['filas_entrada']} filas leídas, " if resumen['filas_entrada'] is not None else ""
+    return f"{resumen['fuente']} -> {resumen['salida']}: {leidas}{resumen['filas_salida']} filas escritas en {resumen['segundos']:.2f} s"
+
 def main():
 
     """Función principal para ejecutar la aplicación."""
-    Datos()  # Llamamos a menu() para iniciar la aplicación
+    parser = argparse.ArgumentParser(description="Preprocesador de datos")
+    parser.add_argument("--bloque", type=int, default=None,
+                        help="Procesa CSV, tablas SQLite, Parquet y Feather por bloques de este número de filas (para archivos grandes)")
+    parser.add_argument("--compacto", action="store_true",
+                        help="Reduce los tipos de las columnas al cargar para ahorrar memoria (no disponible con --bloque)")
+    parser.add_argument("--proyectar", action="store_true",
+                        help="Lee primero el esquema y después solo las columnas seleccionadas")
+    parser.add_argument("--filtro", default=None,
+                        help="Condición para filtrar filas al leer: SQL tras WHERE en SQLite, "
+                             "o 'col op valor [and ...]' en Parquet, Feather, CSV y Excel")
+    parser.add_argument("--compresion", default=None,
+                        help="Compresión al exportar a Parquet (snappy, zstd, gzip...) o Feather (lz4, zstd)")
+    parser.add_argument("--filas-grupo", type=int, default=None,
+                        help="Número de filas por grupo al exportar a Parquet")
+    parser.add_argument("--cuantiles-aprox", type=float, nargs="?", const=0.001, default=None, metavar="ERROR",
+                        help="Calcula medianas y cuartiles con resúmenes aproximados de memoria acotada "
+                             "(error de rango, por defecto 0.001; es lo predeterminado con --bloque). "
+                             "Con 0 son exactos, guardando la frecuencia de cada valor distinto")
+    parser.add_argument("--float32", action="store_true",
+                        help="Guarda las columnas normalizadas en float32 (la mitad de memoria)")
+    parser.add_argument("--informe", default=None,
+                        help="Guarda los gráficos en este directorio sin necesidad de pantalla (backend Agg)")
+    parser.add_argument("--formato-graficos", choices=("png", "svg"), default="png",
+                        help="Formato de los gráficos guardados en el directorio de informe")
+    parser.add_argument("--perfil", default=None,
+                        help="Genera en segundo plano, al cargar, el perfil de los datos en este archivo (.json o .html)")
+    parser.add_argument("--cache", default=".cache_datos",
+                        help="Directorio de la caché de fuentes ya leídas")
+    parser.add_argument("--cache-max-mb", type=int, default=1024,
+                        help="Tamaño máximo de la caché; se eliminan las entradas menos usadas")
+    parser.add_argument("--cache-hash", action="store_true",
+                        help="Identifica los archivos por el hash de su contenido en lugar de la fecha de modificación")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="Lee siempre de los archivos sin usar la caché")
+    parser.add_argument("--limpiar-cache", action="store_true",
+                        help="Vacía la caché antes de empezar")
+    parser.add_argument("--pipeline", default=None,
+                        help="Ejecuta sin menú el preprocesado descrito en este archivo JSON o YAML")
+    parser.add_argument("--lote", default=None,
+                        help="Aplica el pipeline a cada archivo de este directorio o patrón glob (requiere --pipeline)")
+    parser.add_argument("--salida", default="salida",
+                        help="Directorio donde se escribe una salida por cada archivo del lote")
+    parser.add_argument("--procesos", type=int, default=None,
+                        help="Número de procesos del lote (por defecto, uno por núcleo)")
+    argumentos = parser.parse_args()
+    if argumentos.lote and not argumentos.pipeline:
+        parser.error("--lote requiere --pipeline")
+    if argumentos.compacto and argumentos.bloque:
+        parser.error("--compacto no se puede combinar con --bloque: por bloques los tipos no se reducen")
+
+    cache = None
+    if not argumentos.sin_cache:
+        cache = CacheCargas(argumentos.cache, argumentos.cache_max_mb * 1024**2, argumentos.cache_hash)
+        if argumentos.limpiar_cache:
+            cache.limpiar()
+
+    if argumentos.pipeline: # Ejecución sin interacción: se muestra solo el resumen
+        opciones = {nombre: valor for nombre, valor in (('tamano_bloque', argumentos.bloque), ('filtro', argumentos.filtro),
+                                                          ('compresion', argumentos.compresion), ('filas_grupo', argumentos.filas_grupo),
+                                                          ('error_cuantiles', argumentos.cuantiles_aprox),
+                                                          ('informe', argumentos.informe), ('perfil', argumentos.perfil)) if valor is not None}
+        if argumentos.compacto:
+            opciones['compacto'] = True
+        if argumentos.proyectar:
+            opciones['proyectar'] = True
+        if argumentos.float32:
+            opciones['float32'] = True
+        if argumentos.informe:
+            opciones['formato_graficos'] = argumentos.formato_graficos
+        if argumentos.lote: # Cada proceso lee su archivo una sola vez, así que no se usa la caché
+            lote = ejecutar_lote(argumentos.pipeline, argumentos.lote, argumentos.salida, argumentos.procesos, **opciones)
+            for resumen in lote['resultados']:
+                if 'error' in resumen:
+                    print(f"{resumen['fuente']}: ERROR {resumen['error']}")
+                else:
+                    print(_resumen(resumen))
+            print(f"Lote: {lote['archivos']} archivos ({lote['fallos']} fallidos) con {lote['procesos']} procesos, "
+                  f"{lote['filas_entrada']} filas leídas, {lote['filas_salida']} escritas en {lote['segundos']:.2f} s")
+            return
+
+        resumen = ejecutar_pipeline(argumentos.pipeline, cache=cache, **opciones)
+        print(_resumen(resumen))
+        return
+
+    Datos(tamano_bloque=argumentos.bloque, compacto=argumentos.compacto,
+          proyectar=argumentos.proyectar, filtro=argumentos.filtro,
+          compresion=argumentos.compresion, filas_grupo=argumentos.filas_grupo,
+          cache=cache, error_cuantiles=argumentos.cuantiles_aprox, float32=argumentos.float32,
+          informe=argumentos.informe, formato_graficos=argumentos.formato_graficos, perfil=argumentos.perfil)  # Llamamos a menu() para iniciar la aplicación
 
 
 if __name__ == "__main__":
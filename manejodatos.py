@@ -1,24 +1,27 @@
 
 from menu import mostrar_menu, cerrar, cargar_datos, mostrar_datos, seleccion_terminal
 import os
-import pandas as pd
-import sqlite3
-import seaborn as sns
+import numpy as np
 import matplotlib.pyplot as plt
-from sklearn.preprocessing import LabelEncoder, MinMaxScaler, StandardScaler
+from backend.anomalias import CONTAMINACION
+from backend.codificadores import COLUMNAS_HASH
+from backend.correlacion import COLUMNAS_ANOTADAS, PARES_FUERTES
+from backend.graficos import dibujar_heatmap, puntos_dispersion
+from backend.fuentes import EXTENSIONES_FEATHER, EXTENSIONES_PARQUET, listar_tablas
+from backend.motor import Preprocesador
+from backend.salida_sqlite import MODOS_SQLITE, TABLA_SQLITE
+from backend.vecinos import VECINOS_KNN
+from backend.tipos import es_numerica
 
 
-# Clase que maneja la carga y el preprocesamiento
-class Datos: 
-    def __init__(self, file_path=None):
-        self.ruta = None
-        self.datos = None
-        self.features = []
-        self.targets = None
+# Clase que maneja el menú interactivo; la carga y el preprocesamiento los hace el motor (Preprocesador)
+class Datos(Preprocesador): 
+    def __init__(self, file_path=None, **opciones):
+        super().__init__(**opciones)
+        if self.informe: # Sin pantalla: los gráficos se dibujan con Agg y se guardan en el directorio de informe
+            plt.switch_backend('Agg')
         self.paso = 1
         self.preprocesado = False
-    
-        
 
         self.proceso() # Inicia el flujo del menú
 
@@ -76,45 +79,37 @@ class Datos:
             return
         
         # Verifica que la extensión coincida con la opción seleccionada
-        extensiones = {1:'.csv', 2: ('.xlsx','.xls'), 3: ('.sqlite', '.db')}
+        extensiones = {1:'.csv', 2: ('.xlsx','.xls'), 3: ('.sqlite', '.db'), 4: EXTENSIONES_PARQUET, 5: EXTENSIONES_FEATHER}
         
         if not ruta.endswith(extensiones.get(opcion, '')):
             print('Archivo inválido: el tipo no coincide con la opción seleccionada')
             return
         try:
-            if ruta.endswith('.csv'): # Carga de un archivo CSV
-                    self.datos = pd.read_csv(ruta)
-                
-            elif ruta.endswith('.xlsx') or ruta.endswith('.xls'): # Carga de un archivo excel
-                    self.datos = pd.read_excel(ruta)
-                
-            elif ruta.endswith('.sqlite') or ruta.endswith('.db'): # Carga dese una base de datos SQLite
-                    conexion = sqlite3.connect(ruta)
-                    consulta = "SELECT name FROM sqlite_master WHERE type='table';"
-                    tablas = pd.read_sql(consulta, conexion) 
+            tabla = None
+            if ruta.endswith('.sqlite') or ruta.endswith('.db'): # En SQLite se elige primero la tabla
+                    tablas = listar_tablas(ruta)
                     
-                    if tablas.empty:
+                    if not tablas:
                         raise ValueError("No se encontraron tablas disponibles.")
                     
                     # Muestra las tablas disponibles y solicita la selección de una
                     print("Tablas disponibles en la base de datos:")
-                    for i, tabla in enumerate(tablas['name'], 1):
-                        print(f"  [{i}] {tabla}")
+                    for i, nombre in enumerate(tablas, 1):
+                        print(f"  [{i}] {nombre}")
 
                     seleccion = input("Seleccione una tabla: ") 
                     if not seleccion.isdigit() or not (1 <= int(seleccion) <= len(tablas)):
                         raise ValueError("Selección inválida.")
-                    
-                    # Obtiene el nombre y carga sus datos
-                    tabla_seleccionada = tablas.iloc[int(seleccion) - 1]['name']
-                    self.datos = pd.read_sql(f"SELECT * FROM {tabla_seleccionada}", conexion)
-                    conexion.close()
-                    
-                    print(f"Los datos de {tabla_seleccionada} fueron cargados correctamente")
+                    tabla = tablas[int(seleccion) - 1]
+
+            self.cargar(ruta, tabla)
+            if tabla is not None and not self.por_bloques and not self.proyectar:
+                print(f"Los datos de {tabla} fueron cargados correctamente")
             
-            mostrar_datos(self.datos, ruta)
+            mostrar_datos(self.datos, ruta, self.cache)
+            if self._perfil_pendiente is not None:
+                print(f"Generando en segundo plano el perfil de los datos en \"{self.perfil}\"; puede seguir trabajando")
             self.paso = 2
-            self.ruta = ruta
                 
                 
         except Exception as e:
@@ -122,15 +117,14 @@ class Datos:
 
     # Selecciona las columnas de entrada y salida
     def opcion2_selector_columnas(self):
-        self.features, self.targets = seleccion_terminal(list(self.datos.columns))
+        features, target = seleccion_terminal(list(self.datos.columns))
+        self.seleccionar_columnas(features, target)
         self.paso = 2.2
     
     # Manejo de valores faltantes
     def opcion2_manejo_nulos(self):
         # Toma las columnas seleccionadas anteriormente y calcula cuantos valores faltantes
-        seleccionadas = self.features + [self.targets] 
-        valores_faltantes = self.datos[seleccionadas].isnull().sum()
-        nulos = valores_faltantes[valores_faltantes > 0]
+        nulos = self.detectar_nulos()
         
         # Si no hay nulos, informa de ello
         if nulos.empty:
@@ -157,33 +151,45 @@ class Datos:
         print("  [3] Rellenar con la mediana de la columna")
         print("  [4] Rellenar con la moda de la columna")
         print("  [5] Rellenar con un valor constante")
-        print("  [6] Volver al menú principal")
+        print("  [6] Elegir una estrategia para cada columna")
+        print("  [7] Rellenar con la media de los vecinos más cercanos (KNN)")
+        print("  [8] Volver al menú principal")
 
         opcion = int(input("Seleccione una opción: "))
-        
+
         # Elimina las filas que contienen los valores  
         if opcion == 1: 
-            self.datos.dropna(subset=seleccionadas, inplace=True)
+            self.manejar_nulos('eliminar')
             print("Filas con valores faltantes eliminadas correctamente")
         
         # Rellena los valores con la media, la mediana y la moda en columnas numéricas
         elif opcion == 2:
-            self.datos.fillna(self.datos.select_dtypes(include=['number']).mean(), inplace=True)
+            self.manejar_nulos('media')
             print("Valores faltantes rellenados con la media de cada columna")
         elif opcion == 3:
-            self.datos.fillna(self.datos.select_dtypes(include=['number']).median(), inplace=True)
+            self.manejar_nulos('mediana')
             print("Valores faltantes rellenados con la mediana de cada columna")
         elif opcion == 4:
-            self.datos.fillna(self.datos.select_dtypes(include=['number']).mode().iloc[0], inplace=True)
+            self.manejar_nulos('moda')
             print("Valores faltantes rellenados con la moda de cada columna")
 
         # Rellena los valores con un número  específico
         elif opcion == 5:
             valor = int(input("Ingrese un valor numérico para reemplazar los valores faltantes: "))
-            self.datos.fillna(float(valor), inplace=True)
+            self.manejar_nulos('constante', valor)
             print(f"Valores faltantes reemplazados con el valor {valor}")
-        
+
+        # Pregunta la estrategia de cada columna con nulos
         elif opcion == 6:
+            self.imputar({columna: self._estrategia_columna(columna) for columna in nulos.index})
+            print("Valores faltantes rellenados con la estrategia elegida para cada columna")
+        
+        # Rellena las columnas numéricas a partir de las filas más parecidas
+        elif opcion == 7:
+            self.manejar_nulos('knn')
+            print(f"Valores faltantes rellenados con la media de los {VECINOS_KNN} vecinos más cercanos")
+        
+        elif opcion == 8:
             return
         else:
             print("Opción inválida.")
@@ -193,11 +199,30 @@ class Datos:
         self.paso = 2.3
         
     
+    # Pregunta cómo rellenar los nulos de una columna según su tipo
+    def _estrategia_columna(self, columna):
+        if es_numerica(self.datos[columna]):
+            estrategias = {1: 'media', 2: 'mediana', 3: 'moda', 4: 'constante', 5: 'mediana_grupo'}
+            print(f"\nColumna {columna}: [1] Media [2] Mediana [3] Moda [4] Constante [5] Mediana por grupo")
+        else:
+            estrategias = {1: 'moda', 2: 'constante'}
+            print(f"\nColumna {columna}: [1] Moda [2] Constante")
+
+        opcion = int(input("Seleccione una opción: "))
+        if opcion not in estrategias:
+            raise ValueError("Opción inválida.")
+        estrategia = {'estrategia': estrategias[opcion]}
+        if estrategia['estrategia'] == 'constante':
+            estrategia['valor'] = input("Ingrese el valor para reemplazar los valores faltantes: ")
+        elif estrategia['estrategia'] == 'mediana_grupo':
+            estrategia['por'] = input("Ingrese la columna por la que agrupar: ")
+        return estrategia
+
     # Transformación de datos categóricos
     def opcion2_transformar_categoricos(self):
 
         # Filtra las columnas categóricas dentro de las features seleccionadas
-        categoricos = [columna for columna in self.features if self.datos[columna].dtype == 'object']
+        categoricos = self.columnas_categoricas()
 
         # Si no hay, informa de ello
         if not categoricos:
@@ -221,23 +246,48 @@ class Datos:
         print("\nSeleccione una estrategia de transformación:")
         print("  [1] One-Hot Encoding (genera nuevas columnas binarias)")
         print("  [2] Label Encoding (convierte categorías a números enteros)")
-        print("  [3] Volver al menú principal")  
+        print("  [3] One-Hot Encoding disperso (para columnas con muchas categorías)")
+        print(f"  [4] Feature Hashing (número fijo de {COLUMNAS_HASH} columnas por variable)")
+        print("  [5] Frequency Encoding (fracción de filas con cada categoría)")
+        print("  [6] Count Encoding (número de filas con cada categoría)")
+        print(f"  [7] Target Encoding (media del target '{self.targets}' por categoría, fuera de pliegue)")
+        print("  [8] Volver al menú principal")  
 
         opcion = int(input("Seleccione una opción:"))
 
         if opcion == 1: # Crea nuevas columnas binarias para cada categoría
-            self.datos = pd.get_dummies(self.datos, columns = categoricos, dtype = int)
+            self.transformar_categoricos('one_hot')
             print("Transformación completada con One-Hot Encoding")
 
         elif opcion == 2: # Asigna un número entero a cada categoría
-            etiqueta = LabelEncoder()
-            
-            for columna in categoricos:
-                self.datos[columna] = self.datos[columna].astype(str)
-                self.datos[columna] = etiqueta.fit_transform(self.datos[columna])
+            self.transformar_categoricos('label')
             print("Transformación completada con Label Encoding")
 
-        elif opcion == 3:
+        elif opcion == 3: # Columnas binarias dispersas, opcionalmente solo con las categorías más frecuentes
+            maximo = input("Número máximo de categorías por columna (Enter para conservarlas todas): ").strip()
+            self.transformar_categoricos('one_hot_disperso', max_categorias=int(maximo) if maximo else None)
+            print("Transformación completada con One-Hot Encoding disperso")
+
+        elif opcion == 4: # Cada categoría activa una de las columnas según su hash
+            self.transformar_categoricos('hash')
+            print("Transformación completada con Feature Hashing")
+
+        elif opcion == 5: # Sustituye cada categoría por la fracción de filas en que aparece
+            self.transformar_categoricos('frecuencia')
+            print("Transformación completada con Frequency Encoding")
+
+        elif opcion == 6: # Sustituye cada categoría por el número de filas en que aparece
+            self.transformar_categoricos('conteo')
+            print("Transformación completada con Count Encoding")
+
+        elif opcion == 7: # Media del target por categoría, calculada sin el pliegue de cada fila
+            if not es_numerica(self.datos[self.targets]):
+                print(f"El Target Encoding necesita un target numérico y '{self.targets}' no lo es")
+                return
+            self.transformar_categoricos('target')
+            print("Transformación completada con Target Encoding")
+
+        elif opcion == 8:
             return
         
         else:
@@ -248,7 +298,7 @@ class Datos:
 
     def opcion2_normalizar_numericas(self):
         # Filtra las columnas numéricas dentro de las features seleccionadas
-        numericas = [columna for columna in self.features if columna in self.datos.columns and self.datos[columna].dtype in ['int64', 'float64']]
+        numericas = self.columnas_numericas()
         
         # Si no hay, informa de ello
         if not numericas:
@@ -271,20 +321,23 @@ class Datos:
         print("\nSeleccione una estrategia de normalización:")
         print(" [1] Min-Max Scaling (escala valores entre 0 y 1)")
         print(" [2] Z-score Normalization (media 0, desviación estándar 1)")
-        print(" [3] Volver al menú principal")
+        print(" [3] Robust Scaling (mediana 0 y rango intercuartílico 1, poco sensible a atípicos)")
+        print(" [4] Volver al menú principal")
         opcion = int(input("Seleccione una opción: "))
         
         if opcion == 1:
-            scaler = MinMaxScaler()
-            self.datos[numericas] = scaler.fit_transform(self.datos[numericas])
+            self.normalizar('minmax')
             print("Normalización completada con Min-Max Scaling")
         
         elif opcion == 2:
-            scaler = StandardScaler()
-            self.datos[numericas] = scaler.fit_transform(self.datos[numericas])
+            self.normalizar('zscore')
             print("Normalización completada con Z-score Normalization.")
         
         elif opcion == 3:
+            self.normalizar('robusto')
+            print("Normalización completada con Robust Scaling.")
+        
+        elif opcion == 4:
             return
         
         else:
@@ -297,7 +350,7 @@ class Datos:
 
     def opcion2_manejo_atipicos(self):
         # Seleccionamos las columnas numéricas dentro de las variables de entrada
-        numericas = [columna for columna in self.features if columna in self.datos.columns and self.datos[columna].dtype in ['int64', 'float64']]
+        numericas = self.columnas_numericas()
         
         if not numericas:
             print("\n=============================")
@@ -306,65 +359,52 @@ class Datos:
             print("No se han detectado columnas numéricas en las variables de entrada seleccionadas.")
             return
         
-        valores_atipicos = {} # Almacenamos la cantidad de valores atípicos por columna
-        
         # Identificamos valores atípicos utilizando el rango intercuartílico (IQR)
-        for columna in numericas:
-            Q1 = self.datos[columna].quantile(0.25)
-            Q3 = self.datos[columna].quantile(0.75)
-            IQR = Q3 - Q1
-            # Contamos los atípicos fuera del ranfo permitido
-            atipicos = ((self.datos[columna] < (Q1 - 1.5 * IQR)) | (self.datos[columna] > (Q3 + 1.5 * IQR))).sum()
-            if atipicos > 0:
-                valores_atipicos[columna] = atipicos
-        
-        # Si no se detecta ninguno, informa de ello
-        if not valores_atipicos:
-            print("\n=============================")
-            print("Detección y Manejo de Valores Atípicos")
-            print("=============================")
-            print("No se han detectado valores atípicos en las columnas seleccionadas.")
-            self.paso = 3
-            return
+        valores_atipicos = self.detectar_atipicos()
         
-        # Mostramos las columnas y la cantidad detectada
+        # Mostramos las columnas y la cantidad detectada. Si no se detecta ninguno se informa de ello, pero el
+        # menú se muestra igual: los métodos multivariantes pueden encontrar filas anómalas que el IQR no ve
         print("\n=============================")
         print("Detección y Manejo de Valores Atípicos")
         print("=============================")
-        print("Se han detectado valores atípicos en las siguientes columnas numéricas seleccionadas:")
-        for columna, cantidad in valores_atipicos.items():
-            print(f"  - {columna}: {cantidad} valores atípicos detectados")
+        if valores_atipicos:
+            print("Se han detectado valores atípicos en las siguientes columnas numéricas seleccionadas:")
+            for columna, cantidad in valores_atipicos.items():
+                print(f"  - {columna}: {cantidad} valores atípicos detectados")
+        else:
+            print("No se han detectado valores atípicos en las columnas seleccionadas según el rango intercuartílico.")
         
         # Opciones para el manejo de los valores
         print("\nSeleccione una estrategia para manejar los valores atípicos:")
         print("  [1] Eliminar filas con valores atípicos")
         print("  [2] Reemplazar valores atípicos con la mediana de la columna")
         print("  [3] Mantener valores atípicos sin cambios")
-        print("  [4] Volver al menú principal")
+        print("  [4] Eliminar filas anómalas según Isolation Forest (todas las columnas a la vez)")
+        print("  [5] Eliminar filas anómalas según la distancia de Mahalanobis robusta (MinCovDet)")
+        print("  [6] Eliminar filas anómalas según Local Outlier Factor (LOF)")
+        print("  [7] Volver al menú principal")
         
         opcion = int(input("Seleccione una opción: "))
         
         if opcion == 1: # Eliminar filas 
-            for columna in valores_atipicos.keys():
-                Q1 = self.datos[columna].quantile(0.25)
-                Q3 = self.datos[columna].quantile(0.75)
-                IQR = Q3 - Q1
-                self.datos = self.datos[(self.datos[columna] >= (Q1 - 1.5 * IQR)) & (self.datos[columna] <= (Q3 + 1.5 * IQR))]
+            self.manejar_atipicos('eliminar')
             print("Filas con valores atípicos eliminadas correctamente.")
         
         elif opcion == 2: # Reemplazar con la mediana de la columna
-            for columna in valores_atipicos.keys():
-                mediana = self.datos[columna].median()
-                Q1 = self.datos[columna].quantile(0.25)
-                Q3 = self.datos[columna].quantile(0.75)
-                IQR = Q3 - Q1
-                self.datos.loc[(self.datos[columna] < (Q1 - 1.5 * IQR)) | (self.datos[columna] > (Q3 + 1.5 * IQR)), columna] = mediana
+            self.manejar_atipicos('mediana')
             print("Valores atípicos reemplazados con la mediana de cada columna.")
         
         elif opcion == 3: # Se mantienen los valores
+            self.manejar_atipicos('mantener')
             print("Valores atípicos mantenidos sin cambios.")
         
-        elif opcion == 4:
+        elif opcion in (4, 5, 6): # Detección multivariante ajustada sobre una muestra de las filas
+            metodo = {4: 'isolation_forest', 5: 'mahalanobis', 6: 'lof'}[opcion]
+            filas = self.detectar_anomalias(metodo)
+            self.manejar_atipicos('eliminar', metodo)
+            print(f"Se han eliminado {filas} filas anómalas (umbral: contaminación del {CONTAMINACION:.0%} en la muestra de ajuste).")
+        
+        elif opcion == 7:
             return
         
         else:
@@ -408,38 +448,80 @@ class Datos:
             print("Variable      | Media | Mediana | Desviación Est. | Mínimo | Máximo")
             print("-------------------------------------------------------------------")
             
-            # Obtener estadísticas
-            estadisticas = self.datos[columnas].describe().T  # Transpone para tener variables en filas
+            # Obtener estadísticas (se reutilizan las ya calculadas en el preprocesado)
+            numericas = [columna for columna in columnas if es_numerica(self.datos[columna])]
+            estadisticas = self._estadisticas(numericas, cuantiles=numericas)
+            desviaciones = estadisticas.desviacion(numericas, ddof=1) # Muestral, como describe()
             
             # Imprimir cada fila
-            for variable in estadisticas.index:
-                media = round(estadisticas.loc[variable, 'mean'], 1)
-                mediana = round(estadisticas.loc[variable, '50%'], 0)
-                desv = round(estadisticas.loc[variable, 'std'], 1)
-                minimo = round(estadisticas.loc[variable, 'min'], 0)
-                maximo = round(estadisticas.loc[variable, 'max'], 0)
+            for variable in numericas:
+                media = round(estadisticas.media_[variable], 1)
+                mediana = round(float(estadisticas.mediana(variable)), 0)
+                desv = round(desviaciones[variable], 1)
+                minimo = round(estadisticas.minimo[variable], 0)
+                maximo = round(estadisticas.maximo[variable], 0)
                 
                 print(f"{variable:<13} | {media:<5} | {mediana:<7} | {desv:<15} | {minimo:<6} | {maximo}")
         
         elif opcion == 2: # Histogramas para las columnas numéricas
-            self.datos[columnas].hist(bins=20, figsize=(12, 8))
-            plt.show()
+            # Los conteos se calculan una vez con numpy.histogram y se reutilizan; con un directorio de
+            # informe cada histograma se guarda como archivo, dibujados en paralelo y sin pantalla
+            numericas = [columna for columna in columnas if es_numerica(self.datos[columna])]
+            if self.informe:
+                rutas = self.guardar_histogramas(columnas=numericas)
+                print(f"Se han guardado {len(rutas)} histogramas en \"{self.informe}\"")
+            elif numericas:
+                histogramas = self.histogramas(numericas)
+                filas = -(-len(numericas) // 3)
+                figura, ejes = plt.subplots(filas, 3, figsize=(12, 8), squeeze=False)
+                for eje, (columna, (conteos, bordes)) in zip(ejes.ravel(), histogramas.items()):
+                    eje.stairs(conteos, bordes, fill=True)
+                    eje.set_title(columna)
+                for eje in ejes.ravel()[len(numericas):]:
+                    eje.set_visible(False)
+                figura.tight_layout()
+                plt.show()
         
         elif opcion == 3: # Gráficos de dispersión antes y después de la normalización
-            for columna in columnas:
-                if self.datos[columna].dtype in ['int64', 'float64']:
-                    plt.figure(figsize=(6, 4))
-                    plt.scatter(range(len(self.datos)), self.datos[columna], label=f"{columna} (original)", alpha=0.5)
-                    plt.scatter(range(len(self.datos)), MinMaxScaler().fit_transform(self.datos[[columna]]), label=f"{columna} (normalizado)", alpha=0.5)
-                    plt.legend()
-                    plt.title(f"Comparación de {columna} antes y después de la normalización")
+            # Se dibujan como mucho PUNTOS_GRAFICO filas por columna (reducidas con LTTB) en una sola figura,
+            # y la normalización usa el mínimo y el máximo ya calculados en lugar de reajustar un escalador
+            numericas = [columna for columna in columnas if es_numerica(self.datos[columna])]
+            if numericas:
+                estadisticas = self._estadisticas(numericas)
+                figura, ejes = plt.subplots(len(numericas), 1, figsize=(6, 4 * len(numericas)), squeeze=False)
+                for eje, columna in zip(ejes[:, 0], numericas):
+                    valores = self.datos[columna].to_numpy(dtype='float64', na_value=np.nan)
+                    filas = puntos_dispersion(valores)
+                    rango = (estadisticas.maximo[columna] - estadisticas.minimo[columna]) or 1
+                    eje.scatter(filas, valores[filas], label=f"{columna} (original)", alpha=0.5, rasterized=True)
+                    eje.scatter(filas, (valores[filas] - estadisticas.minimo[columna]) / rango, label=f"{columna} (normalizado)", alpha=0.5, rasterized=True)
+                    eje.legend()
+                    eje.set_title(f"Comparación de {columna} antes y después de la normalización")
+                figura.tight_layout()
+                if self.informe:
+                    os.makedirs(self.informe, exist_ok=True)
+                    ruta = os.path.join(self.informe, f"dispersion.{self.formato_graficos}")
+                    figura.savefig(ruta)
+                    plt.close(figura)
+                    print(f"Gráfico de dispersión guardado en \"{ruta}\"")
+                else:
                     plt.show()
         
-        elif opcion == 4: # Heatmap de la correlación entre variables numéricas
-            plt.figure(figsize=(10, 6))
-            sns.heatmap(self.datos[columnas].corr(), annot=True, cmap="coolwarm", fmt=".2f")
-            plt.title("Heatmap de correlación de variables numéricas")
-            plt.show()
+        elif opcion == 4: # Heatmap de la correlación entre variables numéricas (la matriz se guarda y se reutiliza)
+            # La correlación se acumula sobre todas las filas bloque a bloque; con muchas columnas se
+            # muestran además los pares más correlados y el heatmap se ordena por grupos sin anotar
+            numericas = [columna for columna in columnas if es_numerica(self.datos[columna])]
+            if len(numericas) > COLUMNAS_ANOTADAS:
+                print(f"\nLos {PARES_FUERTES} pares de variables más correlados:")
+                for par in self.pares_correlados(PARES_FUERTES, numericas).itertuples(index=False):
+                    print(f"  {par.columna_a} - {par.columna_b}: {par.correlacion:.2f}")
+            if self.informe:
+                print(f"Heatmap guardado en \"{self.guardar_heatmap(columnas=numericas)}\"")
+            else:
+                figura, eje = plt.subplots(figsize=(10, 6))
+                dibujar_heatmap(self.correlacion(numericas), eje)
+                eje.set_title("Heatmap de correlación de variables numéricas")
+                plt.show()
         
         elif opcion == 5:
             return
@@ -465,29 +547,65 @@ class Datos:
         print("Seleccione el formato de exportación:")
         print("  [1] CSV (.csv)")
         print("  [2] Excel (.xlsx)")
-        print("  [3] Volver al menú principal")
+        print("  [3] Parquet (.parquet)")
+        print("  [4] Feather (.feather)")
+        print("  [5] Matriz dispersa (.npz)")
+        print("  [6] Artefacto de transformación (.json) para aplicar el mismo preprocesado a datos nuevos")
+        print("  [7] CSV comprimido (.csv.gz, .csv.bz2 o .csv.zst)")
+        print("  [8] Base de datos SQLite (.sqlite)")
+        print("  [9] Volver al menú principal")
 
         opcion = int(input("Seleccione una opción: "))
         
         # Valida la opción
-        if opcion not in [1, 2]:
+        if opcion not in [1, 2, 3, 4, 5, 6, 7, 8]:
             print("Opción inválida.")
             return
         
         # Solicita el nombre del archivo sin extensión
         nombre = input("Ingrese el nombre del archivo de salida (sin extensión): ")
+
+        # Compresión del CSV: gzip es la más compatible, zstd la más rápida y bz2 la que más reduce
+        extension_csv = '.csv'
+        if opcion == 7:
+            compresion = input("Compresión [gzip/bz2/zstd] (gzip por defecto): ").strip().lower() or 'gzip'
+            extensiones = {'gzip': '.csv.gz', 'bz2': '.csv.bz2', 'zstd': '.csv.zst'}
+            if compresion not in extensiones:
+                print("Compresión no válida.")
+                return
+            extension_csv = extensiones[compresion]
+
+        # Guarda los pasos ajustados en lugar de los datos
+        if opcion == 6:
+            self.guardar_artefacto(nombre + '.json')
+            print(f"Artefacto con {len(self.transformaciones)} pasos guardado como \"{nombre}.json\".")
+            self.paso = 5
+            return
         
+        # En SQLite se indica la tabla, si se reemplaza o se añade a la existente y las columnas con índice
+        opciones_sqlite = {}
+        if opcion == 8:
+            tabla = input(f"Nombre de la tabla ({TABLA_SQLITE} por defecto): ").strip() or TABLA_SQLITE
+            modo = input("Si la tabla existe [reemplazar/anadir] (reemplazar por defecto): ").strip().lower() or 'reemplazar'
+            if modo not in MODOS_SQLITE:
+                print("Modo no válido.")
+                return
+            indices = [columna.strip() for columna in input("Columnas con índice, separadas por comas (ninguna por defecto): ").split(',') if columna.strip()]
+            faltan = [columna for columna in indices if columna not in self.datos.columns]
+            if faltan:
+                print(f"Columnas no encontradas: {', '.join(faltan)}")
+                return
+            opciones_sqlite = {'tabla': tabla, 'modo': modo, 'indices': indices}
+
         # Exporta los datos en el formato seleccionado
-        if opcion == 1: # CSV
-            archivo  = f"{nombre}.csv"
-            self.datos.to_csv(archivo, index=False)
-        
-        elif opcion == 2: # Excel
-            archivo= f"{nombre}.xlsx"
-            self.datos.to_excel(archivo, index=False)
-        
-        elif opcion == 3:
+        archivo = nombre + {1: '.csv', 2: '.xlsx', 3: '.parquet', 4: '.feather', 5: '.npz', 7: extension_csv, 8: '.sqlite'}[opcion]
+        try:
+            filas = self.exportar(archivo, **opciones_sqlite)
+        except (ValueError, OSError, ImportError) as e:
+            print(f"Error al exportar los datos: {e}")
             return
+        if self.por_bloques:
+            print(f"Se han exportado {filas} filas por bloques de {self.tamano_bloque}")
         print(f"Datos exportados correctamente como \"{archivo}\".")
 
         self.paso = 5
\ No newline at end of file
@@ -45,22 +45,27 @@ def cargar_datos():
         print("  [1] CSV")
         print("  [2] Excel")
         print("  [3] SQLite")
-        print("  [4] Volver al menú principal")
+        print("  [4] Parquet")
+        print("  [5] Feather")
+        print("  [6] Volver al menú principal")
 
         opcion = int(input("Seleccione una opción: "))
 
-        if opcion == 4: # Termina el bucle y vuelve al menú principal
+        if opcion == 6: # Termina el bucle y vuelve al menú principal
             return   
-        if opcion not in [1, 2, 3]: # Valida la opción
+        if opcion not in [1, 2, 3, 4, 5]: # Valida la opción
             print("Opción inválida. Intente de nuevo.")
         else:
             ruta = input("Ingrese la ruta del archivo: ")
             return (opcion, ruta)
 
 # Muestra información sobre los datos       
-def mostrar_datos(datos, fuente): 
+def mostrar_datos(datos, fuente, cache=None): 
     print("\nDatos cargados correctamente.")
     print(f"Fuente: {fuente}")
+    if cache is not None: # Informa de si la lectura se sirvió desde la caché (en modo por bloques no se usa)
+        estado = 'no usada' if cache.ultimo_acierto is None else 'acierto' if cache.ultimo_acierto else 'fallo'
+        print(f"Caché: {estado} (aciertos: {cache.aciertos}, fallos: {cache.fallos}, {cache.tamano() / 1024**2:.1f} MB en disco)")
     print(f"Número de filas: {datos.shape[0]}")
     print(f"Número de columnas: {datos.shape[1]}")
     print(f"Tipo de datos por columna: ")
@@ -0,0 +1,153 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+with patch('manejodatos.Datos.proceso'):
+    from manejodatos import Datos
+from backend.anomalias import ajustar_anomalias, mascara_anomalias, puntuar_anomalias
+from backend.artefacto import cargar_artefacto
+from backend.vecinos import muestra_referencia
+
+class TestAnomalias(unittest.TestCase):
+    # Dos columnas muy correlacionadas y unas filas normales en cada columna pero no en su combinación
+    def setUp(self):
+        generador = np.random.default_rng(2)
+        n = 1500
+        x = generador.normal(0, 1, n)
+        self.test_data = pd.DataFrame({
+            'X': x,
+            'Y': x + generador.normal(0, 0.1, n),
+            'Grupo': generador.choice(['a', 'b'], n),
+            'Objetivo': generador.integers(0, 2, n)
+        })
+        self.anomalas = [10, 500, 1200]
+        self.test_data.loc[self.anomalas, 'X'] = 2.0
+        self.test_data.loc[self.anomalas, 'Y'] = -2.0
+        self.test_data.loc[7, 'X'] = np.nan # Las filas con nulos no se puntúan
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, 'datos.csv')
+        self.test_data.to_csv(self.ruta, index=False)
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def cargar(self, tamano_bloque=None):
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos(tamano_bloque=tamano_bloque)
+        with patch('manejodatos.cargar_datos', return_value=(1, self.ruta)), \
+             patch('manejodatos.mostrar_datos'), patch('builtins.print'):
+            datos_obj.opcion1_carga()
+        datos_obj.features = ['X', 'Y', 'Grupo']
+        datos_obj.targets = 'Objetivo'
+        return datos_obj
+
+    # Mahalanobis y LOF encuentran las filas anómalas que el IQR no ve, ajustando sobre una muestra
+    # (Isolation Forest corta por ejes y no las separa de las colas de la diagonal)
+    def test_metodos_multivariantes(self):
+        for metodo in ('isolation_forest', 'mahalanobis', 'lof'):
+            datos_obj = self.cargar()
+            datos_obj.detectar_atipicos()
+            self.assertFalse(datos_obj.mascara_atipicos[self.anomalas].any())
+            filas = datos_obj.detectar_anomalias(metodo, muestra=800, contaminacion=0.01, n_jobs=2)
+            if metodo != 'isolation_forest':
+                self.assertTrue(datos_obj.mascara_atipicos[self.anomalas].all(), metodo)
+            self.assertFalse(datos_obj.mascara_atipicos[7])
+            self.assertLess(filas, 0.03 * len(self.test_data))
+
+            datos_obj.manejar_atipicos('eliminar', metodo)
+            self.assertEqual(len(datos_obj.datos), len(self.test_data) - filas)
+            self.assertFalse(datos_obj.datos.index.isin(np.flatnonzero(datos_obj.mascara_atipicos)).any())
+
+    # Por bloques se eliminan las mismas filas que en memoria y el umbral se puede fijar
+    def test_bloques_y_umbral(self):
+        resultados = []
+        for tamano_bloque in (None, 400):
+            datos_obj = self.cargar(tamano_bloque)
+            datos_obj.manejar_atipicos('eliminar', 'mahalanobis', muestra=600)
+            salida = os.path.join(self.directorio.name, f'salida{tamano_bloque}.csv')
+            datos_obj.exportar(salida)
+            resultados.append(pd.read_csv(salida))
+        pd.testing.assert_frame_equal(resultados[0], resultados[1])
+
+        datos_obj = self.cargar()
+        datos_obj.detectar_anomalias('mahalanobis', umbral=50.0)
+        paso = datos_obj._atipicos[1]
+        self.assertEqual(paso['umbral'], 50.0)
+        diferencia = ((self.test_data[['X', 'Y']] - paso['desplazamiento']) / paso['escala']).dropna().to_numpy() - paso['parametros']['centro']
+        self.assertEqual(datos_obj.mascara_atipicos.sum(), (((diferencia @ paso['parametros']['precision']) * diferencia).sum(axis=1) > 50.0).sum())
+
+        with self.assertRaises(ValueError):
+            datos_obj.manejar_atipicos('mediana', 'lof')
+
+    # El artefacto guarda el detector ya ajustado: al aplicarlo da las mismas filas sin volver a ajustarlo
+    def test_artefacto_anomalias(self):
+        for metodo in ('isolation_forest', 'mahalanobis', 'lof'):
+            datos_obj = self.cargar()
+            datos_obj.manejar_atipicos('eliminar', metodo, muestra=500)
+            ruta = os.path.join(self.directorio.name, 'artefacto.json')
+            datos_obj.guardar_artefacto(ruta)
+            paso = cargar_artefacto(ruta)['pasos'][0]
+            self.assertIn('parametros', paso)
+            self.assertEqual('referencia' in paso, metodo == 'lof')
+            with patch('backend.anomalias._ajustar_modelo', side_effect=AssertionError("no se debe reajustar")):
+                np.testing.assert_array_equal(mascara_anomalias(self.test_data, paso),
+                                              mascara_anomalias(self.test_data, datos_obj.transformaciones[0]))
+
+    # Las puntuaciones con los parámetros guardados son las del modelo de sklearn
+    def test_puntuaciones_sklearn(self):
+        from sklearn.covariance import MinCovDet
+        from sklearn.ensemble import IsolationForest
+        from sklearn.neighbors import LocalOutlierFactor
+        columnas = ['X', 'Y']
+        completas = self.test_data[columnas].dropna()
+        for metodo in ('isolation_forest', 'mahalanobis', 'lof'):
+            paso = ajustar_anomalias([self.test_data], columnas, [0.0, 0.0], [1.0, 1.0], metodo, muestra=None)
+            referencia = muestra_referencia([self.test_data], columnas, np.zeros(2), np.ones(2), None)
+            if metodo == 'isolation_forest':
+                esperado = -IsolationForest(random_state=0).fit(referencia).score_samples(completas.to_numpy())
+            elif metodo == 'mahalanobis':
+                esperado = MinCovDet(random_state=0).fit(referencia).mahalanobis(completas.to_numpy())
+            else:
+                esperado = -LocalOutlierFactor(n_neighbors=20, novelty=True).fit(referencia).score_samples(completas.to_numpy())
+            np.testing.assert_allclose(puntuar_anomalias(completas, paso), esperado, rtol=1e-9)
+
+    # Mantener las filas anómalas no ajusta ningún detector
+    def test_mantener_sin_ajustar(self):
+        datos_obj = self.cargar()
+        with patch('backend.anomalias._ajustar_modelo') as ajustar:
+            datos_obj.manejar_atipicos('mantener', 'lof')
+        ajustar.assert_not_called()
+        self.assertEqual(len(datos_obj.datos), len(self.test_data))
+        self.assertEqual(datos_obj.transformaciones, [])
+
+    # Desde el menú de atípicos
+    def test_menu_mahalanobis(self):
+        datos_obj = self.cargar()
+        datos_obj.datos.loc[0, 'X'] = 50.0 # Un atípico por columna para que se muestre el menú
+        datos_obj.paso = 2.5
+        with patch('builtins.input', return_value='5'), patch('builtins.print'):
+            datos_obj.opcion2_manejo_atipicos()
+        self.assertEqual(datos_obj.paso, 3)
+        self.assertEqual(datos_obj.transformaciones[-1]['metodo'], 'mahalanobis')
+        self.assertEqual(len(datos_obj.datos), len(self.test_data) - datos_obj.mascara_atipicos.sum())
+        self.assertFalse(datos_obj.datos.index.isin(self.anomalas).any())
+
+        # Sin atípicos según el IQR los métodos multivariantes siguen disponibles
+        datos_obj = self.cargar()
+        datos_obj.paso = 2.5
+        with patch('builtins.input', return_value='6'), patch('builtins.print'):
+            datos_obj.opcion2_manejo_atipicos()
+        self.assertEqual(datos_obj.conteo_atipicos, {})
+        self.assertEqual(datos_obj.paso, 3)
+        self.assertEqual(datos_obj.transformaciones[-1]['metodo'], 'lof')
+        self.assertFalse(datos_obj.datos.index.isin(self.anomalas).any())
+
+if __name__ == '__main__':
+    unittest.main()
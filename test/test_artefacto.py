@@ -0,0 +1,153 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+with patch('manejodatos.Datos.proceso'):
+    from manejodatos import Datos
+from backend.artefacto import cargar_artefacto, transformar
+from backend.fuentes import cerrar_conexiones
+from backend.motor import Preprocesador
+from backend.pipeline import ejecutar_pipeline
+from backend.vecinos import ajustar_knn
+
+class TestArtefacto(unittest.TestCase):
+    # Creamos un CSV de prueba y una especificación que guarda el artefacto
+    def setUp(self):
+        generador = np.random.default_rng(8)
+        n = 120
+        self.test_data = pd.DataFrame({
+            'Clase': generador.integers(1, 4, n),
+            'Edad': generador.normal(30, 10, n).round(),
+            'Tarifa': generador.exponential(20, n).round(2),
+            'Sexo': generador.choice(['male', 'female'], n),
+            'Sobrevive': generador.integers(0, 2, n)
+        })
+        self.test_data.loc[[2, 11, 40], 'Edad'] = np.nan
+        self.test_data.loc[[5, 60], 'Tarifa'] = np.nan
+        self.test_data.loc[7, 'Tarifa'] = 900.0
+
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, 'datos.csv')
+        self.test_data.to_csv(self.ruta, index=False)
+        self.artefacto = os.path.join(self.directorio.name, 'artefacto.json')
+        self.especificacion = {
+            'fuente': self.ruta,
+            'features': ['Clase', 'Edad', 'Tarifa', 'Sexo'],
+            'target': 'Sobrevive',
+            'nulos': {'columnas': {'Edad': {'estrategia': 'mediana_grupo', 'por': 'Clase'}, 'Tarifa': 'media'}},
+            'categoricos': 'label',
+            'normalizacion': 'zscore',
+            'atipicos': 'mediana',
+            'guardar_artefacto': self.artefacto,
+            'exportar': os.path.join(self.directorio.name, 'ajuste.csv')
+        }
+
+    def tearDown(self):
+        cerrar_conexiones()
+        self.directorio.cleanup()
+
+    # Aplicar el artefacto a la misma fuente da lo mismo que el ajuste, en memoria y por bloques
+    def test_solo_transformacion(self):
+        ejecutar_pipeline(self.especificacion)
+        ajuste = pd.read_csv(self.especificacion['exportar'])
+
+        for bloque in (None, 25):
+            salida = os.path.join(self.directorio.name, f'transformado{bloque}.csv')
+            with patch('backend.motor.CacheEstadisticas.obtener', side_effect=AssertionError("no debe reajustar")):
+                resumen = ejecutar_pipeline({'fuente': self.ruta, 'artefacto': self.artefacto, 'exportar': salida},
+                                            tamano_bloque=bloque)
+            pd.testing.assert_frame_equal(pd.read_csv(salida), ajuste)
+            self.assertEqual(resumen['filas_salida'], len(ajuste))
+
+        # Las claves numéricas de las medianas por grupo conservan su tipo
+        artefacto = cargar_artefacto(self.artefacto)
+        self.assertEqual(artefacto['features'], self.especificacion['features'])
+        self.assertEqual(sorted(artefacto['pasos'][1]['medianas']['Edad']), [1, 2, 3])
+
+    # Lotes en memoria: mismas filas que la transformación completa y sin modificar los datos recibidos
+    def test_transformar_en_memoria(self):
+        ejecutar_pipeline(self.especificacion)
+        ajuste = pd.read_csv(self.especificacion['exportar'])
+        artefacto = cargar_artefacto(self.artefacto)
+
+        lote = self.test_data.iloc[[0, 2, 7, 60]].drop(columns='Sobrevive').reset_index(drop=True)
+        original = lote.copy()
+        resultado = transformar(lote, artefacto)
+        pd.testing.assert_frame_equal(lote, original)
+        esperado = ajuste.iloc[[0, 2, 7, 60]].drop(columns='Sobrevive').reset_index(drop=True)
+        pd.testing.assert_frame_equal(resultado, esperado, check_dtype=False)
+
+        with self.assertRaises(ValueError):
+            transformar(lote.drop(columns='Sexo'), artefacto)
+
+    # El KNN guarda su conjunto de referencia y los árboles se reconstruyen al aplicarlo
+    def test_artefacto_knn(self):
+        motor = Preprocesador(verboso=False)
+        motor.cargar(self.ruta)
+        motor.seleccionar_columnas(['Edad', 'Tarifa'], 'Sobrevive')
+        motor.manejar_nulos('knn')
+        motor.guardar_artefacto(self.artefacto)
+
+        artefacto = cargar_artefacto(self.artefacto)
+        self.assertIsInstance(artefacto['pasos'][0]['referencia'], np.ndarray)
+        resultado = transformar(self.test_data[['Edad', 'Tarifa', 'Sobrevive']], artefacto)
+        np.testing.assert_allclose(resultado.to_numpy(), motor.datos[['Edad', 'Tarifa', 'Sobrevive']].to_numpy())
+
+    # Los datos nuevos sin el target se transforman con un artefacto que elimina nulos o imputa por KNN
+    def test_artefacto_sin_target(self):
+        motor = Preprocesador(verboso=False)
+        motor.cargar(self.ruta)
+        motor.seleccionar_columnas(['Edad', 'Tarifa'], 'Sobrevive')
+        motor.manejar_nulos('eliminar')
+        motor.guardar_artefacto(self.artefacto)
+        esperado = motor.datos[['Edad', 'Tarifa']].reset_index(drop=True)
+
+        nuevos = os.path.join(self.directorio.name, 'nuevos.csv')
+        self.test_data.drop(columns='Sobrevive').to_csv(nuevos, index=False)
+        aplicado = Preprocesador(verboso=False)
+        aplicado.cargar(nuevos)
+        aplicado.aplicar_artefacto(self.artefacto)
+        pd.testing.assert_frame_equal(aplicado.datos[['Edad', 'Tarifa']].reset_index(drop=True), esperado)
+
+        # Un paso KNN que incluye el target (artefactos anteriores) lo trata como columna no observada
+        artefacto = cargar_artefacto(self.artefacto)
+        columnas = ['Edad', 'Tarifa', 'Sobrevive']
+        artefacto['pasos'] = [ajustar_knn([self.test_data], columnas, self.test_data[columnas].mean().to_numpy(),
+                                          self.test_data[columnas].std(ddof=0).to_numpy(), vecinos=3)]
+        resultado = transformar(self.test_data.drop(columns='Sobrevive'), artefacto)
+        self.assertNotIn('Sobrevive', resultado.columns)
+        self.assertFalse(resultado[['Edad', 'Tarifa']].isnull().any().any())
+
+    # Desde el menú de exportación se guarda el artefacto; no se admiten versiones posteriores
+    def test_exportar_artefacto_menu(self):
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos()
+        datos_obj.datos = self.test_data.copy()
+        datos_obj.features = ['Edad', 'Sexo']
+        datos_obj.targets = 'Sobrevive'
+        datos_obj.transformar_categoricos('label')
+        datos_obj.paso = 4
+        nombre = os.path.join(self.directorio.name, 'menu')
+        with patch('builtins.input', side_effect=['6', nombre]), patch('builtins.print'):
+            datos_obj.opcion4_exportar_datos()
+        self.assertEqual(datos_obj.paso, 5)
+        self.assertEqual(cargar_artefacto(nombre + '.json')['pasos'][0]['categorias'], {'Sexo': ['female', 'male']})
+
+        with open(nombre + '.json', encoding='utf-8') as archivo:
+            contenido = json.load(archivo)
+        contenido['version'] = 99
+        with open(nombre + '.json', 'w', encoding='utf-8') as archivo:
+            json.dump(contenido, archivo)
+        with self.assertRaises(ValueError):
+            cargar_artefacto(nombre + '.json')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,249 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+import pandas as pd
+import numpy as np
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+with patch('manejodatos.Datos.proceso'):
+    from manejodatos import Datos
+from backend.estadisticas import CacheEstadisticas, Estadisticas
+from backend.bloques import leer_bloques
+from backend.fuentes import cerrar_conexiones
+
+class TestBloques(unittest.TestCase):
+    # Creamos un CSV de prueba con nulos, categorías y valores atípicos
+    def setUp(self):
+        generador = np.random.default_rng(0)
+        n = 53
+        self.test_data = pd.DataFrame({
+            'Edad': generador.integers(1, 80, n).astype(float),
+            'Tarifa': generador.exponential(20, n).round(2),
+            'Clase': generador.integers(1, 4, n),
+            'Sexo': generador.choice(['male', 'female'], n),
+            'Puerto': generador.choice(['S', 'C', 'Q'], n),
+            'Sobrevive': generador.integers(0, 2, n)
+        })
+        self.test_data.loc[[3, 17, 40], 'Edad'] = np.nan
+        self.test_data.loc[[5, 30], 'Tarifa'] = 900.0
+        self.test_data.loc[45, 'Puerto'] = np.nan
+
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, 'datos.csv')
+        self.test_data.to_csv(self.ruta, index=False)
+
+    def tearDown(self):
+        cerrar_conexiones()
+        self.directorio.cleanup()
+
+    # Ejecuta todo el preprocesado con las opciones indicadas y exporta a CSV
+    def ejecutar(self, tamano_bloque, opciones, nombre):
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos(tamano_bloque=tamano_bloque)
+
+        with patch('manejodatos.cargar_datos', return_value=(1, self.ruta)), \
+             patch('manejodatos.mostrar_datos'), patch('builtins.print'):
+            datos_obj.opcion1_carga()
+
+        datos_obj.features = ['Edad', 'Tarifa', 'Clase', 'Sexo', 'Puerto']
+        datos_obj.targets = 'Sobrevive'
+        salida = os.path.join(self.directorio.name, nombre)
+        with patch('builtins.input', side_effect=opciones + [salida]), patch('builtins.print'):
+            datos_obj.opcion2_manejo_nulos()
+            datos_obj.opcion2_transformar_categoricos()
+            datos_obj.opcion2_normalizar_numericas()
+            datos_obj.opcion2_manejo_atipicos()
+            datos_obj.paso = 4
+            datos_obj.opcion4_exportar_datos()
+        return pd.read_csv(f"{salida}.csv")
+
+    # Las estadísticas combinadas por bloques coinciden con las de pandas
+    def test_estadisticas_por_bloques(self):
+        columnas = ['Edad', 'Tarifa', 'Clase']
+        estadisticas = Estadisticas.calcular(leer_bloques(self.ruta, 10), columnas, frecuencias=columnas)
+
+        self.assertEqual(estadisticas.filas, len(self.test_data))
+        self.assertEqual(estadisticas.nulos['Edad'], 3)
+        for columna in columnas:
+            self.assertAlmostEqual(estadisticas.media([columna])[columna], self.test_data[columna].mean())
+            self.assertAlmostEqual(estadisticas.desviacion([columna])[columna], self.test_data[columna].std(ddof=0))
+            self.assertAlmostEqual(estadisticas.mediana(columna), self.test_data[columna].median())
+            self.assertAlmostEqual(estadisticas.cuantil(columna, 0.25), self.test_data[columna].quantile(0.25))
+            self.assertEqual(estadisticas.moda(columna), self.test_data[columna].mode().iloc[0])
+
+    # Extraer y unir estadísticas de columnas distintas equivale a calcularlas juntas
+    def test_extraer_y_unir_estadisticas(self):
+        columnas = ['Edad', 'Tarifa', 'Puerto']
+        juntas = Estadisticas.calcular([self.test_data], columnas, frecuencias=columnas)
+        unidas = Estadisticas.unir([juntas.extraer(['Puerto', 'Tarifa']), Estadisticas.calcular([self.test_data], ['Edad'], frecuencias=['Edad'])])
+
+        self.assertEqual(unidas.filas, juntas.filas)
+        pd.testing.assert_series_equal(unidas.nulos[columnas], juntas.nulos[columnas])
+        self.assertAlmostEqual(unidas.desviacion(['Edad'], ddof=1)['Edad'], self.test_data['Edad'].std())
+        self.assertEqual(unidas.mediana('Tarifa'), juntas.mediana('Tarifa'))
+        self.assertEqual(unidas.categorias('Puerto'), ['C', 'Q', 'S'])
+
+    # La caché solo recorre los datos para las columnas que faltan o que un paso ha modificado. En memoria
+    # las frecuencias de las medianas se cuentan en otra pasada; por bloques el resumen sale de la primera
+    def test_cache_estadisticas(self):
+        for tamano_bloque in (None, 8):
+            with patch('manejodatos.Datos.proceso'):
+                datos_obj = Datos(tamano_bloque=tamano_bloque)
+            with patch('manejodatos.cargar_datos', return_value=(1, self.ruta)), \
+                 patch('manejodatos.mostrar_datos'), patch('builtins.print'):
+                datos_obj.opcion1_carga()
+            datos_obj.features = ['Edad', 'Tarifa', 'Puerto']
+            datos_obj.targets = 'Sobrevive'
+            frecuencias = 1 if tamano_bloque is None else 0
+
+            datos_obj.detectar_nulos()
+            datos_obj.manejar_nulos('mediana')
+            self.assertEqual(datos_obj.estadisticas.pasadas, 1 + frecuencias)
+            self.assertNotIn('Edad', datos_obj.estadisticas.columnas()) # Tenía nulos y se ha rellenado
+            self.assertIn('Tarifa', datos_obj.estadisticas.columnas())
+
+            datos_obj.normalizar('minmax') # Solo se vuelve a calcular Edad
+            self.assertEqual(datos_obj.estadisticas.pasadas, 2 + frecuencias)
+            datos_obj.detectar_atipicos()
+            self.assertEqual(datos_obj.estadisticas.pasadas, 3 + frecuencias)
+            datos_obj.manejar_atipicos('eliminar') # Elimina filas: se descartan todas
+            self.assertEqual(datos_obj.estadisticas.columnas(), [])
+
+            # Las estadísticas que quedan en caché coinciden con las de los datos procesados
+            procesados = pd.concat(list(datos_obj._bloques()))
+            estadisticas = datos_obj._estadisticas(['Edad', 'Tarifa'])
+            self.assertEqual(estadisticas.filas, len(procesados))
+            self.assertAlmostEqual(estadisticas.media(['Tarifa'])['Tarifa'], procesados['Tarifa'].mean())
+
+    # Solo se cuentan las frecuencias de las columnas que piden cuantiles, moda o categorías, y por
+    # bloques los cuantiles salen por defecto del resumen de memoria acotada
+    def test_frecuencias_solo_si_se_piden(self):
+        cache = CacheEstadisticas(lambda: [self.test_data])
+        self.assertEqual(cache.obtener(['Edad', 'Tarifa', 'Puerto']).frecuencias, {})
+        estadisticas = cache.obtener(['Edad', 'Tarifa', 'Puerto'], exactas=['Puerto'], cuantiles=['Edad'])
+        self.assertEqual(sorted(estadisticas.frecuencias), ['Edad', 'Puerto'])
+        self.assertEqual(estadisticas.mediana('Edad'), self.test_data['Edad'].median())
+        with self.assertRaises(ValueError):
+            estadisticas.mediana('Tarifa')
+
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos(tamano_bloque=8)
+        with patch('manejodatos.cargar_datos', return_value=(1, self.ruta)), \
+             patch('manejodatos.mostrar_datos'), patch('builtins.print'):
+            datos_obj.opcion1_carga()
+        estadisticas = datos_obj._estadisticas(['Edad', 'Tarifa'], cuantiles=['Edad', 'Tarifa'])
+        self.assertEqual(estadisticas.frecuencias, {})
+        self.assertEqual(sorted(estadisticas.sketches), ['Edad', 'Tarifa'])
+        self.assertAlmostEqual(estadisticas.mediana('Tarifa'), self.test_data['Tarifa'].median())
+
+    # Si los datos en memoria se sustituyen fuera de los pasos, la caché se descarta
+    def test_cache_datos_sustituidos(self):
+        llamadas = []
+        cache = CacheEstadisticas(lambda: llamadas.append(1) or [self.test_data])
+        cache.obtener(['Edad'])
+        cache.obtener(['Edad', 'Edad'])
+        self.assertEqual(len(llamadas), 1)
+
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos()
+        datos_obj.datos = self.test_data.copy()
+        self.assertEqual(datos_obj._estadisticas(['Edad']).nulos['Edad'], 3)
+        datos_obj.datos = self.test_data.dropna()
+        self.assertEqual(datos_obj._estadisticas(['Edad']).nulos['Edad'], 0)
+
+    # El procesado por bloques da el mismo resultado que el procesado en memoria
+    def test_procesado_por_bloques_igual_que_en_memoria(self):
+        for opciones in (['2', '1', '1', '1', '1'], ['3', '2', '2', '2', '1'], ['1', '1', '2', '1', '1']):
+            en_memoria = self.ejecutar(None, opciones, 'memoria')
+            por_bloques = self.ejecutar(8, opciones, 'bloques')
+            pd.testing.assert_frame_equal(en_memoria, por_bloques, check_exact=False)
+
+    # La mediana por grupo por bloques coincide con groupby().transform sobre todos los datos
+    def test_mediana_por_grupo_por_bloques(self):
+        esperado = self.test_data['Edad'].fillna(self.test_data.groupby('Clase')['Edad'].transform('median'))
+        for tamano_bloque in (None, 9):
+            with patch('manejodatos.Datos.proceso'):
+                datos_obj = Datos(tamano_bloque=tamano_bloque)
+            with patch('manejodatos.cargar_datos', return_value=(1, self.ruta)), \
+                 patch('manejodatos.mostrar_datos'), patch('builtins.print'):
+                datos_obj.opcion1_carga()
+            datos_obj.features = ['Edad', 'Puerto', 'Clase']
+            datos_obj.targets = 'Sobrevive'
+
+            datos_obj.imputar({'Edad': {'estrategia': 'mediana_grupo', 'por': 'Clase'}, 'Puerto': 'moda'})
+            procesados = pd.concat(list(datos_obj._bloques()), ignore_index=True)
+            pd.testing.assert_series_equal(procesados['Edad'], esperado)
+            self.assertEqual(procesados['Puerto'].isnull().sum(), 0)
+            self.assertEqual(procesados.loc[45, 'Puerto'], self.test_data['Puerto'].mode().iloc[0])
+
+    # En modo por bloques solo se carga el primer bloque como muestra
+    def test_carga_por_bloques_muestra(self):
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos(tamano_bloque=10)
+
+        with patch('manejodatos.cargar_datos', return_value=(1, self.ruta)), \
+             patch('manejodatos.mostrar_datos'), patch('builtins.print'):
+            datos_obj.opcion1_carga()
+
+        self.assertTrue(datos_obj.por_bloques)
+        self.assertEqual(len(datos_obj.datos), 10)
+        self.assertEqual(datos_obj.paso, 2)
+
+    # Un Parquet se procesa por bloques y se exporta por bloques a Parquet
+    def test_parquet_por_bloques(self):
+        ruta = os.path.join(self.directorio.name, 'datos.parquet')
+        self.test_data.to_parquet(ruta, index=False)
+        salida = os.path.join(self.directorio.name, 'salida')
+
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos(tamano_bloque=10, filas_grupo=20)
+        with patch('manejodatos.cargar_datos', return_value=(4, ruta)), \
+             patch('manejodatos.mostrar_datos'), patch('builtins.print'):
+            datos_obj.opcion1_carga()
+
+        datos_obj.features = ['Edad', 'Tarifa']
+        datos_obj.targets = 'Sobrevive'
+        with patch('builtins.input', side_effect=['2', '1', '3', salida]), patch('builtins.print'):
+            datos_obj.opcion2_manejo_nulos()
+            datos_obj.opcion2_normalizar_numericas()
+            datos_obj.paso = 4
+            datos_obj.opcion4_exportar_datos()
+
+        exportado = pd.read_parquet(f"{salida}.parquet")
+        self.assertEqual(len(exportado), len(self.test_data))
+        self.assertFalse(exportado['Edad'].isnull().any())
+        self.assertAlmostEqual(exportado['Tarifa'].min(), 0)
+        self.assertAlmostEqual(exportado['Tarifa'].max(), 1)
+
+        # Feather se exporta por bloques con las dos extensiones de Arrow IPC
+        for extension in ('.feather', '.arrow'):
+            datos_obj.exportar(salida + extension)
+            pd.testing.assert_frame_equal(pd.read_feather(salida + extension), exportado)
+
+    # Una tabla SQLite se procesa por bloques con el filtro resuelto en la consulta
+    def test_sqlite_por_bloques_con_filtro(self):
+        ruta = os.path.join(self.directorio.name, 'datos.db')
+        conexion = sqlite3.connect(ruta)
+        self.test_data.to_sql('pasajeros', conexion, index=False)
+        conexion.close()
+
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos(tamano_bloque=7, filtro="Clase < 3")
+
+        with patch('manejodatos.cargar_datos', return_value=(3, ruta)), \
+             patch('manejodatos.mostrar_datos'), patch('builtins.input', return_value='1'), \
+             patch('builtins.print'):
+            datos_obj.opcion1_carga()
+
+        self.assertTrue(datos_obj.por_bloques)
+        self.assertEqual(datos_obj.tabla, 'pasajeros')
+        filas = sum(len(bloque) for bloque in datos_obj._bloques())
+        self.assertEqual(filas, (self.test_data['Clase'] < 3).sum())
+
+if __name__ == '__main__':
+    unittest.main()
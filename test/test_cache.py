@@ -0,0 +1,107 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+import pandas as pd
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+with patch('manejodatos.Datos.proceso'):
+    from manejodatos import Datos
+from backend.cache import CacheCargas
+from backend.fuentes import leer_fuente
+
+class TestCache(unittest.TestCase):
+    # Creamos un CSV de prueba y un directorio vacío para la caché
+    def setUp(self):
+        self.test_data = pd.DataFrame({
+            'median_income': [8.3252, 8.3014, 7.2574],
+            'ocean_proximity': ['NEAR BAY', 'NEAR BAY', 'INLAND']
+        })
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, 'casas.csv')
+        self.test_data.to_csv(self.ruta, index=False)
+        self.cache = CacheCargas(os.path.join(self.directorio.name, 'cache'))
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    # La segunda lectura se sirve desde la caché sin llamar al lector
+    def test_acierto_y_fallo(self):
+        lector = MagicMock(side_effect=leer_fuente)
+        primera = self.cache.cargar(self.ruta, lector, columnas=None)
+        segunda = self.cache.cargar(self.ruta, lector, columnas=None)
+
+        lector.assert_called_once()
+        pd.testing.assert_frame_equal(primera, segunda)
+        self.assertEqual((self.cache.aciertos, self.cache.fallos), (1, 1))
+        self.assertTrue(self.cache.ultimo_acierto)
+
+    # Cambiar las opciones de lectura o el archivo invalida la entrada
+    def test_clave_cambia(self):
+        clave = self.cache.clave(self.ruta, columnas=None)
+        self.assertNotEqual(clave, self.cache.clave(self.ruta, columnas=['median_income']))
+
+        self.test_data.head(2).to_csv(self.ruta, index=False)
+        self.assertNotEqual(clave, self.cache.clave(self.ruta, columnas=None))
+
+        por_contenido = CacheCargas(self.cache.directorio, hash_contenido=True)
+        self.assertEqual(por_contenido.clave(self.ruta), por_contenido.clave(self.ruta))
+
+    # Al superar el tamaño máximo se elimina la entrada usada hace más tiempo
+    def test_lru(self):
+        datos = pd.DataFrame({'x': range(1000)})
+        self.cache.guardar('a', datos)
+        time.sleep(0.01)
+        self.cache.guardar('b', datos)
+        time.sleep(0.01)
+        self.cache.obtener('a') # 'a' pasa a ser la más reciente
+        time.sleep(0.01)
+
+        self.cache.max_bytes = int(self.cache.tamano() * 1.4)
+        self.cache.guardar('c', datos)
+        nombres = {os.path.basename(ruta) for ruta, _, _ in self.cache.entradas()}
+        self.assertEqual(nombres, {'a.arrow', 'c.arrow'})
+
+        self.cache.limpiar()
+        self.assertEqual(self.cache.entradas(), [])
+
+    # Una entrada mayor que el máximo no se guarda ni vacía la caché, y la recién guardada no se elimina
+    def test_entrada_demasiado_grande(self):
+        self.cache.guardar('a', self.test_data)
+        self.cache.max_bytes = self.cache.tamano() + 1
+        self.assertFalse(self.cache.guardar('b', pd.DataFrame({'x': range(100000)})))
+        self.assertEqual([os.path.basename(ruta) for ruta, _, _ in self.cache.entradas()], ['a.arrow'])
+
+        self.assertTrue(self.cache.guardar('c', self.test_data))
+        self.assertEqual([os.path.basename(ruta) for ruta, _, _ in self.cache.entradas()], ['c.arrow'])
+        pd.testing.assert_frame_equal(self.cache.obtener('c'), self.test_data)
+
+        self.cache.max_bytes = 0
+        self.assertFalse(self.cache.guardar('d', self.test_data))
+        self.assertEqual(len(self.cache.entradas()), 1)
+
+    # Los datos que Arrow no representa tal cual se leen igual pero no se guardan
+    def test_datos_no_representables(self):
+        self.assertFalse(self.cache.guardar('a', pd.DataFrame({'x': [1, 'uno']})))
+        self.assertFalse(self.cache.guardar('b', pd.DataFrame({0: [1, 2]})))
+        self.assertEqual(self.cache.entradas(), [])
+
+    # Datos usa la caché al cargar y mostrar_datos recibe el estado
+    def test_datos_con_cache(self):
+        for acierto in (False, True):
+            with patch('manejodatos.Datos.proceso'):
+                datos_obj = Datos(cache=self.cache)
+            with patch('manejodatos.cargar_datos', return_value=(1, self.ruta)), \
+                 patch('manejodatos.mostrar_datos') as mock_mostrar_datos:
+                datos_obj.opcion1_carga()
+
+            mock_mostrar_datos.assert_called_once_with(datos_obj.datos, self.ruta, self.cache)
+            self.assertEqual(self.cache.ultimo_acierto, acierto)
+            pd.testing.assert_frame_equal(datos_obj.datos, self.test_data)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+with patch('manejodatos.Datos.proceso'):
+    from manejodatos import Datos
+from backend.codificadores import codificar_target, pliegues_filas
+
+class TestCodificadores(unittest.TestCase):
+    # Creamos una columna con muchas categorías (Ticket) y un target binario
+    def setUp(self):
+        generador = np.random.default_rng(11)
+        n = 400
+        self.test_data = pd.DataFrame({
+            'Edad': generador.normal(30, 10, n).round(),
+            'Ticket': [f"T{i}" for i in generador.integers(0, 150, n)],
+            'Puerto': generador.choice(['S', 'C', 'Q'], n, p=[0.7, 0.2, 0.1]),
+            'Sobrevive': generador.integers(0, 2, n)
+        })
+        self.test_data.loc[[3, 8], 'Puerto'] = np.nan
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, 'datos.csv')
+        self.test_data.to_csv(self.ruta, index=False)
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def cargar(self, tamano_bloque=None):
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos(tamano_bloque=tamano_bloque)
+        with patch('manejodatos.cargar_datos', return_value=(1, self.ruta)), \
+             patch('manejodatos.mostrar_datos'), patch('builtins.print'):
+            datos_obj.opcion1_carga()
+        datos_obj.features = ['Edad', 'Ticket', 'Puerto']
+        datos_obj.targets = 'Sobrevive'
+        return datos_obj
+
+    # Aplica la estrategia en memoria y por bloques y devuelve las dos salidas exportadas
+    def exportar_ambos(self, estrategia, **opciones):
+        resultados = []
+        for tamano_bloque in (None, 90):
+            datos_obj = self.cargar(tamano_bloque)
+            datos_obj.transformar_categoricos(estrategia, **opciones)
+            salida = os.path.join(self.directorio.name, f'{estrategia}{tamano_bloque}.csv')
+            datos_obj.exportar(salida)
+            resultados.append(pd.read_csv(salida))
+        pd.testing.assert_frame_equal(resultados[0], resultados[1])
+        return resultados[0]
+
+    # El hashing genera siempre el mismo número de columnas, con un 1 por fila salvo en los nulos
+    def test_hash_ancho_fijo(self):
+        datos_obj = self.cargar()
+        with patch('builtins.input', return_value='4'), patch('builtins.print'):
+            datos_obj.opcion2_transformar_categoricos()
+        self.assertEqual(datos_obj.paso, 2.4)
+        self.assertEqual(len([columna for columna in datos_obj.datos.columns if columna.startswith('Ticket_hash_')]), 32)
+        self.assertNotIn('Ticket', datos_obj.datos.columns)
+
+        resultado = self.exportar_ambos('hash', ancho=8)
+        tickets = [f"Ticket_hash_{i}" for i in range(8)]
+        puertos = resultado[[f"Puerto_hash_{i}" for i in range(8)]]
+        self.assertEqual(resultado[tickets].sum(axis=1).tolist(), [1] * len(self.test_data))
+        self.assertEqual(puertos.sum(axis=1).tolist(), [0 if pd.isna(valor) else 1 for valor in self.test_data['Puerto']])
+        # El mismo valor va siempre a la misma columna
+        cubetas = resultado[tickets].to_numpy().argmax(axis=1)
+        self.assertTrue((pd.Series(cubetas).groupby(self.test_data['Ticket']).nunique() == 1).all())
+
+    # Frequency y Count Encoding sustituyen cada valor por su fracción o número de filas
+    def test_frecuencia_y_conteo(self):
+        conteos = self.test_data['Ticket'].value_counts()
+        resultado = self.exportar_ambos('conteo')
+        np.testing.assert_allclose(resultado['Ticket'], self.test_data['Ticket'].map(conteos))
+        resultado = self.exportar_ambos('frecuencia')
+        np.testing.assert_allclose(resultado['Ticket'], self.test_data['Ticket'].map(conteos) / len(self.test_data))
+        self.assertEqual(resultado['Puerto'][3], 0.0) # Los nulos no tienen frecuencia
+
+    # El target encoding de cada fila no usa el target de las filas de su propio pliegue
+    def test_target_fuera_de_pliegue(self):
+        resultado = self.exportar_ambos('target', pliegues=4, suavizado=5)
+
+        pliegue = pliegues_filas(self.test_data, 4)
+        media = self.test_data['Sobrevive'].mean()
+        for fila in (0, 17, 250):
+            resto = self.test_data[(pliegue != pliegue[fila]) & (self.test_data['Ticket'] == self.test_data['Ticket'][fila])]
+            esperado = (resto['Sobrevive'].sum() + 5 * media) / (len(resto) + 5)
+            self.assertAlmostEqual(resultado['Ticket'][fila], esperado)
+
+    # El pliegue depende solo de la posición de la fila: un relleno que difiere en los últimos decimales entre
+    # la ejecución en memoria y por bloques no cambia el target encoding
+    def test_pliegue_estable(self):
+        alterados = self.test_data.assign(Edad=self.test_data['Edad'] + 1e-13)
+        np.testing.assert_array_equal(pliegues_filas(alterados, 4), pliegues_filas(self.test_data, 4))
+
+        datos = self.test_data.assign(Edad=self.test_data['Edad'] / 7)
+        datos.loc[::5, 'Edad'] = np.nan
+        datos.to_csv(self.ruta, index=False)
+        resultados = []
+        for tamano_bloque in (None, 90):
+            datos_obj = self.cargar(tamano_bloque)
+            datos_obj.manejar_nulos('media')
+            datos_obj.transformar_categoricos('target', pliegues=4)
+            salida = os.path.join(self.directorio.name, f'media{tamano_bloque}.csv')
+            datos_obj.exportar(salida)
+            resultados.append(pd.read_csv(salida))
+        np.testing.assert_array_equal(resultados[0]['Ticket'], resultados[1]['Ticket'])
+
+    # Sin la columna target (datos nuevos) se usan todas las filas; las categorías nuevas reciben la media
+    def test_target_datos_nuevos(self):
+        datos_obj = self.cargar()
+        datos_obj.transformar_categoricos('target')
+        paso = datos_obj.transformaciones[-1]
+        nuevos = codificar_target(pd.DataFrame({'Edad': [20.0, 30.0], 'Ticket': ['T0', 'X'], 'Puerto': ['S', None]}), paso)
+
+        filas = self.test_data[self.test_data['Ticket'] == 'T0']
+        media = self.test_data['Sobrevive'].mean()
+        self.assertAlmostEqual(nuevos['Ticket'][0], (filas['Sobrevive'].sum() + 10 * media) / (len(filas) + 10))
+        self.assertAlmostEqual(nuevos['Ticket'][1], media)
+        self.assertAlmostEqual(nuevos['Puerto'][1], media)
+
+    # El target encoding necesita un target numérico
+    def test_target_no_numerico(self):
+        datos_obj = self.cargar()
+        datos_obj.targets = 'Puerto'
+        datos_obj.features = ['Ticket']
+        datos_obj.paso = 2.3
+        with patch('builtins.input', return_value='7'), patch('builtins.print'):
+            datos_obj.opcion2_transformar_categoricos()
+        self.assertEqual(datos_obj.paso, 2.3)
+        with self.assertRaises(ValueError):
+            datos_obj.transformar_categoricos('target')
+
+if __name__ == '__main__':
+    unittest.main()
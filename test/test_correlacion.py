@@ -0,0 +1,113 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+with patch('manejodatos.Datos.proceso'):
+    from manejodatos import Datos
+from backend.correlacion import AcumuladorCorrelacion, orden_jerarquico, pares_fuertes
+
+class TestCorrelacion(unittest.TestCase):
+    # Tres grupos de columnas correlacionadas entre sí, con nulos y una columna de magnitud muy grande
+    def setUp(self):
+        generador = np.random.default_rng(4)
+        n = 2000
+        columnas = {}
+        for grupo in range(3):
+            base = generador.normal(0, 1, n)
+            for i in range(8):
+                columnas[f"g{grupo}_{i}"] = base + generador.normal(0, 0.3 + 0.1 * i, n)
+        self.test_data = pd.DataFrame(columnas)
+        self.test_data['grande'] = 1e9 + self.test_data['g0_0'] * 1e-3
+        self.test_data['Objetivo'] = generador.integers(0, 2, n)
+        for columna in ('g0_1', 'g1_2', 'grande'):
+            self.test_data.loc[generador.choice(n, 50, replace=False), columna] = np.nan
+        self.numericas = [columna for columna in self.test_data.columns if columna != 'Objetivo']
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, 'datos.csv')
+        self.test_data.to_csv(self.ruta, index=False)
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def cargar(self, tamano_bloque=None):
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos(tamano_bloque=tamano_bloque, verboso=False)
+        datos_obj.cargar(self.ruta)
+        datos_obj.seleccionar_columnas(self.numericas, 'Objetivo')
+        return datos_obj
+
+    # Referencia de pandas con la columna grande desplazada (la correlación no cambia y así pandas no pierde precisión)
+    def esperado(self, datos):
+        return datos[self.numericas].assign(grande=datos['grande'] - 1e9).corr()
+
+    # Pearson acumulado por bloques da lo mismo que DataFrame.corr() sobre todas las filas, con nulos
+    # por pares y sin perder precisión en la columna grande; se calcula en una pasada y se reutiliza
+    def test_pearson_bloques(self):
+        esperado = self.esperado(pd.read_csv(self.ruta))
+        for tamano_bloque in (None, 300):
+            datos_obj = self.cargar(tamano_bloque)
+            correlacion = datos_obj.correlacion()
+            pd.testing.assert_frame_equal(correlacion, esperado, atol=1e-8)
+            pasadas = datos_obj.estadisticas.pasadas
+            datos_obj.correlacion(['g0_0', 'g2_3'])
+            self.assertEqual(datos_obj.estadisticas.pasadas, pasadas)
+
+    # Spearman sobre los rangos globales coincide con pandas en las columnas sin nulos
+    def test_spearman(self):
+        columnas = ['g0_0', 'g0_2', 'g1_0', 'g2_5']
+        datos_obj = self.cargar(500)
+        correlacion = datos_obj.correlacion(columnas, 'spearman')
+        pd.testing.assert_frame_equal(correlacion, self.test_data[columnas].corr('spearman'), atol=1e-10)
+
+    # Las sumas de particiones acumuladas por separado se unen en la misma matriz
+    def test_unir_particiones(self):
+        desplazamiento = self.test_data[self.numericas].mean()
+        particiones = []
+        for filas in np.array_split(np.arange(len(self.test_data)), 4):
+            parte = self.test_data[self.numericas].iloc[filas]
+            acumulador = AcumuladorCorrelacion(self.numericas, desplazamiento)
+            acumulador.actualizar(parte)
+            particiones.append(acumulador)
+        total = particiones[0]
+        for particion in particiones[1:]:
+            total.unir(particion)
+        pd.testing.assert_frame_equal(total.matriz(), self.esperado(self.test_data), atol=1e-10)
+
+        with self.assertRaises(ValueError):
+            total.unir(AcumuladorCorrelacion(self.numericas, desplazamiento + 1))
+
+    # Los pares más fuertes y el orden jerárquico que junta las columnas de cada grupo
+    def test_pares_y_orden(self):
+        correlacion = self.test_data[self.numericas].corr()
+        pares = pares_fuertes(correlacion, 5)
+        self.assertEqual(len(pares), 5)
+        self.assertTrue((pares['correlacion'].abs().diff().dropna() <= 0).all())
+        self.assertEqual({pares.loc[0, 'columna_a'], pares.loc[0, 'columna_b']}, {'g0_0', 'grande'})
+
+        grupos = [columna.split('_')[0] if columna != 'grande' else 'g0' for columna in orden_jerarquico(correlacion)]
+        self.assertEqual(sum(a != b for a, b in zip(grupos, grupos[1:])), 2)
+
+    # Con muchas columnas el menú muestra los pares más correlados y un heatmap sin anotar
+    @patch('matplotlib.pyplot.show')
+    def test_menu_ancho(self, mock_show):
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos()
+        datos_obj.datos = self.test_data.copy()
+        datos_obj.paso = 3
+        datos_obj.features = self.numericas
+        datos_obj.targets = 'Objetivo'
+        with patch('builtins.input', return_value='4'), patch('builtins.print') as mock_print:
+            datos_obj.opcion3_visualizar_datos()
+        mock_show.assert_called_once()
+        mock_print.assert_any_call("\nLos 10 pares de variables más correlados:")
+        self.assertEqual(datos_obj.paso, 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+with patch('manejodatos.Datos.proceso'):
+    from manejodatos import Datos
+from backend.cuantiles import SketchCuantiles
+from backend.estadisticas import Estadisticas
+from backend.tipos import compactar
+
+class TestCuantiles(unittest.TestCase):
+    def setUp(self):
+        generador = np.random.default_rng(4)
+        self.valores = generador.lognormal(0, 1, 200_000)
+        self.ordenados = np.sort(self.valores)
+
+    # Error de rango del cuantil aproximado respecto al exacto
+    def error_rango(self, sketch, q):
+        return abs(np.searchsorted(self.ordenados, sketch.cuantil(q)) / len(self.valores) - q)
+
+    # Con pocos valores el resultado es exacto e igual al de pandas
+    def test_exacto_sin_compactar(self):
+        sketch = SketchCuantiles(0.01).actualizar([3.0, 1.0, np.nan, 7.0, 2.0])
+        serie = pd.Series([3.0, 1.0, np.nan, 7.0, 2.0])
+        for q in (0, 0.25, 0.5, 0.75, 1):
+            self.assertAlmostEqual(sketch.cuantil(q), serie.quantile(q))
+        self.assertEqual(sketch.n, 4)
+        self.assertTrue(np.isnan(SketchCuantiles().cuantil(0.5)))
+
+    # Por bloques el error se mantiene dentro del límite con memoria muy inferior a las filas
+    def test_error_acotado(self):
+        for error in (0.01, 0.001):
+            sketch = SketchCuantiles(error)
+            for inicio in range(0, len(self.valores), 7_000):
+                sketch.actualizar(self.valores[inicio:inicio + 7_000])
+            self.assertLess(sketch.tamano(), len(self.valores) / 20)
+            for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+                self.assertLessEqual(self.error_rango(sketch, q), error)
+
+    # Los resúmenes de particiones distintas se combinan sin perder precisión
+    def test_combinar_particiones(self):
+        particiones = [SketchCuantiles(0.001, semilla=i).actualizar(parte) for i, parte in enumerate(np.array_split(self.valores, 4))]
+        combinado = particiones[0]
+        for particion in particiones[1:]:
+            combinado.combinar(particion)
+        self.assertEqual(combinado.n, len(self.valores))
+        for q in (0.25, 0.5, 0.75):
+            self.assertLessEqual(self.error_rango(combinado, q), 0.001)
+
+    # En modo aproximado las numéricas usan el resumen y la moda sigue siendo exacta si se pide
+    def test_estadisticas_aproximadas(self):
+        datos = pd.DataFrame({'valor': self.valores, 'clase': np.where(self.valores > 1, 'alta', 'baja')})
+        estadisticas = Estadisticas.calcular([datos], ['valor', 'clase'], ['valor', 'clase'], error=0.001)
+        self.assertIn('valor', estadisticas.sketches)
+        self.assertNotIn('valor', estadisticas.frecuencias)
+        self.assertEqual(estadisticas.categorias('clase'), ['alta', 'baja'])
+        self.assertAlmostEqual(estadisticas.mediana('valor'), np.median(self.valores), delta=0.01)
+        with self.assertRaises(ValueError):
+            estadisticas.moda('valor')
+
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos(error_cuantiles=0.001)
+        datos_obj.datos = pd.DataFrame({'a': [1.0, 1.0, np.nan, 5.0], 'b': [2.0, np.nan, 2.0, 3.0], 'y': [0, 1, 0, 1]})
+        datos_obj.features = ['a', 'b']
+        datos_obj.targets = 'y'
+        datos_obj.imputar({'a': 'moda', 'b': 'mediana'})
+        self.assertEqual(list(datos_obj.datos['a']), [1.0, 1.0, 1.0, 5.0])
+        self.assertEqual(datos_obj.datos.loc[1, 'b'], 2.0)
+
+    # Los límites IQR de los atípicos salen del resumen aproximado
+    def test_atipicos_aproximados(self):
+        datos = pd.DataFrame({'valor': self.valores, 'y': 0})
+        limites = {}
+        for error in (None, 0.001):
+            with patch('manejodatos.Datos.proceso'):
+                datos_obj = Datos(error_cuantiles=error)
+            datos_obj.datos = datos.copy()
+            datos_obj.features = ['valor']
+            datos_obj.targets = 'y'
+            datos_obj.detectar_atipicos()
+            limites[error] = datos_obj._atipicos[1]['valor']
+        self.assertAlmostEqual(limites[0.001][1], limites[None][1], delta=0.05)
+
+    # Con enteros compactos (int8) la mediana y el rango intercuartílico no desbordan
+    def test_cuantiles_compactos(self):
+        datos = compactar(pd.DataFrame({'valor': np.tile([-100, 100], 50), 'y': 0}))
+        self.assertEqual(datos['valor'].dtype, np.int8)
+        estadisticas = Estadisticas.calcular([datos], ['valor'], ['valor'])
+        self.assertEqual(estadisticas.mediana('valor'), 0.0)
+
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos()
+        datos_obj.datos = datos
+        datos_obj.features = ['valor']
+        datos_obj.targets = 'y'
+        datos_obj.normalizar('robusto')
+        self.assertEqual(tuple(datos_obj.transformaciones[-1]['parametros']['valor']), (0.0, 200.0))
+        self.assertEqual(sorted(datos_obj.datos['valor'].unique()), [-0.5, 0.5])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+with patch('manejodatos.Datos.proceso'):
+    from manejodatos import Datos
+from backend.disperso import densificar, matriz_dispersa
+
+class TestDisperso(unittest.TestCase):
+    # Creamos una columna con muchas categorías poco frecuentes, como Ticket o Cabin
+    def setUp(self):
+        generador = np.random.default_rng(5)
+        n = 300
+        self.test_data = pd.DataFrame({
+            'Edad': generador.normal(30, 10, n).round(),
+            'Ticket': [f"T{i}" for i in generador.integers(0, 120, n)],
+            'Puerto': generador.choice(['S', 'C', 'Q'], n, p=[0.7, 0.2, 0.1]),
+            'Sobrevive': generador.integers(0, 2, n)
+        })
+        self.test_data.loc[[4, 9], 'Puerto'] = np.nan
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, 'datos.csv')
+        self.test_data.to_csv(self.ruta, index=False)
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def cargar(self, tamano_bloque=None):
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos(tamano_bloque=tamano_bloque)
+        with patch('manejodatos.cargar_datos', return_value=(1, self.ruta)), \
+             patch('manejodatos.mostrar_datos'), patch('builtins.print'):
+            datos_obj.opcion1_carga()
+        datos_obj.features = ['Edad', 'Ticket', 'Puerto']
+        datos_obj.targets = 'Sobrevive'
+        return datos_obj
+
+    # El One-Hot disperso tiene los mismos valores que el normal, en columnas uint8 dispersas
+    def test_igual_que_one_hot_normal(self):
+        normal = self.cargar()
+        normal.transformar_categoricos('one_hot')
+        disperso = self.cargar()
+        with patch('builtins.input', side_effect=['3', '']), patch('builtins.print'):
+            disperso.opcion2_transformar_categoricos()
+
+        self.assertEqual(disperso.paso, 2.4)
+        self.assertEqual(list(disperso.datos.columns), list(normal.datos.columns))
+        self.assertEqual(disperso.datos['Ticket_T0'].dtype, pd.SparseDtype('uint8', 0))
+        self.assertLess(disperso.datos.memory_usage().sum(), normal.datos.memory_usage().sum() / 10)
+        pd.testing.assert_frame_equal(densificar(disperso.datos), normal.datos, check_dtype=False)
+
+    # Con un máximo de categorías o una frecuencia mínima el resto se agrupa en "otros"
+    def test_limite_categorias(self):
+        datos_obj = self.cargar()
+        datos_obj.transformar_categoricos('one_hot_disperso', max_categorias=10)
+        tickets = [columna for columna in datos_obj.datos.columns if columna.startswith('Ticket_')]
+        self.assertEqual(len(tickets), 11)
+        self.assertIn('Ticket_otros', tickets)
+        self.assertEqual(densificar(datos_obj.datos)[tickets].sum(axis=1).tolist(), [1] * len(self.test_data))
+        # Los nulos no cuentan como "otros" y Puerto conserva sus tres valores
+        self.assertEqual([columna for columna in datos_obj.datos.columns if columna.startswith('Puerto_')], ['Puerto_C', 'Puerto_Q', 'Puerto_S'])
+
+        datos_obj = self.cargar()
+        datos_obj.transformar_categoricos('one_hot', min_frecuencia=0.15)
+        self.assertEqual([columna for columna in datos_obj.datos.columns if columna.startswith('Puerto_')], ['Puerto_C', 'Puerto_S', 'Puerto_otros'])
+        self.assertEqual(datos_obj.datos['Puerto_otros'].sum(), (self.test_data['Puerto'] == 'Q').sum())
+
+    # La exportación a .npz guarda la matriz CSR, en memoria y por bloques, y Parquet densifica las columnas
+    def test_exportar_disperso(self):
+        resultados = []
+        for tamano_bloque in (None, 70):
+            datos_obj = self.cargar(tamano_bloque)
+            datos_obj.transformar_categoricos('one_hot_disperso')
+            salida = os.path.join(self.directorio.name, f'salida{tamano_bloque}')
+            datos_obj.paso = 4
+            with patch('builtins.input', side_effect=['5', salida]), patch('builtins.print'):
+                datos_obj.opcion4_exportar_datos()
+            matriz = sparse.load_npz(f"{salida}.npz")
+            columnas = list(np.load(f"{salida}.npz")['columnas'])
+            self.assertEqual(matriz.shape, (len(self.test_data), len(columnas)))
+            resultados.append(pd.DataFrame(matriz.toarray(), columns=columnas))
+        pd.testing.assert_frame_equal(resultados[0], resultados[1])
+        self.assertEqual(resultados[0]['Ticket_T0'].sum(), (self.test_data['Ticket'] == 'T0').sum())
+
+        parquet = os.path.join(self.directorio.name, 'salida.parquet')
+        datos_obj.exportar(parquet)
+        self.assertEqual(pd.read_parquet(parquet)['Ticket_T0'].dtype, 'uint8')
+
+        # Solo se admiten columnas numéricas en la matriz
+        with self.assertRaises(ValueError):
+            matriz_dispersa(self.test_data)
+
+    # Las columnas de texto sin codificar se descartan con un aviso, en memoria y por bloques
+    def test_exportar_disperso_con_texto(self):
+        for tamano_bloque in (None, 70):
+            datos_obj = self.cargar(tamano_bloque)
+            datos_obj.features = ['Edad', 'Puerto']
+            datos_obj.transformar_categoricos('one_hot_disperso')
+            salida = os.path.join(self.directorio.name, f'texto{tamano_bloque}')
+            datos_obj.paso = 4
+            with patch('builtins.input', side_effect=['5', salida]), patch('builtins.print') as imprimir:
+                datos_obj.opcion4_exportar_datos()
+            self.assertEqual(datos_obj.paso, 5)
+            self.assertTrue(any('Ticket' in str(llamada) for llamada in imprimir.call_args_list))
+            columnas = list(np.load(f"{salida}.npz")['columnas'])
+            self.assertNotIn('Ticket', columnas)
+            self.assertIn('Puerto_S', columnas)
+            self.assertEqual(sparse.load_npz(f"{salida}.npz").shape, (len(self.test_data), len(columnas)))
+
+    # Un error al exportar se muestra sin salir del menú
+    def test_error_exportar_menu(self):
+        datos_obj = self.cargar()
+        datos_obj.paso = 4
+        with patch.object(datos_obj, 'exportar', side_effect=ValueError("sin espacio")), \
+             patch('builtins.input', side_effect=['1', 'salida']), patch('builtins.print') as imprimir:
+            datos_obj.opcion4_exportar_datos()
+        self.assertEqual(datos_obj.paso, 4)
+        imprimir.assert_any_call("Error al exportar los datos: sin espacio")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+import pandas as pd
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.fuentes import FILAS_FILTRO_CSV, cerrar_conexiones, citar, conectar, consulta_sqlite, expresion_arrow, leer_fuente, leer_fuente_bloques, listar_tablas
+
+class TestFuentes(unittest.TestCase):
+    # Creamos la misma tabla como CSV, Excel y SQLite
+    def setUp(self):
+        self.test_data = pd.DataFrame({
+            'longitude': [-122.23, -122.22, -122.24, -122.25],
+            'latitude': [37.88, 37.86, 37.85, 37.85],
+            'total rooms': [880, 7099, 1467, 1274],
+            'ocean_proximity': ['NEAR BAY', 'NEAR BAY', 'INLAND', 'NEAR BAY']
+        })
+        self.directorio = tempfile.TemporaryDirectory()
+        self.csv = os.path.join(self.directorio.name, 'datos.csv')
+        self.excel = os.path.join(self.directorio.name, 'datos.xlsx')
+        self.sqlite = os.path.join(self.directorio.name, 'datos.db')
+        self.parquet = os.path.join(self.directorio.name, 'datos.parquet')
+        self.feather = os.path.join(self.directorio.name, 'datos.feather')
+        self.test_data.to_csv(self.csv, index=False)
+        self.test_data.to_parquet(self.parquet, index=False, row_group_size=2)
+        self.test_data.to_feather(self.feather)
+        self.test_data.to_excel(self.excel, index=False)
+        conexion = sqlite3.connect(self.sqlite)
+        self.test_data.to_sql('casas "2024"', conexion, index=False)
+        conexion.close()
+
+    def tearDown(self):
+        cerrar_conexiones()
+        self.directorio.cleanup()
+
+    # Citar escapa las comillas de los identificadores
+    def test_citar(self):
+        self.assertEqual(citar('tabla'), '"tabla"')
+        self.assertEqual(citar('a"b'), '"a""b"')
+
+    # Solo se leen las columnas pedidas en los tres formatos
+    def test_leer_columnas(self):
+        columnas = ['latitude', 'total rooms']
+        for ruta, tabla in ((self.csv, None), (self.excel, None), (self.sqlite, 'casas "2024"'), (self.parquet, None), (self.feather, None)):
+            datos = leer_fuente(ruta, tabla, columnas=columnas)
+            self.assertEqual(list(datos.columns), columnas)
+            self.assertEqual(len(datos), 4)
+
+    # La vista previa limita el número de filas y conserva todas las columnas
+    def test_vista_previa(self):
+        for ruta, tabla in ((self.csv, None), (self.excel, None), (self.sqlite, 'casas "2024"'), (self.parquet, None), (self.feather, None)):
+            datos = leer_fuente(ruta, tabla, filas=2)
+            self.assertEqual(list(datos.columns), list(self.test_data.columns))
+            self.assertEqual(len(datos), 2)
+
+    # Listar las tablas de una base de datos
+    def test_listar_tablas(self):
+        self.assertEqual(listar_tablas(self.sqlite), ['casas "2024"'])
+
+    # La consulta incluye proyección, filtro y límite
+    def test_consulta_sqlite(self):
+        consulta = consulta_sqlite('casas', ['a', 'b'], "b > 2", 10)
+        self.assertEqual(consulta, 'SELECT "a", "b" FROM "casas" WHERE b > 2 LIMIT 10')
+        self.assertEqual(consulta_sqlite('casas'), 'SELECT * FROM "casas"')
+
+    # El filtro se resuelve en SQLite y la lectura por bloques respeta el tamaño
+    def test_sqlite_filtro_y_bloques(self):
+        tabla = 'casas "2024"'
+        datos = leer_fuente(self.sqlite, tabla, columnas=['ocean_proximity'], filtro="ocean_proximity = 'NEAR BAY'")
+        self.assertEqual(len(datos), 3)
+
+        bloques = list(leer_fuente_bloques(self.sqlite, 3, tabla, ['latitude'], "latitude < 37.87"))
+        self.assertEqual([len(bloque) for bloque in bloques], [3])
+        bloques = list(leer_fuente_bloques(self.sqlite, 3, tabla))
+        self.assertEqual([len(bloque) for bloque in bloques], [3, 1])
+
+    # La conexión se reutiliza y es de solo lectura
+    def test_conexion_reutilizada_solo_lectura(self):
+        conexion = conectar(self.sqlite)
+        self.assertIs(conectar(self.sqlite), conexion)
+        with self.assertRaises(Exception):
+            conexion.execute("DELETE FROM \"casas \"\"2024\"\"\"")
+
+    # Los filtros sencillos se convierten en expresiones de pyarrow
+    def test_expresion_arrow(self):
+        self.assertTrue(expresion_arrow("latitude >= 37.86 and ocean_proximity = 'NEAR BAY'").equals(
+            expresion_arrow('latitude >= 37.86 AND "ocean_proximity" == "NEAR BAY"')))
+        with self.assertRaises(ValueError):
+            expresion_arrow("latitude entre 1 y 2")
+
+    # Parquet y Feather se filtran al leer y se pueden recorrer por lotes
+    def test_arrow_filtro_y_bloques(self):
+        for ruta in (self.parquet, self.feather):
+            datos = leer_fuente(ruta, columnas=['total rooms'], filtro="ocean_proximity = 'NEAR BAY' and latitude > 37.85")
+            self.assertEqual(list(datos['total rooms']), [880, 7099])
+
+            bloques = list(leer_fuente_bloques(ruta, 3))
+            self.assertEqual(sum(len(bloque) for bloque in bloques), 4)
+            self.assertTrue(all(len(bloque) <= 3 for bloque in bloques))
+
+    # CSV y Excel aplican el filtro después de leer, también por bloques y en la vista previa
+    def test_csv_excel_filtro(self):
+        filtro = "ocean_proximity = 'NEAR BAY' and latitude > 37.85"
+        for ruta in (self.csv, self.excel):
+            datos = leer_fuente(ruta, columnas=['total rooms'], filtro=filtro)
+            self.assertEqual(list(datos.columns), ['total rooms'])
+            self.assertEqual(list(datos['total rooms']), [880, 7099])
+            self.assertEqual(len(leer_fuente(ruta, filas=1, filtro="latitude < 37.86")), 1)
+            self.assertEqual(len(leer_fuente(ruta, filtro="latitude > 40")), 0)
+
+        bloques = list(leer_fuente_bloques(self.csv, 2, columnas=['latitude', 'total rooms'], filtro="latitude < 37.87"))
+        self.assertEqual([len(bloque) for bloque in bloques], [1, 2])
+        self.assertEqual(list(pd.concat(bloques)['total rooms']), [7099, 1467, 1274])
+        with self.assertRaises(ValueError):
+            leer_fuente(self.csv, filtro="latitude entre 1 y 2")
+
+        # La vista previa filtrada lee bloques grandes y no tantos como filas pida
+        with patch('backend.fuentes.pd.read_csv', wraps=pd.read_csv) as leer:
+            self.assertEqual(len(leer_fuente(self.csv, filas=1, filtro="latitude > 40")), 0)
+        self.assertEqual(leer.call_args_list[0].kwargs['chunksize'], FILAS_FILTRO_CSV)
+
+if __name__ == '__main__':
+    unittest.main()
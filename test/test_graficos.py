@@ -0,0 +1,141 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+with patch('manejodatos.Datos.proceso'):
+    from manejodatos import Datos
+from backend.graficos import lttb, puntos_dispersion
+from backend.pipeline import ejecutar_pipeline
+
+class TestGraficos(unittest.TestCase):
+    # Una serie larga con ruido y dos picos aislados
+    def setUp(self):
+        generador = np.random.default_rng(5)
+        n = 50_000
+        self.y = np.sin(np.linspace(0, 20, n)) + generador.normal(0, 0.05, n)
+        self.picos = [12_345, 40_000]
+        self.y[self.picos] = [8.0, -8.0]
+
+    # LTTB respeta el número de puntos, conserva los extremos de la serie y los picos
+    def test_lttb(self):
+        elegidos = lttb(np.arange(len(self.y)), self.y, 500)
+        self.assertEqual(len(elegidos), 500)
+        self.assertEqual(elegidos[0], 0)
+        self.assertEqual(elegidos[-1], len(self.y) - 1)
+        self.assertTrue((np.diff(elegidos) > 0).all())
+        self.assertTrue(set(self.picos) <= set(elegidos))
+
+        # Una serie corta se dibuja entera
+        np.testing.assert_array_equal(lttb(np.arange(10), self.y[:10], 500), np.arange(10))
+
+    # Las filas con nulos no se dibujan
+    def test_puntos_dispersion_nulos(self):
+        valores = self.y.copy()
+        valores[self.picos[0]] = np.nan
+        elegidos = puntos_dispersion(valores, 300)
+        self.assertEqual(len(elegidos), 300)
+        self.assertNotIn(self.picos[0], elegidos)
+        self.assertIn(self.picos[1], elegidos)
+
+    # La comparación de dispersión dibuja todas las columnas en una figura con un número fijo de puntos
+    # y normaliza con el mínimo y el máximo calculados, sin reajustar un escalador
+    @patch('matplotlib.pyplot.show')
+    def test_menu_dispersion(self, mock_show):
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos()
+        datos_obj.datos = pd.DataFrame({'Y': self.y, 'Z': self.y * 10 + 3, 'Grupo': 'a'})
+        datos_obj.paso = 3
+        datos_obj.features = ['Y', 'Z', 'Grupo']
+        datos_obj.targets = 'Y'
+        with patch('builtins.input', return_value='3'), patch('matplotlib.axes.Axes.scatter') as mock_scatter:
+            datos_obj.opcion3_visualizar_datos()
+        mock_show.assert_called_once()
+        self.assertEqual(datos_obj.paso, 4)
+        self.assertEqual(mock_scatter.call_count, 4)
+        for llamada in mock_scatter.call_args_list:
+            self.assertLessEqual(len(llamada.args[0]), 2000)
+        normalizados = mock_scatter.call_args_list[1].args[1]
+        self.assertEqual(normalizados.min(), 0.0)
+        self.assertEqual(normalizados.max(), 1.0)
+
+    # Datos con columnas numéricas, una categórica y nulos, guardados en CSV
+    def archivo(self, directorio):
+        generador = np.random.default_rng(9)
+        n = 1000
+        datos = pd.DataFrame({'A': generador.normal(0, 1, n), 'B': generador.exponential(2, n),
+                              'Grupo': generador.choice(['x', 'y'], n), 'Objetivo': generador.integers(0, 2, n)})
+        datos.loc[[4, 40], 'A'] = np.nan
+        ruta = os.path.join(directorio, 'datos.csv')
+        datos.to_csv(ruta, index=False)
+        return ruta, datos
+
+    # Los conteos salen de numpy.histogram, se calculan en una pasada, se reutilizan y por bloques son los mismos
+    def test_histogramas_cache_y_bloques(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta, datos = self.archivo(directorio)
+            resultados = []
+            for tamano_bloque in (None, 300):
+                with patch('manejodatos.Datos.proceso'):
+                    datos_obj = Datos(tamano_bloque=tamano_bloque, verboso=False)
+                datos_obj.cargar(ruta)
+                datos_obj.seleccionar_columnas(['A', 'B', 'Grupo'], 'Objetivo')
+                histogramas = datos_obj.histogramas()
+                pasadas = datos_obj.estadisticas.pasadas
+                self.assertIs(datos_obj.histogramas()['A'], histogramas['A'])
+                self.assertEqual(datos_obj.estadisticas.pasadas, pasadas)
+                resultados.append(histogramas)
+
+            self.assertEqual(list(resultados[0]), ['A', 'B'])
+            for columna in ('A', 'B'):
+                conteos, bordes = resultados[0][columna]
+                esperado = np.histogram(datos[columna].dropna(), 20)
+                np.testing.assert_array_equal(conteos, esperado[0])
+                np.testing.assert_allclose(bordes, esperado[1])
+                np.testing.assert_array_equal(resultados[1][columna][0], conteos)
+
+            # Normalizar una columna descarta su histograma y la matriz de correlación
+            datos_obj.correlacion()
+            datos_obj.normalizar('minmax')
+            self.assertFalse(datos_obj.estadisticas.correlaciones)
+            self.assertFalse(datos_obj.estadisticas.conteos_histograma)
+
+    # Con un directorio de informe el menú guarda los gráficos como archivos sin llamar a plt.show
+    @patch('matplotlib.pyplot.show')
+    def test_menu_informe(self, mock_show):
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta, datos = self.archivo(directorio)
+            informe = os.path.join(directorio, 'informe')
+            with patch('manejodatos.Datos.proceso'):
+                datos_obj = Datos(informe=informe, formato_graficos='svg')
+            datos_obj.datos = datos
+            datos_obj.paso = 3
+            datos_obj.features = ['A', 'B', 'Grupo']
+            datos_obj.targets = 'Objetivo'
+            for opcion in ('2', '3', '4'):
+                with patch('builtins.input', return_value=opcion), patch('builtins.print'):
+                    datos_obj.opcion3_visualizar_datos()
+            mock_show.assert_not_called()
+            self.assertEqual(sorted(os.listdir(informe)), ['correlacion.svg', 'dispersion.svg', 'histograma_A.svg', 'histograma_B.svg'])
+            pd.testing.assert_frame_equal(datos_obj.correlacion(), datos[['A', 'B']].corr())
+
+            with self.assertRaises(ValueError):
+                Datos.__init__(datos_obj, formato_graficos='jpg')
+
+    # El pipeline con la opción informe guarda los histogramas y el heatmap de los datos procesados
+    def test_pipeline_informe(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta, datos = self.archivo(directorio)
+            informe = os.path.join(directorio, 'informe')
+            ejecutar_pipeline({'fuente': ruta, 'features': ['A', 'B'], 'target': 'Objetivo', 'nulos': 'media',
+                               'exportar': os.path.join(directorio, 'salida.csv'), 'opciones': {'informe': informe}})
+            self.assertEqual(sorted(os.listdir(informe)), ['correlacion.png', 'histograma_A.png', 'histograma_B.png'])
+
+if __name__ == '__main__':
+    unittest.main()
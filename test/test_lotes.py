@@ -0,0 +1,116 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.lotes import ejecutar_lote, expandir_entradas
+from backend.motor import Preprocesador
+from backend.pipeline import ejecutar_pipeline
+
+class TestLotes(unittest.TestCase):
+    # Creamos varias particiones diarias en CSV, Excel y SQLite con la misma estructura
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.entradas = os.path.join(self.directorio.name, 'entradas')
+        os.makedirs(self.entradas)
+        generador = np.random.default_rng(2)
+        self.particiones = {}
+        for dia in range(1, 5):
+            n = 20 + dia
+            datos = pd.DataFrame({
+                'Edad': generador.integers(1, 80, n).astype(float),
+                'Tarifa': generador.exponential(20, n).round(2),
+                'Sobrevive': generador.integers(0, 2, n)
+            })
+            datos.loc[0, 'Edad'] = np.nan
+            self.particiones[f'dia{dia}'] = datos
+            datos.to_csv(os.path.join(self.entradas, f'dia{dia}.csv'), index=False)
+        self.particiones['dia5'] = self.particiones['dia1']
+        self.particiones['dia1'].to_excel(os.path.join(self.entradas, 'dia5.xlsx'), index=False)
+        conexion = sqlite3.connect(os.path.join(self.entradas, 'dia6.db'))
+        self.particiones['dia2'].to_sql('pasajeros', conexion, index=False)
+        conexion.close()
+        self.particiones['dia6'] = self.particiones['dia2']
+        open(os.path.join(self.entradas, 'notas.txt'), 'w').close()
+
+        self.salida = os.path.join(self.directorio.name, 'salida')
+        self.especificacion = {
+            'features': ['Edad', 'Tarifa'],
+            'target': 'Sobrevive',
+            'nulos': 'mediana',
+            'normalizacion': 'zscore',
+            'exportar': 'procesado.parquet'
+        }
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    # Un directorio o un patrón glob se expanden a las fuentes admitidas
+    def test_expandir_entradas(self):
+        self.assertEqual(len(expandir_entradas(self.entradas)), 6)
+        self.assertEqual(len(expandir_entradas(os.path.join(self.entradas, '*.csv'))), 4)
+
+    # Cada entrada produce su salida, igual a la del pipeline sobre ese archivo, y el resumen suma las filas
+    def test_ejecutar_lote(self):
+        lote = ejecutar_lote(self.especificacion, self.entradas, self.salida, procesos=2)
+
+        self.assertEqual(lote['archivos'], 6)
+        self.assertEqual(lote['fallos'], 0)
+        self.assertEqual(lote['filas_entrada'], sum(len(datos) for datos in self.particiones.values()))
+        self.assertEqual(lote['filas_salida'], lote['filas_entrada'])
+        for resultado in lote['resultados']:
+            nombre = os.path.splitext(os.path.basename(resultado['fuente']))[0]
+            self.assertEqual(resultado['salida'], os.path.join(self.salida, f'{nombre}.parquet'))
+
+        especificacion = dict(self.especificacion, fuente=os.path.join(self.entradas, 'dia3.csv'),
+                              exportar=os.path.join(self.directorio.name, 'dia3.parquet'))
+        ejecutar_pipeline(especificacion)
+        pd.testing.assert_frame_equal(pd.read_parquet(os.path.join(self.salida, 'dia3.parquet')),
+                                      pd.read_parquet(especificacion['exportar']))
+
+    # Un archivo fallido se informa en el resumen sin detener el resto del lote
+    def test_fallos_en_lote(self):
+        pd.DataFrame({'Otra': [1, 2]}).to_csv(os.path.join(self.entradas, 'roto.csv'), index=False)
+        lote = ejecutar_lote(self.especificacion, os.path.join(self.entradas, '*.csv'), self.salida)
+
+        self.assertEqual(lote['archivos'], 5)
+        self.assertEqual(lote['fallos'], 1)
+        fallido = [resultado for resultado in lote['resultados'] if 'error' in resultado][0]
+        self.assertTrue(fallido['fuente'].endswith('roto.csv'))
+        self.assertIn('ValueError', fallido['error'])
+        self.assertFalse(os.path.exists(os.path.join(self.salida, 'roto.parquet')))
+
+    # Sin archivos de entrada, o con nombres que se pisarían en la salida, se lanza un error
+    def test_entradas_invalidas(self):
+        with self.assertRaises(ValueError):
+            ejecutar_lote(self.especificacion, os.path.join(self.entradas, '*.json'), self.salida)
+        with self.assertRaises(ValueError):
+            ejecutar_lote(self.especificacion, [os.path.join(self.entradas, 'dia1.csv'), os.path.join(self.entradas, 'dia1.csv')], self.salida)
+
+    # Los núcleos se reparten entre los procesos del lote y el motor pasa sus hilos a los pasos paralelos
+    def test_hilos_por_tarea(self):
+        with patch('backend.lotes.os.cpu_count', return_value=8), \
+             patch('backend.lotes.ProcessPoolExecutor', ThreadPoolExecutor), \
+             patch('backend.lotes._procesar', return_value={'filas_entrada': 1, 'filas_salida': 1}) as procesar:
+            ejecutar_lote(self.especificacion, self.entradas, self.salida, procesos=4)
+            self.assertEqual({llamada.args[1]['n_jobs'] for llamada in procesar.call_args_list}, {2})
+            ejecutar_lote(self.especificacion, self.entradas, self.salida, n_jobs=3)
+            self.assertEqual(procesar.call_args_list[-1].args[1]['n_jobs'], 3)
+
+        motor = Preprocesador(n_jobs=1, verboso=False)
+        motor.cargar(os.path.join(self.entradas, 'dia1.csv'))
+        motor.seleccionar_columnas(['Edad', 'Tarifa'], 'Sobrevive')
+        motor.manejar_nulos('knn')
+        self.assertEqual(motor.transformaciones[-1]['n_jobs'], 1)
+        motor.detectar_anomalias('lof')
+        self.assertEqual(motor._atipicos[1]['n_jobs'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
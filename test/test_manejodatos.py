@@ -3,10 +3,11 @@ import os
 import sys
 import unittest
 from unittest.mock import patch, MagicMock, call
-from sklearn.preprocessing import  StandardScaler
+from sklearn.preprocessing import  StandardScaler, RobustScaler
 import pandas as pd
 import numpy as np
 import io
+import tempfile
 
 # Agregar el directorio principal al path para poder importar los módulos
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -231,6 +232,46 @@ class TestDatos(unittest.TestCase):
         self.assertEqual(datos_obj.datos.loc[4, 'Age'], media_age)  
         self.assertEqual(datos_obj.paso, 2.3)
     
+    # Existen valores nulos: una estrategia por columna, solo sobre las seleccionadas
+    def test_manejo_nulos_por_columna(self):
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos()
+        
+        # Configurar el objeto con un nulo más en Fare, que no se selecciona
+        datos_obj.datos = self.test_data.copy()
+        datos_obj.datos.loc[0, 'Fare'] = np.nan
+        datos_obj.paso = 2.2
+        datos_obj.features = ['Age', 'Cabin', 'Pclass']
+        datos_obj.targets = 'Survived'
+        
+        # Age con la mediana de su clase y Cabin con una constante
+        with patch('builtins.input', side_effect=['6', '5', 'Pclass', '2', 'Desconocida']), patch('builtins.print'):
+            datos_obj.opcion2_manejo_nulos()
+        
+        esperado = self.test_data['Age'].fillna(self.test_data.groupby('Pclass')['Age'].transform('median'))
+        pd.testing.assert_series_equal(datos_obj.datos['Age'], esperado)
+        self.assertEqual(list(datos_obj.datos['Cabin']), ['Desconocida', 'C85', 'Desconocida', 'C123', 'Desconocida'])
+        self.assertTrue(np.isnan(datos_obj.datos.loc[0, 'Fare']))
+        self.assertEqual(datos_obj.paso, 2.3)
+
+    # La constante solo rellena las columnas numéricas seleccionadas
+    def test_manejo_nulos_constante_solo_numericas(self):
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos()
+        datos_obj.datos = self.test_data.copy()
+        datos_obj.features = ['Age', 'Cabin']
+        datos_obj.targets = 'Survived'
+        
+        with patch('builtins.input', side_effect=['5', '0']), patch('builtins.print'):
+            datos_obj.opcion2_manejo_nulos()
+        
+        self.assertEqual(datos_obj.datos.loc[4, 'Age'], 0)
+        self.assertEqual(datos_obj.datos['Cabin'].isnull().sum(), 3)
+        with self.assertRaises(ValueError):
+            datos_obj.imputar({'Cabin': 'media'})
+        with self.assertRaises(ValueError):
+            datos_obj.imputar({'Fare': 'media'})
+    
     # Transformar datos categóricos: One-Hot Encoding
     def test_transformar_categoricos_one_hot(self):
         with patch('manejodatos.Datos.proceso'):
@@ -273,6 +314,35 @@ class TestDatos(unittest.TestCase):
         self.assertTrue(pd.api.types.is_numeric_dtype(datos_obj.datos['Embarked']))
         self.assertEqual(datos_obj.paso, 2.4)
     
+    # Label Encoding con códigos de category del menor tipo entero y correspondencias reutilizables
+    def test_label_encoding_correspondencias(self):
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos()
+        datos_obj.datos = self.test_data.copy()
+        datos_obj.features = ['Sex', 'Cabin']
+        datos_obj.targets = 'Survived'
+        datos_obj.transformar_categoricos('label')
+        
+        self.assertEqual(datos_obj.datos['Sex'].dtype, np.int8)
+        self.assertEqual(list(datos_obj.datos['Sex']), [1, 0, 0, 0, 1])
+        self.assertEqual(list(datos_obj.datos['Cabin']), [-1, 1, -1, 0, -1]) # Los nulos quedan como -1
+        self.assertEqual(datos_obj.codificaciones, {'Sex': ['female', 'male'], 'Cabin': ['C123', 'C85']})
+        
+        # Un lote nuevo con las correspondencias guardadas se codifica igual, sin recorrer los datos
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, 'codificaciones.json')
+            datos_obj.guardar_codificaciones(ruta)
+            with patch('manejodatos.Datos.proceso'):
+                nuevo = Datos()
+            nuevo.cargar_codificaciones(ruta)
+        nuevo.datos = pd.DataFrame({'Sex': ['male', 'male'], 'Cabin': ['C85', 'B20'], 'Survived': [0, 1]})
+        nuevo.features = ['Sex', 'Cabin']
+        nuevo.targets = 'Survived'
+        nuevo.transformar_categoricos('label')
+        self.assertEqual(nuevo.estadisticas.pasadas, 0)
+        self.assertEqual(list(nuevo.datos['Sex']), [1, 1])
+        self.assertEqual(list(nuevo.datos['Cabin']), [1, -1]) # Categoría no vista
+    
     # Normalizar columnas numéricas: Min-Max Scaling
     def test_normalizar_numericas_min_max(self):
         with patch('manejodatos.Datos.proceso'):
@@ -323,7 +393,31 @@ class TestDatos(unittest.TestCase):
                 self.assertTrue(abs(actual_transformed[i][j] - expected_transformed[i][j]) < 1e-5)
         
         self.assertEqual(datos_obj.paso, 2.5)
-    
+
+    # Normalizar columnas numéricas: Robust Scaling en float32, escribiendo sobre las columnas float
+    def test_normalizar_numericas_robusto_float32(self):
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos(float32=True)
+        datos_obj.datos = self.test_data.copy()
+        datos_obj.paso = 2.4
+        datos_obj.features = ['Age', 'Fare', 'Pclass']
+        datos_obj.targets = 'Survived'
+        expected_transformed = RobustScaler().fit_transform(datos_obj.datos[['Age', 'Fare', 'Pclass']])
+
+        with patch('builtins.input', return_value='3'), patch('builtins.print'):
+            datos_obj.opcion2_normalizar_numericas()
+
+        self.assertEqual(datos_obj.paso, 2.5)
+        self.assertTrue((datos_obj.datos[['Age', 'Fare', 'Pclass']].dtypes == np.float32).all())
+        np.testing.assert_allclose(datos_obj.datos[['Age', 'Fare', 'Pclass']].to_numpy(), expected_transformed, rtol=1e-6)
+
+        # Una columna float64 se escala sobre su propio array, sin crear otro
+        datos_obj.datos = self.test_data.copy()
+        valores = datos_obj.datos['Fare'].to_numpy()
+        datos_obj.normalizar('minmax', float32=False)
+        self.assertTrue(np.shares_memory(datos_obj.datos['Fare'].to_numpy(), valores))
+        self.assertAlmostEqual(datos_obj.datos['Fare'].max(), 1.0)
+
     # Manejo de valores atípicos: Eliminar filas
     def test_manejo_atipicos_eliminar_filas(self):
         with patch('manejodatos.Datos.proceso'):
@@ -373,7 +467,34 @@ class TestDatos(unittest.TestCase):
         self.assertFalse((datos_obj.datos['Fare'] == 1000.0).any())
         self.assertEqual(datos_obj.datos.loc[0, 'Fare'], mediana_fare)
         self.assertEqual(datos_obj.paso, 3)
-    
+
+    # Atípicos: recuentos y máscara de filas de todas las columnas a la vez, sin depender de su orden
+    def test_atipicos_mascara_y_orden(self):
+        generador = np.random.default_rng(4)
+        datos = pd.DataFrame({'A': generador.normal(0, 1, 200), 'B': generador.normal(0, 1, 200), 'Survived': 0})
+        datos.loc[[3, 50], 'A'] = 9.0
+        datos.loc[[50, 120], 'B'] = -9.0
+
+        resultados = []
+        for features in (['A', 'B'], ['B', 'A']):
+            with patch('manejodatos.Datos.proceso'):
+                datos_obj = Datos()
+            datos_obj.datos = datos.copy()
+            datos_obj.features = features
+            datos_obj.targets = 'Survived'
+            conteo = datos_obj.detectar_atipicos()
+            for columna in features:
+                Q1, Q3 = datos[columna].quantile([0.25, 0.75])
+                esperado = ((datos[columna] < Q1 - 1.5 * (Q3 - Q1)) | (datos[columna] > Q3 + 1.5 * (Q3 - Q1))).sum()
+                self.assertEqual(conteo.get(columna, 0), esperado)
+            self.assertEqual(datos_obj.conteo_atipicos, conteo)
+            self.assertTrue(datos_obj.mascara_atipicos[[3, 50, 120]].all())
+            datos_obj.manejar_atipicos('eliminar')
+            resultados.append(datos_obj.datos)
+
+        self.assertEqual(len(resultados[0]), len(datos) - datos_obj.mascara_atipicos.sum())
+        pd.testing.assert_frame_equal(resultados[0], resultados[1])
+
     # Visualizar datos: Resumen estadístico
     def test_visualizar_datos_resumen_estadistico(self):
         with patch('manejodatos.Datos.proceso'):
@@ -424,14 +545,17 @@ class TestDatos(unittest.TestCase):
         datos_obj.features = ['Age', 'Fare', 'Pclass']
         datos_obj.targets = 'Survived'
         
-        with patch('pandas.DataFrame.to_csv') as mock_to_csv, \
-             patch('builtins.input', side_effect=['1', 'datos_exportados']), \
-             patch('builtins.print') as mock_print:
-            datos_obj.opcion4_exportar_datos()
-        
-        # Verificar que se exportó a CSV
-        mock_to_csv.assert_called_once_with('datos_exportados.csv', index=False)
-        mock_print.assert_any_call('Datos exportados correctamente como "datos_exportados.csv".')
+        # El CSV se escribe por trozos en un temporal que se renombra al terminar
+        with tempfile.TemporaryDirectory() as directorio:
+            nombre = os.path.join(directorio, 'datos_exportados')
+            with patch('builtins.input', side_effect=['1', nombre]), \
+                 patch('builtins.print') as mock_print:
+                datos_obj.opcion4_exportar_datos()
+        
+            # Verificar que se exportó a CSV
+            pd.testing.assert_frame_equal(pd.read_csv(nombre + '.csv'), self.test_data)
+            self.assertEqual(os.listdir(directorio), ['datos_exportados.csv'])
+        mock_print.assert_any_call(f'Datos exportados correctamente como "{nombre}.csv".')
         self.assertEqual(datos_obj.paso, 5)
     
     # Exportar datos: Archivo excel
@@ -455,5 +579,79 @@ class TestDatos(unittest.TestCase):
         mock_print.assert_any_call('Datos exportados correctamente como "datos_exportados.xlsx".')
         self.assertEqual(datos_obj.paso, 5)
 
+    # Carga en modo compacto: los pasos siguen reconociendo las columnas reducidas
+    def test_carga_compacta_y_normalizacion(self):
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos(compacto=True)
+
+        with patch('manejodatos.cargar_datos', return_value=(1, 'test.csv')), \
+             patch('os.path.exists', return_value=True), \
+             patch('pandas.read_csv', return_value=self.test_data.copy()), \
+             patch('manejodatos.mostrar_datos'), \
+             patch('builtins.print') as mock_print:
+            datos_obj.opcion1_carga()
+
+        self.assertEqual(datos_obj.datos['Pclass'].dtype, np.uint8)
+        self.assertIsInstance(datos_obj.datos['Sex'].dtype, pd.CategoricalDtype)
+        self.assertTrue(any('Modo compacto' in str(llamada.args[0]) for llamada in mock_print.call_args_list))
+
+        datos_obj.features = ['Pclass', 'Fare', 'Sex']
+        datos_obj.targets = 'Survived'
+        with patch('builtins.input', return_value='1'), patch('builtins.print'):
+            datos_obj.opcion2_transformar_categoricos()
+            datos_obj.opcion2_normalizar_numericas()
+
+        self.assertIn('Sex_female', datos_obj.datos.columns)
+        self.assertEqual(datos_obj.datos['Pclass'].min(), 0)
+        self.assertEqual(datos_obj.datos['Pclass'].max(), 1)
+        self.assertEqual(datos_obj.paso, 2.5)
+
+        # Por bloques no se reducen los tipos, así que la combinación se rechaza en lugar de ignorarse
+        with self.assertRaises(ValueError), patch('manejodatos.Datos.proceso'):
+            Datos(compacto=True, tamano_bloque=10)
+
+    # Carga por columnas: primero una vista previa y tras la selección solo las columnas elegidas
+    def test_carga_proyectada(self):
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos(proyectar=True)
+
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, 'titanic.csv')
+            self.test_data.to_csv(ruta, index=False)
+
+            with patch('manejodatos.cargar_datos', return_value=(1, ruta)), \
+                 patch('manejodatos.mostrar_datos'), patch('builtins.print'):
+                datos_obj.opcion1_carga()
+            self.assertTrue(datos_obj.proyeccion_pendiente)
+            self.assertEqual(len(datos_obj.datos.columns), len(self.test_data.columns))
+
+            with patch('manejodatos.seleccion_terminal', return_value=(['Age', 'Sex'], 'Survived')), \
+                 patch('builtins.print'):
+                datos_obj.opcion2_selector_columnas()
+
+        self.assertFalse(datos_obj.proyeccion_pendiente)
+        self.assertEqual(sorted(datos_obj.datos.columns), ['Age', 'Sex', 'Survived'])
+        self.assertEqual(len(datos_obj.datos), 5)
+        self.assertEqual(datos_obj.paso, 2.2)
+
+    # Exportar datos: Parquet y Feather se pueden volver a leer sin cambios
+    def test_exportar_datos_parquet_feather(self):
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos(compresion='zstd')
+
+        esperado = self.test_data.drop(columns=['Cabin']) # Parquet devuelve None en los textos nulos
+        datos_obj.datos = esperado.copy()
+        datos_obj.paso = 4
+        with tempfile.TemporaryDirectory() as directorio:
+            nombre = os.path.join(directorio, 'salida')
+            with patch('builtins.input', side_effect=['3', nombre]), patch('builtins.print'):
+                datos_obj.opcion4_exportar_datos()
+            pd.testing.assert_frame_equal(pd.read_parquet(f"{nombre}.parquet"), esperado)
+
+            with patch('builtins.input', side_effect=['4', nombre]), patch('builtins.print'):
+                datos_obj.opcion4_exportar_datos()
+            pd.testing.assert_frame_equal(pd.read_feather(f"{nombre}.feather"), esperado)
+        self.assertEqual(datos_obj.paso, 5)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
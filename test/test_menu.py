@@ -139,15 +139,22 @@ class TestMenuFunciones(unittest.TestCase):
         resultado = menu.cargar_datos()
         self.assertEqual(resultado, (3, 'test.db'))
 
-    # Prueba cargar_datos seleccionando volver al menú principal    
-    @patch('builtins.input', side_effect=['4'])
+    # Prueba cargar_datos seleccionando un archivo Parquet
+    @patch('builtins.input', side_effect=['4', 'test.parquet'])
+
+    def test_cargar_datos_parquet(self, mock_input):
+        resultado = menu.cargar_datos()
+        self.assertEqual(resultado, (4, 'test.parquet'))
+
+    # Prueba cargar_datos seleccionando volver al menú principal
+    @patch('builtins.input', side_effect=['6'])
 
     def test_cargar_datos_volver(self, mock_input):
         resultado = menu.cargar_datos()
         self.assertEqual(resultado, None)
 
     # Prueba cargar_datos con una opción inválida    
-    @patch('builtins.input', side_effect=['6', '4'])  # Opción inválida, luego volver
+    @patch('builtins.input', side_effect=['7', '6'])  # Opción inválida, luego volver
     @patch('builtins.print')
 
     def test_cargar_datos_opcion_invalida(self, mock_print, mock_input):
@@ -192,6 +199,26 @@ class TestMenuFunciones(unittest.TestCase):
         self.assertTrue(filas, "No se mostró el número de filas")
         self.assertTrue(columnas, "No se mostró el número de columnas")
 
+    # Prueba mostrar_datos informando del estado de la caché
+    @patch('builtins.print')
+
+    def test_mostrar_datos_cache(self, mock_print):
+        cache = MagicMock(ultimo_acierto=True, aciertos=2, fallos=1)
+        cache.tamano.return_value = 0
+        menu.mostrar_datos(self.test_df, "test.csv", cache)
+
+        mensaje = any(len(llamada.args) > 0 and isinstance(llamada.args[0], str) and "Caché: acierto" in llamada.args[0]
+                      for llamada in mock_print.call_args_list)
+        self.assertTrue(mensaje, "No se mostró el estado de la caché")
+
+        # Si la lectura no pasó por la caché (modo por bloques) no se informa de un fallo
+        mock_print.reset_mock()
+        cache.ultimo_acierto = None
+        menu.mostrar_datos(self.test_df, "test.csv", cache)
+        mensajes = [llamada.args[0] for llamada in mock_print.call_args_list if llamada.args and isinstance(llamada.args[0], str)]
+        self.assertTrue(any("Caché: no usada" in mensaje for mensaje in mensajes))
+        self.assertFalse(any("Caché: fallo" in mensaje for mensaje in mensajes))
+
     # Prueba seleccion_terminal   
     @patch('builtins.input', side_effect=['1,2', '3'])
     @patch('builtins.print')
@@ -0,0 +1,126 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+with patch('manejodatos.Datos.proceso'):
+    from manejodatos import Datos
+import backend.perfil
+from backend.pipeline import ejecutar_pipeline
+
+class TestPerfil(unittest.TestCase):
+    # Creamos unos datos con nulos, una columna categórica y una numérica con pocos valores
+    def setUp(self):
+        generador = np.random.default_rng(8)
+        n = 600
+        self.test_data = pd.DataFrame({
+            'Edad': generador.normal(40, 12, n).round(1),
+            'Hijos': generador.integers(0, 4, n),
+            'Puerto': generador.choice(['S', 'C', 'Q'], n, p=[0.6, 0.3, 0.1]),
+            'Sobrevive': generador.integers(0, 2, n)
+        })
+        self.test_data.loc[[2, 30, 300], 'Edad'] = np.nan
+        self.test_data.loc[[5, 50], 'Puerto'] = np.nan
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, 'datos.csv')
+        self.test_data.to_csv(self.ruta, index=False)
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def cargar(self, perfil, tamano_bloque=None):
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos(tamano_bloque=tamano_bloque, perfil=perfil)
+        with patch('manejodatos.cargar_datos', return_value=(1, self.ruta)), \
+             patch('manejodatos.mostrar_datos'), patch('builtins.print'):
+            datos_obj.opcion1_carga()
+        return datos_obj
+
+    # El perfil en JSON recoge nulos, cardinalidad, cuantiles, histogramas, valores frecuentes y memoria
+    # de todas las filas, también por bloques
+    def test_perfil_json(self):
+        ruta_perfil = os.path.join(self.directorio.name, 'perfil.json')
+        for tamano_bloque in (None, 100):
+            datos_obj = self.cargar(ruta_perfil, tamano_bloque)
+            perfil = datos_obj.esperar_perfil()
+            with open(ruta_perfil, encoding='utf-8') as archivo:
+                self.assertEqual(json.load(archivo), perfil)
+
+            self.assertEqual(perfil['filas'], len(self.test_data))
+            self.assertGreater(perfil['memoria'], 0)
+            edad, hijos, puerto = perfil['columnas']['Edad'], perfil['columnas']['Hijos'], perfil['columnas']['Puerto']
+            self.assertEqual(edad['nulos'], 3)
+            self.assertAlmostEqual(edad['tasa_nulos'], 3 / len(self.test_data))
+            self.assertAlmostEqual(edad['cuantiles']['0.5'], self.test_data['Edad'].median())
+            self.assertAlmostEqual(edad['cuantiles']['0.95'], self.test_data['Edad'].quantile(0.95))
+            self.assertEqual(sum(edad['histograma']['conteos']), len(self.test_data) - 3)
+            self.assertEqual(hijos['distintos'], 4 if tamano_bloque is None else None) # Por bloques las numéricas se resumen
+            self.assertEqual(puerto['distintos'], 3)
+            self.assertEqual(puerto['frecuentes'][0], ['S', int((self.test_data['Puerto'] == 'S').sum())])
+            self.assertNotIn('histograma', puerto)
+
+    # Los pasos usan las estadísticas del perfil y no vuelven a recorrer los datos
+    def test_pasos_usan_el_perfil(self):
+        datos_obj = self.cargar(os.path.join(self.directorio.name, 'perfil.html'))
+        datos_obj.features = ['Edad', 'Hijos', 'Puerto']
+        datos_obj.targets = 'Sobrevive'
+        datos_obj.detectar_nulos()
+        datos_obj.manejar_nulos('mediana')
+        datos_obj.histogramas(['Hijos'])
+        self.assertEqual(datos_obj.estadisticas.pasadas, 0)
+        self.assertEqual(datos_obj.datos['Edad'].isnull().sum(), 0)
+        self.assertAlmostEqual(datos_obj.datos.loc[2, 'Edad'], self.test_data['Edad'].median())
+        with open(os.path.join(self.directorio.name, 'perfil.html'), encoding='utf-8') as archivo:
+            pagina = archivo.read()
+        self.assertIn('<h2>Puerto</h2>', pagina)
+
+    # El perfil se calcula en segundo plano: la carga vuelve enseguida y se puede seguir trabajando
+    def test_segundo_plano(self):
+        continuar = threading.Event()
+        calcular = backend.perfil.calcular_perfil
+        def lento(*args, **kwargs):
+            continuar.wait(10)
+            return calcular(*args, **kwargs)
+
+        with patch('backend.motor.calcular_perfil', side_effect=lento):
+            datos_obj = self.cargar(os.path.join(self.directorio.name, 'perfil.json'))
+            futuro = datos_obj._perfil_pendiente[0]
+            self.assertFalse(futuro.done())
+            datos_obj.seleccionar_columnas(['Edad', 'Puerto'], 'Sobrevive') # No necesita estadísticas
+            self.assertFalse(futuro.done())
+            continuar.set()
+            self.assertEqual(len(datos_obj.detectar_nulos()), 2)
+        self.assertIsNotNone(datos_obj.perfil_datos)
+        self.assertEqual(datos_obj.estadisticas.pasadas, 0)
+
+    # Si los datos cambian antes de que termine, el perfil no se incorpora a la caché
+    def test_datos_cambiados(self):
+        datos_obj = self.cargar(os.path.join(self.directorio.name, 'perfil.json'))
+        datos_obj.datos = datos_obj.datos.head(10)
+        datos_obj.features = ['Edad']
+        datos_obj.targets = 'Sobrevive'
+        datos_obj.detectar_nulos()
+        self.assertIsNone(datos_obj.perfil_datos)
+        self.assertEqual(datos_obj.estadisticas.pasadas, 1)
+
+        with self.assertRaises(ValueError):
+            Datos.__init__(datos_obj, perfil='perfil.txt')
+
+    # El pipeline escribe el perfil de la fuente
+    def test_pipeline(self):
+        ruta_perfil = os.path.join(self.directorio.name, 'perfil.json')
+        ejecutar_pipeline({'fuente': self.ruta, 'features': ['Edad', 'Hijos'], 'target': 'Sobrevive', 'nulos': 'media',
+                           'exportar': os.path.join(self.directorio.name, 'salida.csv'), 'opciones': {'perfil': ruta_perfil}})
+        with open(ruta_perfil, encoding='utf-8') as archivo:
+            self.assertEqual(json.load(archivo)['filas'], len(self.test_data))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+with patch('manejodatos.Datos.proceso'):
+    from manejodatos import Datos
+from backend.fuentes import cerrar_conexiones
+from backend.pipeline import cargar_especificacion, ejecutar_pipeline
+
+class TestPipeline(unittest.TestCase):
+    # Creamos un CSV de prueba y una especificación que recorre todos los pasos
+    def setUp(self):
+        generador = np.random.default_rng(1)
+        n = 40
+        self.test_data = pd.DataFrame({
+            'Edad': generador.integers(1, 80, n).astype(float),
+            'Tarifa': generador.exponential(20, n).round(2),
+            'Sexo': generador.choice(['male', 'female'], n),
+            'Sobrevive': generador.integers(0, 2, n)
+        })
+        self.test_data.loc[[2, 11], 'Edad'] = np.nan
+        self.test_data.loc[7, 'Tarifa'] = 800.0
+
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, 'datos.csv')
+        self.test_data.to_csv(self.ruta, index=False)
+        self.especificacion = {
+            'fuente': self.ruta,
+            'features': ['Edad', 'Tarifa', 'Sexo'],
+            'target': 'Sobrevive',
+            'nulos': 'media',
+            'categoricos': 'one_hot',
+            'normalizacion': 'minmax',
+            'atipicos': 'eliminar',
+            'exportar': os.path.join(self.directorio.name, 'salida.csv')
+        }
+
+    def tearDown(self):
+        cerrar_conexiones()
+        self.directorio.cleanup()
+
+    # La especificación se ejecuta sin preguntar nada y devuelve el resumen
+    def test_ejecutar_pipeline(self):
+        with patch('builtins.input', side_effect=AssertionError("no debe preguntar")):
+            resumen = ejecutar_pipeline(self.especificacion)
+
+        exportado = pd.read_csv(self.especificacion['exportar'])
+        self.assertEqual(resumen['filas_entrada'], len(self.test_data))
+        self.assertEqual(resumen['filas_salida'], len(exportado))
+        self.assertLess(len(exportado), len(self.test_data))
+        self.assertFalse(exportado.isnull().any().any())
+        self.assertIn('Sexo_male', exportado.columns)
+        self.assertGreaterEqual(resumen['segundos'], 0)
+
+    # El pipeline da el mismo resultado que el menú interactivo con las mismas opciones
+    def test_pipeline_igual_que_menu(self):
+        ejecutar_pipeline(self.especificacion)
+
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos()
+        salida = os.path.join(self.directorio.name, 'menu')
+        with patch('manejodatos.cargar_datos', return_value=(1, self.ruta)), \
+             patch('manejodatos.mostrar_datos'), \
+             patch('manejodatos.seleccion_terminal', return_value=(['Edad', 'Tarifa', 'Sexo'], 'Sobrevive')), \
+             patch('builtins.input', side_effect=['2', '1', '1', '1', '1', salida]), patch('builtins.print'):
+            datos_obj.opcion1_carga()
+            datos_obj.opcion2_selector_columnas()
+            datos_obj.opcion2_manejo_nulos()
+            datos_obj.opcion2_transformar_categoricos()
+            datos_obj.opcion2_normalizar_numericas()
+            datos_obj.opcion2_manejo_atipicos()
+            datos_obj.paso = 4
+            datos_obj.opcion4_exportar_datos()
+
+        pd.testing.assert_frame_equal(pd.read_csv(self.especificacion['exportar']), pd.read_csv(f"{salida}.csv"))
+
+    # Por bloques y leyendo la especificación desde un JSON se obtiene el mismo resultado
+    def test_pipeline_por_bloques_desde_json(self):
+        en_memoria = ejecutar_pipeline(self.especificacion)
+        esperado = pd.read_csv(self.especificacion['exportar'])
+
+        self.especificacion['opciones'] = {'bloque': 7}
+        self.especificacion['exportar'] = os.path.join(self.directorio.name, 'bloques.csv')
+        ruta = os.path.join(self.directorio.name, 'pipeline.json')
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump(self.especificacion, archivo)
+
+        self.assertEqual(cargar_especificacion(ruta), self.especificacion)
+        por_bloques = ejecutar_pipeline(ruta)
+        self.assertEqual(por_bloques['filas_entrada'], en_memoria['filas_entrada'])
+        self.assertEqual(por_bloques['filas_salida'], en_memoria['filas_salida'])
+        pd.testing.assert_frame_equal(pd.read_csv(self.especificacion['exportar']), esperado, check_exact=False)
+
+    # Un valor constante para los nulos y los pasos no indicados se omiten
+    def test_nulos_constante_y_pasos_omitidos(self):
+        self.especificacion.update({'nulos': {'estrategia': 'constante', 'valor': -1},
+                                    'features': ['Edad'], 'categoricos': None,
+                                    'normalizacion': None, 'atipicos': None})
+        ejecutar_pipeline(self.especificacion)
+
+        exportado = pd.read_csv(self.especificacion['exportar'])
+        self.assertEqual(list(exportado.columns), list(self.test_data.columns))
+        self.assertEqual((exportado['Edad'] == -1).sum(), 2)
+
+    # Las especificaciones incompletas o con estrategias desconocidas dan un error claro
+    def test_especificacion_invalida(self):
+        del self.especificacion['target']
+        with self.assertRaises(ValueError):
+            ejecutar_pipeline(self.especificacion)
+
+        self.especificacion.update({'target': 'Sobrevive', 'normalizacion': 'cuadrados'})
+        with self.assertRaises(ValueError):
+            ejecutar_pipeline(self.especificacion)
+
+        self.especificacion.update({'normalizacion': 'minmax', 'features': ['Altura']})
+        with self.assertRaises(ValueError):
+            ejecutar_pipeline(self.especificacion)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import bz2
+import gzip
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+with patch('manejodatos.Datos.proceso'):
+    from manejodatos import Datos
+from backend.salida_csv import escribir_csv
+
+class TestSalidaCsv(unittest.TestCase):
+    # Creamos unos datos con nulos, textos y decimales
+    def setUp(self):
+        generador = np.random.default_rng(6)
+        n = 2500
+        self.test_data = pd.DataFrame({
+            'Edad': generador.normal(40, 12, n).round(2),
+            'Nombre': [f"Pasajero {i}, \"{i % 7}\"" for i in range(n)],
+            'Clase': generador.integers(1, 4, n)
+        })
+        self.test_data.loc[[3, 1000], 'Edad'] = np.nan
+        self.texto = self.test_data.to_csv(index=False).encode('utf-8')
+        self.directorio = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def leer(self, ruta):
+        if ruta.endswith('.gz'):
+            return gzip.open(ruta).read()
+        if ruta.endswith('.bz2'):
+            return bz2.open(ruta).read()
+        if ruta.endswith('.zst'):
+            return pa.input_stream(ruta, compression='zstd').read()
+        with open(ruta, 'rb') as archivo:
+            return archivo.read()
+
+    # Por trozos y con cualquier compresión el contenido es el mismo que con un único to_csv
+    def test_compresiones(self):
+        for extension in ('.csv', '.csv.gz', '.csv.bz2', '.csv.zst'):
+            ruta = os.path.join(self.directorio.name, 'salida' + extension)
+            bloques = [self.test_data.iloc[:1000], self.test_data.iloc[1000:1000], self.test_data.iloc[1000:]]
+            resultado = escribir_csv(bloques, ruta, filas=300)
+            self.assertEqual(self.leer(ruta), self.texto, extension)
+            self.assertEqual(resultado['filas'], len(self.test_data))
+            self.assertEqual(resultado['bytes'], len(self.texto))
+            self.assertEqual(resultado['bytes_archivo'], os.path.getsize(ruta))
+            if extension != '.csv':
+                self.assertLess(resultado['bytes_archivo'], resultado['bytes'])
+        self.assertFalse([nombre for nombre in os.listdir(self.directorio.name) if nombre.endswith('.tmp')])
+
+        # Sin filas se escribe solo la cabecera
+        ruta = os.path.join(self.directorio.name, 'vacio.csv.gz')
+        escribir_csv([self.test_data.iloc[:0]], ruta)
+        self.assertEqual(self.leer(ruta), b"Edad,Nombre,Clase\n")
+
+    # Si la exportación falla a medias el archivo anterior no se toca y no queda el temporal
+    def test_escritura_atomica(self):
+        ruta = os.path.join(self.directorio.name, 'salida.csv.gz')
+        escribir_csv([self.test_data], ruta)
+        def bloques():
+            yield self.test_data.iloc[:100]
+            raise OSError("fuente no disponible")
+        with self.assertRaises(OSError):
+            escribir_csv(bloques(), ruta, filas=50)
+        self.assertEqual(self.leer(ruta), self.texto)
+        self.assertEqual(os.listdir(self.directorio.name), ['salida.csv.gz'])
+
+    # Por bloques se obtiene el mismo CSV comprimido que en memoria
+    def test_bloques(self):
+        entrada = os.path.join(self.directorio.name, 'entrada.csv')
+        self.test_data.to_csv(entrada, index=False)
+        salidas = []
+        for tamano_bloque in (None, 700):
+            with patch('manejodatos.Datos.proceso'):
+                datos_obj = Datos(tamano_bloque=tamano_bloque, verboso=False)
+            datos_obj.cargar(entrada)
+            salida = os.path.join(self.directorio.name, f'salida{tamano_bloque}.csv.bz2')
+            self.assertEqual(datos_obj.exportar(salida), len(self.test_data))
+            salidas.append(self.leer(salida))
+        self.assertEqual(salidas[0], salidas[1])
+        self.assertEqual(salidas[0], self.texto)
+
+    # Desde el menú se elige la compresión y se informa del rendimiento
+    def test_menu_comprimido(self):
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos()
+        datos_obj.datos = self.test_data.copy()
+        datos_obj.paso = 4
+        nombre = os.path.join(self.directorio.name, 'exportado')
+        with patch('builtins.input', side_effect=['7', nombre, 'zstd']), patch('builtins.print') as mock_print:
+            datos_obj.opcion4_exportar_datos()
+        self.assertEqual(self.leer(nombre + '.csv.zst'), self.texto)
+        mock_print.assert_any_call(f'Datos exportados correctamente como "{nombre}.csv.zst".')
+        self.assertTrue(any('MB/s' in str(llamada.args[0]) for llamada in mock_print.call_args_list))
+        self.assertEqual(datos_obj.paso, 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+with patch('manejodatos.Datos.proceso'):
+    from manejodatos import Datos
+from backend.pipeline import ejecutar_pipeline
+from backend.salida_sqlite import escribir_sqlite
+
+class TestSalidaSqlite(unittest.TestCase):
+    # Creamos datos con enteros, decimales con nulos, textos, booleanos, enteros nullables, categorías y fechas
+    def setUp(self):
+        generador = np.random.default_rng(12)
+        n = 3000
+        self.test_data = pd.DataFrame({
+            'Id': np.arange(n, dtype='int32'),
+            'Edad': generador.normal(40, 12, n).round(2),
+            'Puerto': generador.choice(['S', 'C', 'Q'], n),
+            'Vivo': generador.integers(0, 2, n).astype(bool),
+            'Hijos': pd.array(generador.integers(0, 4, n), dtype='Int64'),
+            'Clase': pd.Categorical(generador.choice(['primera', 'segunda'], n)),
+            'Fecha': pd.date_range('2024-01-01', periods=n, freq='h'),
+        })
+        self.test_data.loc[[1, 20], 'Edad'] = np.nan
+        self.test_data.loc[[5], 'Puerto'] = None
+        self.test_data.loc[[7], 'Hijos'] = pd.NA
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, 'salida.sqlite')
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def leer(self, tabla='datos'):
+        with sqlite3.connect(self.ruta) as conexion:
+            return pd.read_sql(f'SELECT * FROM "{tabla}"', conexion)
+
+    # La tabla se crea con los tipos de las columnas y conserva valores y nulos; se vuelve al diario anterior
+    def test_tipos_y_valores(self):
+        resultado = escribir_sqlite([self.test_data.iloc[:1000], self.test_data.iloc[1000:]], self.ruta, filas=700)
+        self.assertEqual(resultado['filas'], len(self.test_data))
+        with sqlite3.connect(self.ruta) as conexion:
+            tipos = {fila[1]: fila[2] for fila in conexion.execute('PRAGMA table_info("datos")')}
+            diario = conexion.execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(tipos, {'Id': 'INTEGER', 'Edad': 'REAL', 'Puerto': 'TEXT', 'Vivo': 'INTEGER',
+                                 'Hijos': 'INTEGER', 'Clase': 'TEXT', 'Fecha': 'TEXT'})
+        self.assertEqual(diario, 'delete')
+        self.assertFalse(os.path.exists(self.ruta + '-wal'))
+
+        leidos = self.leer()
+        self.assertEqual(list(leidos['Id']), list(range(len(self.test_data))))
+        pd.testing.assert_series_equal(leidos['Edad'], self.test_data['Edad'])
+        self.assertIsNone(leidos.loc[5, 'Puerto'])
+        self.assertEqual(list(leidos['Vivo']), list(self.test_data['Vivo'].astype(int)))
+        self.assertTrue(np.isnan(leidos.loc[7, 'Hijos']))
+        self.assertEqual(leidos.loc[2, 'Clase'], self.test_data.loc[2, 'Clase'])
+        self.assertEqual(leidos.loc[3, 'Fecha'], '2024-01-01 03:00:00')
+
+    # Reemplazar, añadir, índices creados al final y un fallo a medias que no deja nada escrito
+    def test_modos_indices_y_transaccion(self):
+        escribir_sqlite([self.test_data], self.ruta, 'pasajeros', indices=['Puerto', 'Id'])
+        escribir_sqlite([self.test_data.iloc[:10]], self.ruta, 'pasajeros', 'anadir')
+        self.assertEqual(len(self.leer('pasajeros')), len(self.test_data) + 10)
+        escribir_sqlite([self.test_data.iloc[:10]], self.ruta, 'pasajeros')
+        self.assertEqual(len(self.leer('pasajeros')), 10)
+
+        escribir_sqlite([self.test_data], self.ruta, 'pasajeros', indices=['Puerto'])
+        with sqlite3.connect(self.ruta) as conexion:
+            indices = [fila[1] for fila in conexion.execute('PRAGMA index_list("pasajeros")')]
+        self.assertEqual(indices, ['idx_pasajeros_Puerto'])
+
+        def bloques():
+            yield self.test_data.iloc[:100]
+            raise OSError("fuente no disponible")
+        with self.assertRaises(OSError):
+            escribir_sqlite(bloques(), self.ruta, 'pasajeros')
+        self.assertEqual(len(self.leer('pasajeros')), len(self.test_data))
+
+        with self.assertRaises(ValueError):
+            escribir_sqlite([self.test_data[['Id']].rename(columns={'Id': 'Otro'})], self.ruta, 'pasajeros', 'anadir')
+        with self.assertRaises(ValueError):
+            escribir_sqlite([self.test_data], self.ruta, 'pasajeros', 'sustituir')
+
+    # Por bloques se escribe lo mismo que en memoria, también desde el pipeline
+    def test_bloques_y_pipeline(self):
+        entrada = os.path.join(self.directorio.name, 'entrada.csv')
+        self.test_data[['Id', 'Edad', 'Puerto']].to_csv(entrada, index=False)
+        tablas = []
+        for tamano_bloque in (None, 400):
+            ejecutar_pipeline({'fuente': entrada, 'features': ['Edad', 'Puerto'], 'target': 'Id', 'nulos': 'moda',
+                               'exportar': self.ruta, 'sqlite': {'tabla': f'salida{tamano_bloque}', 'indices': ['Id']},
+                               'opciones': {'bloque': tamano_bloque}})
+            tablas.append(self.leer(f'salida{tamano_bloque}'))
+        pd.testing.assert_frame_equal(tablas[0], tablas[1])
+        self.assertEqual(len(tablas[0]), len(self.test_data))
+
+    # Desde el menú se eligen la tabla, el modo y los índices
+    def test_menu_sqlite(self):
+        with patch('manejodatos.Datos.proceso'):
+            datos_obj = Datos()
+        datos_obj.datos = self.test_data.copy()
+        datos_obj.paso = 4
+        nombre = os.path.join(self.directorio.name, 'exportado')
+        with patch('builtins.input', side_effect=['8', nombre, 'pasajeros', '', 'Id, Puerto']), patch('builtins.print') as mock_print:
+            datos_obj.opcion4_exportar_datos()
+        mock_print.assert_any_call(f'Datos exportados correctamente como "{nombre}.sqlite".')
+        self.assertEqual(datos_obj.paso, 5)
+        with sqlite3.connect(nombre + '.sqlite') as conexion:
+            self.assertEqual(conexion.execute('SELECT COUNT(*) FROM pasajeros').fetchone()[0], len(self.test_data))
+            self.assertEqual(len(conexion.execute('PRAGMA index_list("pasajeros")').fetchall()), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import sys
+import unittest
+import pandas as pd
+import numpy as np
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from backend.tipos import compactar, es_categorica, es_numerica, memoria
+
+class TestTipos(unittest.TestCase):
+    # Creamos un DataFrame de prueba con tipos por defecto de pandas
+    def setUp(self):
+        self.test_data = pd.DataFrame({
+            'Pclass': [3, 1, 3, 1, 3, 2],
+            'Desplazamiento': [-5, 0, 300, 7, 1, 2],
+            'Fare': [7.25, 71.2833, 7.925, 53.1, 8.05, 8.4583],
+            'Age': [22.0, 38.0, 26.0, 35.0, np.nan, 54.0],
+            'Sex': ['male', 'female', 'female', 'female', 'male', 'male'],
+            'Name': ['a', 'b', 'c', 'd', 'e', 'f'],
+            'Adulto': [True, True, True, True, False, True]
+        })
+
+    # Compactar reduce los tipos sin cambiar los valores
+    def test_compactar(self):
+        original = self.test_data.copy()
+        compactado = compactar(self.test_data.copy())
+
+        self.assertEqual(compactado['Pclass'].dtype, np.uint8)
+        self.assertEqual(compactado['Desplazamiento'].dtype, np.int16)
+        self.assertEqual(compactado['Fare'].dtype, np.float64) # No se representa exacto en float32
+        self.assertEqual(compactado['Age'].dtype, np.float32)
+        self.assertIsInstance(compactado['Sex'].dtype, pd.CategoricalDtype)
+        self.assertEqual(compactado['Name'].dtype, object) # Todos los valores son distintos
+        self.assertEqual(compactado['Adulto'].dtype, bool)
+        self.assertLess(memoria(compactado), memoria(original))
+        pd.testing.assert_frame_equal(compactado.astype(original.dtypes.to_dict()), original)
+
+    # Los tipos reducidos, nullables y category se reconocen correctamente
+    def test_deteccion_tipos(self):
+        self.assertTrue(es_numerica(pd.Series([1, 2], dtype='int8')))
+        self.assertTrue(es_numerica(pd.Series([1.5, None], dtype='float32')))
+        self.assertTrue(es_numerica(pd.Series([1, None], dtype='Int64')))
+        self.assertFalse(es_numerica(pd.Series([True, False])))
+        self.assertTrue(es_categorica(pd.Series(['a', 'b'])))
+        self.assertTrue(es_categorica(pd.Series(['a', 'b'], dtype='category')))
+        self.assertTrue(es_categorica(pd.Series(['a', None], dtype='string')))
+        self.assertFalse(es_categorica(pd.Series([1, 2])))
+
+if __name__ == '__main__':
+    unittest.main()
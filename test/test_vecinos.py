@@ -0,0 +1,101 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+with patch('manejodatos.Datos.proceso'):
+    from manejodatos import Datos
+from backend.motor import Preprocesador
+from backend.vecinos import ajustar_knn, imputar_knn, muestra_referencia
+
+class TestVecinos(unittest.TestCase):
+    # Creamos datos continuos con nulos en distintas combinaciones de columnas
+    def setUp(self):
+        generador = np.random.default_rng(3)
+        n = 60
+        self.test_data = pd.DataFrame({
+            'x': generador.normal(0, 1, n),
+            'y': generador.normal(10, 5, n),
+            'z': generador.normal(-3, 0.5, n),
+            'clase': generador.choice(['a', 'b'], n)
+        })
+        self.test_data.loc[[1, 8, 20], 'x'] = np.nan
+        self.test_data.loc[[8, 33], 'y'] = np.nan
+        self.test_data.loc[[40], ['x', 'y', 'z']] = np.nan
+        self.columnas = ['x', 'y', 'z']
+        self.media = self.test_data[self.columnas].mean().to_numpy()
+        self.escala = self.test_data[self.columnas].std(ddof=0).to_numpy()
+
+    # Cada nulo se rellena con la media de los k vecinos más cercanos por fuerza bruta
+    def test_igual_que_fuerza_bruta(self):
+        paso = ajustar_knn([self.test_data], self.columnas, self.media, self.escala, vecinos=3, muestra=None, lote=2)
+        resultado = imputar_knn(self.test_data.copy(), paso)
+
+        escalados = (self.test_data[self.columnas] - self.media) / self.escala
+        completos = escalados.dropna().to_numpy()
+        for fila in (1, 8, 20, 33):
+            observadas = escalados.loc[fila].notna().to_numpy()
+            distancias = np.sqrt(((completos[:, observadas] - escalados.loc[fila].to_numpy()[observadas]) ** 2).sum(axis=1))
+            cercanos = completos[np.argsort(distancias)[:3]]
+            esperado = cercanos.mean(axis=0) * self.escala + self.media
+            for j, columna in enumerate(self.columnas):
+                if not observadas[j]:
+                    self.assertAlmostEqual(resultado.loc[fila, columna], esperado[j])
+        # Sin ninguna columna observada se rellena con la media
+        np.testing.assert_allclose(resultado.loc[40, self.columnas].to_numpy(dtype=float), self.media)
+        self.assertFalse(resultado[self.columnas].isnull().any().any())
+
+    # La muestra de referencia es la misma tanto si los datos llegan en un bloque como en varios
+    def test_muestra_referencia_por_bloques(self):
+        bloques = [self.test_data.iloc[inicio:inicio + 7] for inicio in range(0, len(self.test_data), 7)]
+        completa = muestra_referencia([self.test_data], self.columnas, self.media, self.escala, muestra=20)
+        por_bloques = muestra_referencia(bloques, self.columnas, self.media, self.escala, muestra=20)
+
+        self.assertEqual(len(completa), 20)
+        np.testing.assert_allclose(np.sort(completa, axis=0), np.sort(por_bloques, axis=0))
+
+    # Desde el menú KNN rellena las columnas numéricas seleccionadas, en memoria y por bloques
+    def test_opcion_knn(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        ruta = os.path.join(directorio.name, 'datos.csv')
+        self.test_data.to_csv(ruta, index=False)
+
+        resultados = []
+        for tamano_bloque in (None, 9):
+            with patch('manejodatos.Datos.proceso'):
+                datos_obj = Datos(tamano_bloque=tamano_bloque)
+            with patch('manejodatos.cargar_datos', return_value=(1, ruta)), \
+                 patch('manejodatos.mostrar_datos'), patch('builtins.print'):
+                datos_obj.opcion1_carga()
+            datos_obj.features = ['x', 'y', 'clase']
+            datos_obj.targets = 'z'
+            with patch('builtins.input', return_value='7'), patch('builtins.print'):
+                datos_obj.opcion2_manejo_nulos()
+            self.assertEqual(datos_obj.paso, 2.3)
+            resultados.append(pd.concat(list(datos_obj._bloques()), ignore_index=True))
+
+        self.assertFalse(resultados[0][['x', 'y']].isnull().any().any())
+        self.assertTrue(np.isnan(resultados[0].loc[40, 'z'])) # El target no se imputa
+        pd.testing.assert_frame_equal(resultados[0], resultados[1])
+
+    # El target no influye en la distancia: con otros valores del target se imputan las mismas features
+    def test_knn_sin_target(self):
+        motores = []
+        for target in (self.test_data['z'], -100 * self.test_data['z']):
+            motor = Preprocesador(verboso=False)
+            motor.datos = self.test_data.assign(z=target)
+            motor.seleccionar_columnas(['x', 'y'], 'z')
+            motor.manejar_nulos('knn', vecinos=3)
+            self.assertEqual(motor.transformaciones[-1]['columnas'], ['x', 'y'])
+            motores.append(motor)
+        pd.testing.assert_frame_equal(motores[0].datos[['x', 'y']], motores[1].datos[['x', 'y']])
+
+if __name__ == '__main__':
+    unittest.main()